@@ -0,0 +1,184 @@
+"""
+Benchmark approximate (IVF) against exact knowledge search: recall@k vs latency.
+
+The knowledge/ documents are indexed with the hashing embedder and searched
+with a fixed set of mental-health queries. The index is then scaled up with
+synthetic chunks: each is a noisy mix of two real chunk embeddings, and each
+query is a noisy copy of a random synthetic chunk, so the data keeps the
+topical clustering of the real corpus. At every size the IVF index is built,
+saved, re-opened memory-mapped and searched through KnowledgeIndex.search at
+several ``nprobe`` values. Recall@k is the share of the exact top k that the
+ANN search also returns. Finally 10% of the largest corpus is inserted into
+an index trained on the other 90%, to show the cost of incremental inserts.
+
+Usage:
+    python benchmarks/bench_ann.py --sizes 10000 50000 100000 --k 4
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from crewai_knowledge_chatbot.ann import IVFIndex  # noqa: E402
+from crewai_knowledge_chatbot.embeddings import get_embedder, normalize_rows  # noqa: E402
+from crewai_knowledge_chatbot.knowledge_index import KNOWLEDGE_DIR, KnowledgeIndex, build_index, load_index  # noqa: E402
+
+QUERIES = [
+    "breathing exercises for panic attacks",
+    "how to cope with work stress and burnout",
+    "signs of depression in teachers",
+    "improving sleep when anxious",
+    "mindfulness techniques for racing thoughts",
+    "talking to a friend about mental health",
+    "setting boundaries at work",
+    "grounding techniques during anxiety",
+    "support available for staff wellbeing",
+    "managing workload and job satisfaction",
+    "self-care routine after a difficult day",
+    "when to seek professional help",
+]
+
+
+class VectorEmbedder:
+    """Looks up pre-computed query vectors by query string, so synthetic queries go through search()."""
+
+    name = "vectors"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed(self, texts):
+        return np.stack([self.vectors[int(text)] for text in texts])
+
+
+def synthetic_corpus(base, size, queries, seed=0, noise=0.5):
+    rng = np.random.default_rng(seed)
+    dim = base.shape[1]
+    a = base[rng.integers(len(base), size=size)]
+    b = base[rng.integers(len(base), size=size)]
+    weights = rng.uniform(0.2, 0.8, size=(size, 1)).astype(np.float32)
+    vectors = normalize_rows(weights * a + (1 - weights) * b + noise * normalize_rows(rng.standard_normal((size, dim))))
+    targets = vectors[rng.integers(size, size=queries)]
+    query_vectors = normalize_rows(targets + noise * normalize_rows(rng.standard_normal((queries, dim))))
+    return vectors, query_vectors
+
+
+def time_searches(index, queries, k, **kwargs):
+    results = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append({result["id"] for result in index.search(query, k, **kwargs)})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, statistics.median(latencies), np.percentile(latencies, 95)
+
+
+def recall(approximate, exact):
+    return statistics.mean(len(a & e) / len(e) for a, e in zip(approximate, exact) if e)
+
+
+def compare(index, queries, k, nprobes, keyword_weight=0.0):
+    exact, exact_p50, exact_p95 = time_searches(index, queries, k, keyword_weight=keyword_weight, exact=True)
+    rows = [{"nprobe": "exact", "recall": 1.0, "p50_ms": exact_p50, "p95_ms": exact_p95}]
+    for nprobe in nprobes:
+        if nprobe > index.ann.nlist:
+            continue
+        found, p50, p95 = time_searches(index, queries, k, keyword_weight=keyword_weight, nprobe=nprobe)
+        rows.append({"nprobe": nprobe, "recall": recall(found, exact), "p50_ms": p50, "p95_ms": p95})
+    return rows
+
+
+def ivf_index(vectors, directory):
+    start = time.perf_counter()
+    IVFIndex.build(vectors).save(directory)
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    ann, _ = IVFIndex.load(directory)
+    return ann, build_s, (time.perf_counter() - start) * 1000
+
+
+def print_rows(title, rows, k):
+    print(title)
+    for row in rows:
+        nprobe = row["nprobe"] if row["nprobe"] == "exact" else f"nprobe={row['nprobe']}"
+        print(f"  {nprobe:<12} recall@{k}={row['recall']:.3f}  p50={row['p50_ms']:7.2f}ms  p95={row['p95_ms']:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--knowledge-dir", default=str(KNOWLEDGE_DIR))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--nprobes", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = {"k": args.k}
+    with tempfile.TemporaryDirectory() as tmp:
+        build_index(args.knowledge_dir, tmp, get_embedder("hashing"), ann_min_chunks=0)
+        knowledge = load_index(args.knowledge_dir, tmp)
+        results["knowledge"] = {
+            "chunks": len(knowledge),
+            "nlist": knowledge.ann.nlist,
+            "dense": compare(knowledge, QUERIES, args.k, args.nprobes),
+            "hybrid": compare(knowledge, QUERIES, args.k, args.nprobes, keyword_weight=0.3),
+        }
+        base = np.asarray(knowledge.embeddings)
+
+        for size in args.sizes:
+            vectors, query_vectors = synthetic_corpus(base, size, args.queries)
+            ann, build_s, load_ms = ivf_index(vectors, os.path.join(tmp, f"ann-{size}"))
+            chunks = [{"source": "synthetic", "chunk": i, "page": None, "text": ""} for i in range(size)]
+            index = KnowledgeIndex(chunks, vectors, VectorEmbedder(query_vectors), ann)
+            queries = [str(i) for i in range(args.queries)]
+            results[size] = {
+                "nlist": ann.nlist,
+                "build_s": build_s,
+                "load_ms": load_ms,
+                "dense": compare(index, queries, args.k, args.nprobes),
+            }
+
+        size = args.sizes[-1]
+        split = int(size * 0.9)
+        start = time.perf_counter()
+        ann = IVFIndex.build(vectors[:split])
+        ann.add(vectors[split:], np.arange(split, size))
+        insert_s = time.perf_counter() - start
+        index.ann = ann
+        incremental = compare(index, queries, args.k, args.nprobes)
+        results["incremental"] = {"size": size, "inserted": size - split, "build_and_insert_s": insert_s, "dense": incremental}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    knowledge = results["knowledge"]
+    print_rows(f"knowledge/ ({knowledge['chunks']} chunks, nlist={knowledge['nlist']}), dense", knowledge["dense"], args.k)
+    print_rows("knowledge/, hybrid (keyword_weight=0.3)", knowledge["hybrid"], args.k)
+    for size in args.sizes:
+        result = results[size]
+        print_rows(
+            f"synthetic {size} chunks (nlist={result['nlist']}, built in {result['build_s']:.1f}s, "
+            f"opened in {result['load_ms']:.1f}ms)",
+            result["dense"],
+            args.k,
+        )
+    incremental = results["incremental"]
+    print_rows(
+        f"synthetic {incremental['size']} chunks, trained on 90% then {incremental['inserted']} inserted "
+        f"({incremental['build_and_insert_s']:.1f}s)",
+        incremental["dense"],
+        args.k,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Micro-benchmark the voice input path from recorder output to recognizer input.
+
+"before" reproduces the previous path: export the AudioSegment to WAV
+bytes, compare them with the last recording, write a temp file, reopen it
+with sr.AudioFile, adjust for ambient noise and record. "after" hashes the
+in-memory PCM buffer, wraps it in an AudioData directly and writes the
+WAV bytes for the page's audio player into a BytesIO. Both paths include
+the player's WAV bytes, which "before" reused from its export. The network
+recognition call itself is not included.
+
+Usage:
+    python benchmarks/bench_audio_pipeline.py --durations 5 30 120 --repeat 5
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import speech_recognition as sr
+from pydub import AudioSegment
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_knowledge_chatbot.speech import audio_fingerprint, to_audio_data, to_wav_bytes
+
+# What the browser recorder typically hands back
+RECORDER_SAMPLE_RATE = 44100
+
+
+def recording(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = (rng.standard_normal(int(seconds * RECORDER_SAMPLE_RATE)) * 3000).astype(np.int16)
+    return AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=RECORDER_SAMPLE_RATE, channels=1)
+
+
+def before(segment, last_audio_input):
+    audio_buffer = io.BytesIO()
+    segment.export(audio_buffer, format="wav")
+    audio_bytes = audio_buffer.getvalue()
+    is_new = audio_bytes != last_audio_input
+
+    recognizer = sr.Recognizer()
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
+        temp_audio.write(audio_bytes)
+        temp_audio_path = temp_audio.name
+    with sr.AudioFile(temp_audio_path) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+        audio_data = recognizer.record(source)
+    os.unlink(temp_audio_path)
+    return is_new, audio_bytes, audio_data
+
+
+def after(segment, last_audio_input):
+    audio_id = audio_fingerprint(segment)
+    to_wav_bytes(segment)
+    return audio_id != last_audio_input, audio_id, to_audio_data(segment)
+
+
+def measure(path, segment, repeat):
+    # Compare against an identical previous recording: the worst case for byte comparison
+    _, last_audio_input, _ = path(segment, None)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path(segment, last_audio_input)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--durations", type=float, nargs="*", default=[5, 30, 120])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'clip':>6} {'before':>12} {'after':>12} {'speedup':>8}")
+    for seconds in args.durations:
+        segment = recording(seconds)
+        before_ms = measure(before, segment, args.repeat)
+        after_ms = measure(after, segment, args.repeat)
+        print(f"{seconds:>5.0f}s {before_ms:>10.2f}ms {after_ms:>10.2f}ms {before_ms / after_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
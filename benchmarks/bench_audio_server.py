@@ -0,0 +1,100 @@
+"""
+Benchmark serving voice clips by URL from the audio server instead of inlining them.
+
+For a set of replies synthesized with a TTS backend (stub by default, which
+needs no network), this compares what the chatbot page sends per reply:
+``before`` inlines the clip in the autoplay component as a base64 data URI
+over the websocket, then sends the raw clip again for the fallback
+``st.audio`` player. ``after`` sends only the clip's URL; the browser
+fetches the clip once and can then revalidate it for free. It also measures
+the audio server's latency for a full fetch, a range request (seeking) and
+a conditional request answered with 304 Not Modified.
+
+Usage:
+    python benchmarks/bench_audio_server.py --backend stub --repeat 200
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from bench_tts_pipeline import REPLIES  # noqa: E402
+from crewai_knowledge_chatbot.audio_server import AudioServer, clip_id  # noqa: E402
+from crewai_knowledge_chatbot.speech import get_tts_backend  # noqa: E402
+
+
+def before_bytes(audio, audio_format):
+    """Websocket and HTTP bytes for one reply with the data-URI autoplay plus the st.audio fallback."""
+    data_uri = f"data:{audio_format};base64,{base64.b64encode(audio).decode('ascii')}"
+    return {"websocket": len(data_uri), "http": len(audio), "replay_http": len(audio)}
+
+
+def after_bytes(url, audio):
+    return {"websocket": len(url), "http": len(audio), "replay_http": 0}
+
+
+def time_requests(port, path, headers, repeat):
+    connection = http.client.HTTPConnection("localhost", port)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    connection.close()
+    return {"status": response.status, "bytes": len(body), "p50_ms": statistics.median(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", default="stub")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    backend = get_tts_backend(args.backend)
+    server = AudioServer(port=0)
+    try:
+        totals = {"before": {}, "after": {}}
+        for reply in REPLIES:
+            audio = backend.synthesize(reply)
+            url = server.publish(audio, backend.audio_format)
+            for name, counts in (("before", before_bytes(audio, backend.audio_format)), ("after", after_bytes(url, audio))):
+                for key, value in counts.items():
+                    totals[name][key] = totals[name].get(key, 0) + value
+
+        path = urlsplit(url).path
+        etag = f'"{clip_id(audio)}"'
+        requests = {
+            "full": time_requests(server.port, path, {}, args.repeat),
+            "range": time_requests(server.port, path, {"Range": "bytes=65536-131071"}, args.repeat),
+            "not_modified": time_requests(server.port, path, {"If-None-Match": etag}, args.repeat),
+        }
+    finally:
+        server.close()
+
+    if args.json:
+        print(json.dumps({"backend": backend.name, "replies": len(REPLIES), "bytes": totals, "requests": requests}, indent=2))
+        return
+
+    print(f"{len(REPLIES)} replies synthesized with {backend.name} ({backend.audio_format})")
+    for name, counts in totals.items():
+        print(
+            f"  {name:<7} websocket {counts['websocket'] / 1024:8.1f} KiB  audio fetched {counts['http'] / 1024:8.1f} KiB  "
+            f"replaying again {counts['replay_http'] / 1024:8.1f} KiB"
+        )
+    print(f"Audio server, last clip ({len(audio) / 1024:.0f} KiB), p50 of {args.repeat}:")
+    for name, result in requests.items():
+        print(f"  {name:<13} HTTP {result['status']}  {result['bytes'] / 1024:8.1f} KiB  {result['p50_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
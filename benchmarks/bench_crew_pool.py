@@ -0,0 +1,161 @@
+"""
+Benchmark time-to-first-LLM-call with and without the crew pool.
+
+"before" rebuilds the crew for every request the way the pages originally
+did: a new CrewaiKnowledgeChatbot parses the YAML and constructs the agents
+and tasks, and the chatbot crew gets a PDFKnowledgeSource over the
+knowledge/ PDFs, which CrewAI chunks, embeds and stores in a fresh
+ChromaDB-backed Knowledge on every crew construction. The source is
+loaded (the PDFs parsed) on each request too; ``--source-once`` instead
+loads it once per process, like the module-level source the original
+crew.py created. "after" checks a crew out of the process-wide CrewPool,
+which shares the prebuilt knowledge index. The LLM is replaced with a
+canned final answer, and the knowledge is embedded with the offline hashing
+embedder (CrewAI's default would call OpenAI), so only the app's own
+overhead is measured. CrewAI's storage goes to a temporary directory.
+
+Usage:
+    python benchmarks/bench_crew_pool.py --crew chatbot_crew --before-iterations 3
+    python benchmarks/bench_crew_pool.py --crew therapy_crew --iterations 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("KNOWLEDGE_EMBEDDER", "hashing")
+os.environ.setdefault("CREWAI_STORAGE_DIR", tempfile.mkdtemp(prefix="bench-crew-pool-"))
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from crewai import Crew, Process
+from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
+from crewai.llm import LLM
+
+from src.crewai_knowledge_chatbot.crew import CrewaiKnowledgeChatbot
+from src.crewai_knowledge_chatbot.embeddings import HashingEmbedder
+from src.crewai_knowledge_chatbot.knowledge_index import KNOWLEDGE_DIR
+from src.crewai_knowledge_chatbot.pool import CrewPool
+
+CANNED_ANSWER = "Thought: I now know the final answer\nFinal Answer: How are you feeling today?"
+
+INPUTS = {
+    "therapy_crew": {
+        "user_context": "User Profile:\n- Concerns: Stress, Sleep Issues",
+        "conversation_history": "",
+        "question_number": "1",
+    },
+    "chatbot_crew": {
+        "user_message": "How can I sleep better?",
+        "full_context": "User Profile:\n- Preferred Style: Direct and solution-focused",
+    },
+}
+
+_first_call = []
+
+
+class HashingEmbeddingFunction(EmbeddingFunction):
+    """The offline hashing embedder as a ChromaDB embedding function, for CrewAI's own knowledge storage."""
+
+    def __init__(self):
+        self.embedder = HashingEmbedder()
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return [np.asarray(vector) for vector in self.embedder.embed(list(input))]
+
+
+def load_pdf_source():
+    # PDFKnowledgeSource resolves file_paths against the knowledge/ directory
+    return PDFKnowledgeSource(
+        file_paths=sorted(path.name for path in KNOWLEDGE_DIR.glob("*.pdf")),
+        name="mental health knowledge base",
+        description="Authorized mental health resource containing approved information",
+    )
+
+
+def build_original_crew(crew_name, source):
+    """Build ``crew_name`` from scratch, with per-request knowledge for the chatbot crew as the pages used to."""
+    chatbot = CrewaiKnowledgeChatbot()
+    if crew_name == "therapy_crew":
+        return chatbot.therapy_crew()
+    return Crew(
+        agents=[chatbot.knowledge_specialist(), chatbot.summarizer()],
+        tasks=[chatbot.knowledge_search_task(), chatbot.summary_task()],
+        process=Process.sequential,
+        knowledge_sources=[source()],
+        embedder={"provider": "custom", "config": {"embedder": HashingEmbeddingFunction()}},
+        verbose=False,
+    )
+
+
+def _fake_call(self, messages, *args, **kwargs):
+    if not _first_call:
+        _first_call.append(time.perf_counter())
+    return CANNED_ANSWER
+
+
+def time_to_first_call(kickoff):
+    _first_call.clear()
+    start = time.perf_counter()
+    kickoff()
+    return _first_call[0] - start
+
+
+def report(label, samples):
+    samples_ms = sorted(sample * 1000 for sample in samples)
+    p95 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))]
+    print(
+        f"{label:<8} mean={statistics.mean(samples_ms):8.2f}ms "
+        f"p50={statistics.median(samples_ms):8.2f}ms p95={p95:8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--crew", choices=sorted(INPUTS), default="therapy_crew")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--before-iterations", type=int, default=None,
+        help="iterations of the slow before path (default: --iterations)",
+    )
+    parser.add_argument(
+        "--source-once", action="store_true",
+        help="load the PDF knowledge source once per process instead of per request",
+    )
+    args = parser.parse_args()
+
+    LLM.call = _fake_call
+    inputs = INPUTS[args.crew]
+
+    if args.source_once:
+        shared_source = load_pdf_source()
+        source = lambda: shared_source  # noqa: E731
+    else:
+        source = load_pdf_source
+    before = [
+        time_to_first_call(lambda: build_original_crew(args.crew, source).kickoff(inputs=inputs))
+        for _ in range(args.before_iterations or args.iterations)
+    ]
+
+    pool = CrewPool()
+    pool.warm(args.crew)
+    after = [
+        time_to_first_call(lambda: pool.checkout(args.crew, inputs).kickoff())
+        for _ in range(args.iterations)
+    ]
+
+    print(f"time-to-first-LLM-call for {args.crew}")
+    report("before", before)
+    report("after", after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark throughput of the crew service under concurrent simulated sessions.
+
+Each simulated session asks for one therapy question and then sends
+``--messages`` chatbot messages, one after the other. The LLM is replaced
+with a canned answer that sleeps for ``--llm-latency`` seconds, so the
+numbers reflect how requests are scheduled rather than model speed.
+
+"sequential" handles every request on one thread, like a single blocked
+script thread. "thread-per-session" gives each session its own thread that
+calls kickoff() directly, like Streamlit's script threads did. "service"
+submits every request to a CrewService with ``--concurrency`` slots and
+waits on the returned futures.
+
+Usage:
+    python benchmarks/bench_crew_service.py --sessions 50 --concurrency 8 16 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("KNOWLEDGE_EMBEDDER", "hashing")
+os.environ.setdefault("CHATBOT_MODE", "fast")
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crewai.llm import LLM
+
+from src.crewai_knowledge_chatbot.chatbot import run_chatbot
+from src.crewai_knowledge_chatbot.pool import get_crew_pool
+from src.crewai_knowledge_chatbot.service import CrewService
+
+CANNED_ANSWER = "Thought: I now know the final answer\nFinal Answer: Try a regular sleep schedule."
+USER_CONTEXT = "User Profile:\n- Concerns: Stress, Sleep Issues"
+
+_active_calls = 0
+_peak_calls = 0
+_calls_lock = threading.Lock()
+
+
+def fake_llm(latency):
+    def call(self, messages, *args, **kwargs):
+        global _active_calls, _peak_calls
+        with _calls_lock:
+            _active_calls += 1
+            _peak_calls = max(_peak_calls, _active_calls)
+        try:
+            time.sleep(latency)
+            return CANNED_ANSWER
+        finally:
+            with _calls_lock:
+                _active_calls -= 1
+
+    return call
+
+
+def therapist_question():
+    inputs = {"user_context": USER_CONTEXT, "conversation_history": "", "question_number": "1"}
+    return get_crew_pool().therapy_crew(inputs).kickoff().raw
+
+
+def session_requests(session, messages):
+    """The (kind, args) requests one session makes, in order."""
+    requests = [("therapist", ())]
+    for message in range(messages):
+        requests.append(("chatbot", (f"How can I sleep better? ({message})", USER_CONTEXT)))
+    return requests
+
+
+def run_sequential(sessions, messages):
+    latencies = []
+    for session in range(sessions):
+        for kind, args in session_requests(session, messages):
+            start = time.perf_counter()
+            therapist_question(*args) if kind == "therapist" else run_chatbot(*args)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_threads(sessions, messages, submit):
+    latencies = []
+    lock = threading.Lock()
+
+    def session_thread(session):
+        for kind, args in session_requests(session, messages):
+            start = time.perf_counter()
+            submit(kind, args)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session_thread, args=(session,)) for session in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def run_thread_per_session(sessions, messages):
+    def submit(kind, args):
+        return therapist_question(*args) if kind == "therapist" else run_chatbot(*args)
+
+    return run_threads(sessions, messages, submit)
+
+
+def run_service(sessions, messages, concurrency):
+    service = CrewService(max_concurrency=concurrency)
+
+    def submit(kind, args):
+        if kind == "therapist":
+            coroutine = service.ask_therapist(USER_CONTEXT, "", 1)
+        else:
+            coroutine = service.ask_chatbot(*args)
+        return service.submit(coroutine).result()
+
+    return run_threads(sessions, messages, submit)
+
+
+def report(label, latencies, elapsed):
+    global _peak_calls
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.95))]
+    print(
+        f"{label:<22} {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50={statistics.median(latencies_ms):8.1f}ms p95={p95:8.1f}ms  "
+        f"peak LLM calls={_peak_calls}"
+    )
+    _peak_calls = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[8, 16, 50])
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    LLM.call = fake_llm(args.llm_latency)
+    get_crew_pool().warm("therapy_crew", "fast_chatbot_crew")
+
+    total = args.sessions * (args.messages + 1)
+    print(f"{args.sessions} sessions, {total} requests, {args.llm_latency * 1000:.0f} ms per LLM call")
+
+    runs = [] if args.skip_sequential else [("sequential", lambda: run_sequential(args.sessions, args.messages))]
+    runs.append(("thread-per-session", lambda: run_thread_per_session(args.sessions, args.messages)))
+    for concurrency in args.concurrency:
+        runs.append((
+            f"service (max {concurrency})",
+            lambda concurrency=concurrency: run_service(args.sessions, args.messages, concurrency),
+        ))
+
+    for label, run in runs:
+        start = time.perf_counter()
+        latencies = run()
+        report(label, latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Offline end-to-end benchmark of the app's own overhead.
+
+Drives the real Streamlit pages headlessly with streamlit.testing's
+AppTest: landing page, profile form, the 4 therapy questions, ``--turns``
+chat turns, a voice-mode render and the session summary. Provider calls
+are replaced with deterministic local stand-ins so only the app's own work
+is measured:
+
+- LLM: LLM.call returns a canned answer after ``--llm-latency`` seconds
+- memory: MEMORY_BACKEND=local (in-process LocalMemoryClient)
+- speech: STT_BACKEND=stub and TTS_BACKEND=stub
+- knowledge embeddings: KNOWLEDGE_EMBEDDER=hashing
+
+Crew construction and context building are also timed on their own. Each
+stage reports p50/p95 latency from a timing pass and the peak and net
+Python allocations (tracemalloc) from a separate single-session pass. The
+process's peak RSS is reported at the end. The JSON report can be saved
+with ``--output`` and compared with a previous one with ``--baseline``,
+which exits non-zero when a stage's p95 or allocations regress by more
+than ``--tolerance``.
+
+Usage:
+    python benchmarks/bench_e2e.py --sessions 5 --turns 5 --output e2e.json
+    python benchmarks/bench_e2e.py --baseline e2e.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["KNOWLEDGE_EMBEDDER"] = "hashing"
+os.environ["MEMORY_BACKEND"] = "local"
+os.environ["STT_BACKEND"] = "stub"
+os.environ["TTS_BACKEND"] = "stub"
+os.environ["SESSION_DB"] = os.path.join(tempfile.mkdtemp(prefix="bench-e2e-"), "sessions.db")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to the Python path
+sys.path.append(PROJECT_ROOT)
+
+from crewai.llm import LLM
+from streamlit.testing.v1 import AppTest
+
+from src.crewai_knowledge_chatbot.context_window import ContextWindow
+from src.crewai_knowledge_chatbot.crew import CrewaiKnowledgeChatbot
+from src.crewai_knowledge_chatbot.pool import get_crew_pool
+from src.crewai_knowledge_chatbot.speech import MODEL_SAMPLE_RATE, get_stt_backend, pcm16_to_wav
+from src.crewai_knowledge_chatbot.warmup import format_initial_context
+
+CANNED_ANSWER = (
+    "Thought: I now know the final answer\n"
+    "Final Answer: It sounds like the stress has been building up. "
+    "A regular wind-down routine and a consistent bedtime can help. "
+    "What usually keeps you awake?"
+)
+
+PROFILE = {
+    "name": "Sam",
+    "age_group": "26-35",
+    "mood": "Low",
+    "concerns": ["Stress", "Sleep Issues"],
+    "additional_info": "Work has been very demanding lately.",
+    "preferred_style": "Direct and solution-focused",
+}
+
+THERAPY_ANSWERS = [
+    "I have been sleeping badly for about a month.",
+    "Mostly deadlines at work, I keep thinking about them at night.",
+    "I tried cutting coffee but it did not change much.",
+    "I would like a routine that helps me switch off in the evening.",
+]
+
+CHAT_MESSAGES = [
+    "How can I fall asleep faster?",
+    "What can I do when I wake up at 3am and start worrying?",
+    "Is it bad to check email right before bed?",
+    "How do I talk to my manager about my workload?",
+    "Are there breathing exercises for stress?",
+    "How long does it take for a new sleep routine to work?",
+]
+
+
+def fake_llm(latency):
+    def call(self, messages, *args, **kwargs):
+        if latency:
+            time.sleep(latency)
+        return CANNED_ANSWER
+
+    return call
+
+
+class StageRecorder:
+    """Collects per-stage timings, or allocations when tracing is enabled."""
+
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        self.timings = defaultdict(list)
+        self.allocations = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name):
+        if self.trace_allocations:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.timings[name].append(elapsed)
+        if self.trace_allocations:
+            after, peak = tracemalloc.get_traced_memory()
+            self.allocations[name].append((peak - before, after - before))
+
+
+def check_page(at, name):
+    if at.exception:
+        raise RuntimeError(f"{name} raised: {at.exception[0].value}")
+
+
+def run_session(recorder, turns):
+    """Script one user through every page, timing each interaction."""
+    at = AppTest.from_file(os.path.join(PROJECT_ROOT, "app.py"), default_timeout=120)
+    with recorder.stage("landing"):
+        at.run()
+    check_page(at, "landing")
+
+    at.switch_page("pages/1_user_input.py")
+    with recorder.stage("profile_form"):
+        at.run()
+    check_page(at, "profile_form")
+    at.text_input[0].input(PROFILE["name"])
+    at.selectbox[0].select(PROFILE["age_group"])
+    at.select_slider[0].set_value(PROFILE["mood"])
+    at.multiselect[0].set_value(PROFILE["concerns"])
+    at.text_area[0].input(PROFILE["additional_info"])
+    at.radio[0].set_value(PROFILE["preferred_style"])
+    at.button[0].click()
+    # Saving the profile switches to the therapy page and waits for question 1
+    with recorder.stage("profile_submit"):
+        at.run()
+    check_page(at, "profile_submit")
+    # AppTest does not follow st.switch_page on later runs, so stay on the therapy page
+    at.switch_page("pages/2_therapy_session.py")
+
+    for answer in THERAPY_ANSWERS:
+        at.chat_input[0].set_value(answer)
+        with recorder.stage("therapy_answer"):
+            at.run()
+        check_page(at, "therapy_answer")
+    if not at.session_state["therapy_complete"]:
+        raise RuntimeError("Therapy session did not complete")
+
+    at.switch_page("pages/3_chatbot.py")
+    with recorder.stage("chat_page"):
+        at.run()
+    check_page(at, "chat_page")
+    for turn in range(turns):
+        message = CHAT_MESSAGES[turn % len(CHAT_MESSAGES)]
+        at.chat_input[0].set_value(f"{message} (turn {turn + 1})")
+        with recorder.stage("chat_turn"):
+            at.run()
+        check_page(at, "chat_turn")
+
+    # Voice mode synthesizes (or fetches from cache) audio for every assistant message
+    at.toggle[0].set_value(True)
+    with recorder.stage("voice_render"):
+        at.run()
+    check_page(at, "voice_render")
+
+    at.switch_page("pages/4_session_summary.py")
+    with recorder.stage("summary"):
+        at.run()
+    check_page(at, "summary")
+
+
+def run_components(recorder, turns):
+    """Time the pieces that every request pays for, outside of Streamlit."""
+    pool = get_crew_pool()
+    for crew_name in ("therapy_crew", "chatbot_crew", "fast_chatbot_crew"):
+        with recorder.stage("crew_checkout"):
+            pool.checkout(crew_name)
+
+    therapy_transcript = [f"User: {answer}" for answer in THERAPY_ANSWERS]
+    context_window = ContextWindow()
+    for turn in range(turns):
+        with recorder.stage("context_build"):
+            context_window.set_preamble(PROFILE, therapy_transcript)
+            context_window.add_turn("User", CHAT_MESSAGES[turn % len(CHAT_MESSAGES)])
+            context_window.render()
+        context_window.add_turn("Assistant", CANNED_ANSWER.split("Final Answer: ", 1)[1])
+
+    with recorder.stage("profile_context"):
+        format_initial_context(PROFILE)
+
+    clip = pcm16_to_wav(b"\0\0" * MODEL_SAMPLE_RATE * 3)
+    with recorder.stage("stt"):
+        get_stt_backend().transcribe(clip)
+
+
+def summarize(timings, allocations):
+    stages = {}
+    for name, samples in timings.items():
+        samples_ms = sorted(sample * 1000 for sample in samples)
+        stages[name] = {
+            "count": len(samples_ms),
+            "mean_ms": round(statistics.mean(samples_ms), 3),
+            "p50_ms": round(samples_ms[len(samples_ms) // 2], 3),
+            "p95_ms": round(samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))], 3),
+        }
+        if allocations.get(name):
+            peaks, nets = zip(*allocations[name])
+            stages[name]["alloc_peak_kib"] = round(max(peaks) / 1024, 1)
+            stages[name]["alloc_net_kib"] = round(statistics.mean(nets) / 1024, 1)
+    return stages
+
+
+def compare(report, baseline, tolerance):
+    """Return human-readable regressions of ``report`` against ``baseline``."""
+    regressions = []
+    for name, stage in report["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if previous is None:
+            continue
+        for metric in ("p95_ms", "alloc_peak_kib"):
+            if metric in stage and previous.get(metric):
+                change = stage[metric] / previous[metric] - 1
+                if change > tolerance:
+                    regressions.append(f"{name}.{metric}: {previous[metric]} -> {stage[metric]} (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--mode", choices=["fast", "thorough"], default="fast")
+    parser.add_argument("--skip-allocations", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    os.environ["CHATBOT_MODE"] = args.mode
+    LLM.call = fake_llm(args.llm_latency)
+
+    timing = StageRecorder()
+    # Process start-up: building every crew template once
+    with timing.stage("crew_construction"):
+        for crew_name in ("therapy_crew", "chatbot_crew", "fast_chatbot_crew"):
+            getattr(CrewaiKnowledgeChatbot(), crew_name)()
+    get_crew_pool().warm("therapy_crew", "chatbot_crew", "fast_chatbot_crew")
+
+    for session in range(args.sessions):
+        print(f"session {session + 1}/{args.sessions}", file=sys.stderr)
+        run_session(timing, args.turns)
+        run_components(timing, args.turns)
+
+    allocations = StageRecorder(trace_allocations=True)
+    if not args.skip_allocations:
+        tracemalloc.start()
+        run_session(allocations, args.turns)
+        run_components(allocations, args.turns)
+        tracemalloc.stop()
+
+    report = {
+        "benchmark": "e2e",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "sessions": args.sessions,
+            "turns": args.turns,
+            "llm_latency": args.llm_latency,
+            "mode": args.mode,
+        },
+        "stages": summarize(timing.timings, allocations.allocations),
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        "peak_rss_mib": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1
+        ),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark build_index on a synthetic corpus of multi-page PDFs.
+
+A corpus of ``--files`` PDFs of ``--pages`` pages each is generated (a
+minimal hand-written PDF per file, so no PDF-writing library is needed) and
+indexed from scratch with the hashing embedder, so the numbers measure
+extraction, chunking and the pipeline rather than an embedding API. Then one
+page in every tenth file is edited and the index is rebuilt, which should
+re-extract only those files and re-embed only the edited pages. Peak RSS is
+reported for the benchmark process and, separately, for the largest
+extraction worker.
+
+Usage:
+    python benchmarks/bench_ingest.py --files 1000 --workers 4
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from crewai_knowledge_chatbot.embeddings import get_embedder  # noqa: E402
+from crewai_knowledge_chatbot.knowledge_index import build_index, load_index  # noqa: E402
+
+WORDS = (
+    "anxiety breathing calm coping feelings grounding habits journal mindfulness mood "
+    "patience reflection routine sleep stress support therapy thoughts walking wellbeing"
+).split()
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages):
+    """Return the bytes of a PDF with one page per list of text lines."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def page_lines(rng, lines=40, words=12):
+    return [" ".join(rng.choice(WORDS) for _ in range(words)) for _ in range(lines)]
+
+
+def make_corpus(directory, files, pages, seed=0):
+    rng = random.Random(seed)
+    corpus = {}
+    for number in range(files):
+        corpus[number] = [page_lines(rng) for _ in range(pages)]
+        (directory / f"doc_{number:05d}.pdf").write_bytes(make_pdf(corpus[number]))
+    return corpus
+
+
+def peak_rss_mb(who):
+    # ru_maxrss is in KiB on Linux; for RUSAGE_CHILDREN it is the largest single child
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def timed_build(knowledge_dir, index_dir, embedder, workers, batch_size):
+    stats = build_index(knowledge_dir, index_dir, embedder, workers, batch_size)
+    stats["pages_per_s"] = stats["pages"] / stats["seconds"]
+    stats["chunks_per_s"] = stats["chunks"] / stats["seconds"]
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    embedder = get_embedder("hashing")
+    with tempfile.TemporaryDirectory() as tmp:
+        knowledge_dir = Path(tmp) / "knowledge"
+        index_dir = Path(tmp) / "index"
+        knowledge_dir.mkdir()
+        start = time.perf_counter()
+        corpus = make_corpus(knowledge_dir, args.files, args.pages)
+        generate_s = time.perf_counter() - start
+
+        cold = timed_build(knowledge_dir, index_dir, embedder, args.workers, args.batch_size)
+        cold["peak_rss_mb"] = peak_rss_mb(resource.RUSAGE_SELF)
+        cold["peak_worker_rss_mb"] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+
+        rng = random.Random(1)
+        edited = list(corpus)[::10]
+        for number in edited:
+            pages = corpus[number]
+            pages[rng.randrange(len(pages))] = page_lines(rng)
+            (knowledge_dir / f"doc_{number:05d}.pdf").write_bytes(make_pdf(pages))
+        incremental = timed_build(knowledge_dir, index_dir, embedder, args.workers, args.batch_size)
+
+        start = time.perf_counter()
+        index = load_index(knowledge_dir, index_dir)
+        load_ms = (time.perf_counter() - start) * 1000
+
+    results = {
+        "files": args.files,
+        "pages_per_file": args.pages,
+        "workers": args.workers,
+        "batch_size": args.batch_size,
+        "generate_s": generate_s,
+        "cold": cold,
+        "edited_files": len(edited),
+        "incremental": incremental,
+        "indexed_chunks": len(index.chunks),
+        "load_ms": load_ms,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{args.files} PDFs x {args.pages} pages, {args.workers} workers, batch {args.batch_size} "
+        f"(corpus generated in {generate_s:.1f}s)"
+    )
+    print(
+        f"  cold build:  {cold['seconds']:6.1f}s  {cold['pages_per_s']:7.1f} pages/s  "
+        f"{cold['chunks_per_s']:7.1f} chunks/s  failed={cold['failed']}"
+    )
+    print(f"  peak RSS:    {cold['peak_rss_mb']:6.1f} MB main, {cold['peak_worker_rss_mb']:.1f} MB largest worker")
+    print(
+        f"  one page edited in {len(edited)} files: {incremental['seconds']:.1f}s, "
+        f"{incremental['embedded']} files re-extracted, {incremental['reused']} untouched, "
+        f"{incremental['pages_embedded']} pages re-embedded, {incremental['pages_reused']} pages reused"
+    )
+    print(f"  load_index:  {load_ms:.0f} ms for {len(index.chunks)} chunks")
+
+
+if __name__ == "__main__":
+    main()
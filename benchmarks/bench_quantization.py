@@ -0,0 +1,181 @@
+"""
+Benchmark the knowledge embedding precisions: memory per worker and retrieval quality.
+
+Memory: a synthetic embedding matrix is saved at each precision, then
+``--workers`` processes open it at the same time and run exact searches
+over it, the way several Streamlit workers would. Each worker reports how
+much its resident set (RSS) and proportional set size (PSS, shared pages
+split between the processes mapping them) grew. ``private`` is the old
+behaviour: every worker holds its own float32 copy in anonymous memory.
+
+Quality: the knowledge/ documents and a synthetic corpus are searched at
+every precision and compared with float32. The benchmark reports recall@k
+against the float32 top k, and the mean and maximum absolute score error.
+
+Usage:
+    python benchmarks/bench_quantization.py --rows 200000 --workers 4
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from bench_ann import QUERIES, VectorEmbedder, synthetic_corpus  # noqa: E402
+from crewai_knowledge_chatbot.embeddings import get_embedder  # noqa: E402
+from crewai_knowledge_chatbot.knowledge_index import KNOWLEDGE_DIR, KnowledgeIndex, build_index, load_index  # noqa: E402
+from crewai_knowledge_chatbot.quantized import FLOAT32, PRECISIONS, open_embeddings, save_embeddings  # noqa: E402
+
+PRIVATE = "private"
+
+# Runs in a fresh interpreter: open the matrix, search it, wait for every worker, then report memory
+WORKER = """
+import json, sys
+import numpy as np
+sys.path.insert(0, sys.argv[1])
+from crewai_knowledge_chatbot.quantized import FLOAT32, open_embeddings
+
+def memory():
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1].lower()] = int(parts[1]) / 1024
+    return values
+
+directory, mode, queries = sys.argv[2], sys.argv[3], int(sys.argv[4])
+before = memory()
+if mode == "private":
+    embeddings = np.array(open_embeddings(directory, FLOAT32))
+else:
+    embeddings = open_embeddings(directory, mode)
+rng = np.random.default_rng(0)
+for _ in range(queries):
+    query = rng.standard_normal(embeddings.shape[1]).astype(np.float32)
+    scores = embeddings @ query
+    np.argpartition(-scores, 3)[:4]
+print("ready", flush=True)
+sys.stdin.readline()
+after = memory()
+print(json.dumps({key: after[key] - before[key] for key in after}), flush=True)
+sys.stdin.read()
+"""
+
+
+def measure_workers(src, directory, mode, workers, queries):
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, src, directory, mode, str(queries)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        for process in processes:
+            process.stdout.readline()
+        for process in processes:
+            process.stdin.write("\n")
+            process.stdin.flush()
+        reports = [json.loads(process.stdout.readline()) for process in processes]
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+    return {
+        "rss_mb": statistics.mean(report["rss"] for report in reports),
+        "pss_mb": statistics.mean(report["pss"] for report in reports),
+        "total_pss_mb": sum(report["pss"] for report in reports),
+    }
+
+
+def quality(reference, candidate, queries, k, keyword_weight=0.0):
+    recalls = []
+    errors = []
+    for query in queries:
+        expected = {result["id"] for result in reference.search(query, k, keyword_weight, exact=True)}
+        found = {result["id"] for result in candidate.search(query, k, keyword_weight, exact=True)}
+        recalls.append(len(expected & found) / len(expected))
+        errors.append(np.abs(reference.scores(query, keyword_weight) - candidate.scores(query, keyword_weight)))
+    errors = np.concatenate(errors)
+    return {"recall": statistics.mean(recalls), "mean_error": float(errors.mean()), "max_error": float(errors.max())}
+
+
+def with_precision(index, precision, directory):
+    save_embeddings(directory, np.asarray(index.embeddings), precision)
+    quantized = KnowledgeIndex(index.chunks, open_embeddings(directory, precision), index.embedder)
+    quantized._keyword_scorer = index._keyword_scorer
+    return quantized
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--knowledge-dir", default=str(KNOWLEDGE_DIR))
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=20, help="searches per worker, and synthetic quality queries x10")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    results = {"rows": args.rows, "workers": args.workers, "k": args.k, "memory": {}, "quality": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        build_index(args.knowledge_dir, tmp, get_embedder("hashing"), precision=FLOAT32, ann_min_chunks=0)
+        knowledge = load_index(args.knowledge_dir, tmp)
+        knowledge.ann = None
+        vectors, query_vectors = synthetic_corpus(np.asarray(knowledge.embeddings), args.rows, args.queries * 10)
+        chunks = [{"source": "synthetic", "chunk": i, "page": None, "text": ""} for i in range(args.rows)]
+        synthetic = KnowledgeIndex(chunks, vectors, VectorEmbedder(query_vectors))
+        synthetic_queries = [str(i) for i in range(len(query_vectors))]
+
+        for precision in PRECISIONS:
+            directory = os.path.join(tmp, precision)
+            os.mkdir(directory)
+            save_embeddings(directory, vectors, precision)
+            size = open_embeddings(directory, precision).nbytes
+            for mode in ([PRIVATE] if precision == FLOAT32 else []) + [precision]:
+                memory = measure_workers(src, directory, mode, args.workers, args.queries)
+                results["memory"][mode] = dict(memory, file_mb=size / 2**20)
+
+            results["quality"][precision] = {
+                "knowledge_dense": quality(knowledge, with_precision(knowledge, precision, directory), QUERIES, args.k),
+                "knowledge_hybrid": quality(
+                    knowledge, with_precision(knowledge, precision, directory), QUERIES, args.k, keyword_weight=0.3
+                ),
+                "synthetic": quality(
+                    synthetic, with_precision(synthetic, precision, directory), synthetic_queries, args.k
+                ),
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Memory: {args.rows} x {vectors.shape[1]} embeddings, {args.workers} workers searching concurrently")
+    for mode, memory in results["memory"].items():
+        label = "float32 (private copy)" if mode == PRIVATE else f"{mode} (mmap)"
+        print(
+            f"  {label:<24} on disk {memory['file_mb']:6.1f} MB  per worker: RSS +{memory['rss_mb']:6.1f} MB "
+            f"PSS +{memory['pss_mb']:6.1f} MB  all workers PSS {memory['total_pss_mb']:6.1f} MB"
+        )
+    print(f"Quality vs float32 (recall@{args.k}, mean / max absolute score error)")
+    for precision, scores in results["quality"].items():
+        print(f"  {precision}")
+        for name, score in scores.items():
+            print(
+                f"    {name:<18} recall={score['recall']:.3f}  "
+                f"error={score['mean_error']:.2e} / {score['max_error']:.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
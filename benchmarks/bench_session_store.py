@@ -0,0 +1,120 @@
+"""
+Benchmark the SQLite session store at scale.
+
+Fills a fresh database with ``--sessions`` sessions of ``--turns`` turns
+each through SessionStore's batched background writer, and times the same
+number of turns written with one commit per turn for comparison. It then
+times the reads the pages make (rehydrating a session, the summary page's
+statistics, and the latest session for a user) on random sessions, and
+prints each read's query plan to show that none of them scans a table.
+
+Usage:
+    python benchmarks/bench_session_store.py --sessions 20000 --turns 50
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_knowledge_chatbot.session_store import (
+    CHAT,
+    INSERT_TURN,
+    SCHEMA,
+    THERAPY,
+    SessionStore,
+    restore_session_state,
+)
+
+TURN_TEXT = "I have been feeling stressed about work and it is affecting my sleep. " * 3
+
+READ_QUERIES = {
+    "rehydrate": "SELECT phase, role, content FROM turns WHERE session_id = ? ORDER BY created_ns",
+    "stats": "SELECT phase, role, COUNT(*), MIN(created_ns), MAX(created_ns) FROM turns "
+             "WHERE session_id = ? GROUP BY phase, role",
+    "recent sessions": "SELECT session_id FROM sessions WHERE user_id = ? ORDER BY updated_at DESC LIMIT 10",
+}
+
+
+def fill(store, sessions, turns):
+    for session in range(sessions):
+        session_id = f"session-{session}"
+        store.save_session(session_id, f"user-{session % (sessions // 4 or 1)}", {"concerns": ["Stress"]})
+        for turn in range(turns):
+            phase = THERAPY if turn < 8 else CHAT
+            store.append_turn(session_id, phase, "user" if turn % 2 else "assistant", TURN_TEXT)
+    store.flush()
+
+
+def commit_per_turn(path, turns):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    start = time.perf_counter()
+    for turn in range(turns):
+        with connection:
+            connection.execute(INSERT_TURN, ("session-0", time.time_ns(), CHAT, "user", TURN_TEXT))
+    return time.perf_counter() - start
+
+
+def timed(fn, samples):
+    latencies = []
+    for argument in samples:
+        start = time.perf_counter()
+        fn(argument)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-sessions-")
+    store = SessionStore(os.path.join(directory, "sessions.db"))
+    total_turns = args.sessions * args.turns
+
+    start = time.perf_counter()
+    fill(store, args.sessions, args.turns)
+    elapsed = time.perf_counter() - start
+    size_mib = sum(
+        os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+    ) / 2 ** 20
+    print(f"{total_turns} turns in {args.sessions} sessions, {size_mib:.0f} MiB on disk")
+    print(f"  batched writer:   {total_turns / elapsed:10.0f} turns/s ({store.commits} commits)")
+
+    sample_turns = min(total_turns, 2000)
+    per_turn = commit_per_turn(os.path.join(directory, "per_turn.db"), sample_turns)
+    print(f"  commit per turn:  {sample_turns / per_turn:10.0f} turns/s")
+
+    sessions = [f"session-{random.randrange(args.sessions)}" for _ in range(args.reads)]
+    users = [f"user-{random.randrange(args.sessions // 4 or 1)}" for _ in range(args.reads)]
+    print(f"reads on random sessions ({args.reads} each):")
+    for name, fn, samples in (
+        ("rehydrate", lambda session_id: restore_session_state({}, session_id, store), sessions),
+        ("summary stats", store.session_stats, sessions),
+        ("recent sessions", store.recent_sessions, users),
+    ):
+        p50, p95 = timed(fn, samples)
+        print(f"  {name:<16} p50={p50:7.3f}ms p95={p95:7.3f}ms")
+
+    print("query plans:")
+    connection = sqlite3.connect(store.path)
+    for name, query in READ_QUERIES.items():
+        plan = connection.execute("EXPLAIN QUERY PLAN " + query, ("x",)).fetchall()
+        print(f"  {name:<16} " + "; ".join(row[-1] for row in plan))
+
+
+if __name__ == "__main__":
+    main()
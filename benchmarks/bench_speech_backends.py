@@ -0,0 +1,131 @@
+"""
+Benchmark the real-time factor (RTF) of every speech backend.
+
+RTF is processing time divided by audio duration; below 1.0 is faster than
+real time. Speech-to-text backends transcribe the sample clip and
+text-to-speech backends synthesize the sample text. Backends whose
+packages or models are not installed are reported as skipped, and a
+backend whose transcription fails (e.g. google without network access) is
+reported as failed without a timing. A backend that processed the clip
+but recognized no speech is still timed.
+
+Usage:
+    python benchmarks/bench_speech_backends.py --audio sample.wav --repeat 3
+    python benchmarks/bench_speech_backends.py --stt stub whisper --tts stub pyttsx3
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+import wave
+
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_knowledge_chatbot.speech import (
+    MODEL_SAMPLE_RATE,
+    STT_BACKENDS,
+    TTS_BACKENDS,
+    TranscriptionError,
+    UnintelligibleAudioError,
+    pcm16_to_wav,
+)
+
+SAMPLE_TEXT = (
+    "I understand that you have been feeling stressed lately. "
+    "Try keeping a regular sleep schedule and take a few slow breaths before bed. "
+    "Small steps each day can make a real difference."
+)
+
+
+def synthetic_clip(seconds, sample_rate=MODEL_SAMPLE_RATE):
+    """A deterministic speech-like clip: amplitude-modulated tones with pauses."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = (np.sin(2 * np.pi * 2.5 * t) > -0.3).astype(np.float32)
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * envelope
+    return pcm16_to_wav((signal * 32767).astype(np.int16).tobytes(), sample_rate)
+
+
+def audio_duration(audio, audio_format):
+    if audio_format == "audio/wav":
+        with wave.open(io.BytesIO(audio), "rb") as wav:
+            return wav.getnframes() / wav.getframerate()
+    from pydub import AudioSegment
+
+    return len(AudioSegment.from_file(io.BytesIO(audio), format=audio_format.split("/")[1])) / 1000
+
+
+def measure(run, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def bench_stt(names, clip, repeat):
+    duration = audio_duration(clip, "audio/wav")
+    print(f"Speech-to-text on a {duration:.1f}s clip")
+    for name in names:
+        try:
+            backend = STT_BACKENDS[name]()
+        except Exception as e:
+            print(f"  {name:<10} skipped ({e})")
+            continue
+
+        def run():
+            try:
+                return backend.transcribe(clip)
+            except UnintelligibleAudioError:
+                return "<no speech recognized>"
+
+        try:
+            seconds, text = measure(run, repeat)
+        except TranscriptionError as e:
+            print(f"  {name:<10} failed ({type(e).__name__}: {e})")
+            continue
+        print(f"  {name:<10} RTF={seconds / duration:7.3f}  ({seconds * 1000:8.1f} ms)  {text[:50]!r}")
+
+
+def bench_tts(names, text, repeat):
+    print(f"Text-to-speech for {len(text.split())} words")
+    for name in names:
+        try:
+            backend = TTS_BACKENDS[name]()
+            seconds, audio = measure(lambda: backend.synthesize(text), repeat)
+            duration = audio_duration(audio, backend.audio_format)
+        except Exception as e:
+            print(f"  {name:<10} skipped ({e})")
+            continue
+        print(
+            f"  {name:<10} RTF={seconds / duration:7.3f}  ({seconds * 1000:8.1f} ms "
+            f"for {duration:.1f}s of {backend.audio_format})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--audio", help="WAV file to transcribe (default: a synthetic 10s clip)")
+    parser.add_argument("--stt", nargs="*", default=sorted(STT_BACKENDS))
+    parser.add_argument("--tts", nargs="*", default=sorted(TTS_BACKENDS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.audio:
+        with open(args.audio, "rb") as file:
+            clip = file.read()
+    else:
+        clip = synthetic_clip(10)
+
+    bench_stt(args.stt, clip, args.repeat)
+    bench_tts(args.tts, SAMPLE_TEXT, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
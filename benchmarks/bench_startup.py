@@ -0,0 +1,104 @@
+"""
+Benchmark the cold-start time of every page.
+
+Each page is rendered once with streamlit.testing's AppTest in a fresh
+Python process, so the time includes importing everything the page pulls
+in. Streamlit's own import is measured separately and not included. The
+heavy third-party modules that ended up loaded are listed for each page.
+
+``--root`` points at the project checkout to measure, which makes it easy to
+compare against an older revision:
+
+    git worktree add /tmp/before <commit>
+    python benchmarks/bench_startup.py --root /tmp/before
+    python benchmarks/bench_startup.py
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PAGES = [
+    "app.py",
+    "pages/1_user_input.py",
+    "pages/2_therapy_session.py",
+    "pages/3_chatbot.py",
+    "pages/4_session_summary.py",
+]
+
+HEAVY_MODULES = ["crewai", "litellm", "audiorecorder", "pydub", "pandas", "numpy", "mem0", "gtts", "speech_recognition"]
+
+# Runs in a fresh interpreter; prints one JSON line
+PROBE = """
+import json, os, sys, time
+root, page, heavy = sys.argv[1], sys.argv[2], sys.argv[3].split(",")
+sys.path.insert(0, root)
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_ms = (time.perf_counter() - start) * 1000
+at = AppTest.from_file(os.path.join(root, page), default_timeout=120)
+start = time.perf_counter()
+at.run()
+page_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({
+    "streamlit_ms": streamlit_ms,
+    "page_ms": page_ms,
+    "exception": [str(e.value) for e in at.exception],
+    "loaded": [module for module in heavy if module in sys.modules],
+}))
+"""
+
+
+def probe(root, page):
+    env = dict(
+        os.environ,
+        OTEL_SDK_DISABLED="true",
+        CREWAI_DISABLE_TELEMETRY="true",
+        OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-benchmark"),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, root, page, ",".join(HEAVY_MODULES)],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--root", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    results = {}
+    for page in PAGES:
+        runs = [probe(root, page) for _ in range(args.repeat)]
+        results[page] = {
+            "page_ms": round(statistics.median(run["page_ms"] for run in runs), 1),
+            "streamlit_ms": round(statistics.median(run["streamlit_ms"] for run in runs), 1),
+            "loaded": runs[-1]["loaded"],
+            "exception": runs[-1]["exception"],
+        }
+
+    if args.json:
+        print(json.dumps({"root": root, "pages": results}, indent=2))
+        return
+
+    print(f"Cold start per page for {root} (median of {args.repeat}, streamlit import excluded)")
+    for page, result in results.items():
+        error = f"  ERROR {result['exception'][0][:60]}" if result["exception"] else ""
+        print(f"  {page:<28} {result['page_ms']:8.0f} ms  loads: {', '.join(result['loaded']) or '-'}{error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark time-to-first-audio of voice replies: whole-reply vs sentence-pipelined TTS.
+
+A reply is streamed word by word at ``--tokens-per-s``, like the chatbot's
+token stream. ``before`` waits for the whole reply and synthesizes it in
+one call, as the voice branch of the chatbot page used to. ``after`` feeds
+the stream into a SpeechPipeline, which synthesizes each sentence in the
+TTS pool as soon as it is complete. The TTS backend is simulated with a
+fixed cost per request plus a cost per character (defaults approximate
+gTTS, which makes one HTTP request per ~100 characters), or ``--backend``
+runs a real one. Reported per reply: time to first audio (when playback can
+start) and time until all audio is ready, both measured from the first
+token.
+
+Usage:
+    python benchmarks/bench_tts_pipeline.py --tokens-per-s 30 --workers 4
+    python benchmarks/bench_tts_pipeline.py --backend gtts
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from crewai_knowledge_chatbot.speech import get_tts_backend, pcm16_to_wav  # noqa: E402
+from crewai_knowledge_chatbot.speech_pipeline import SpeechPipeline  # noqa: E402
+
+REPLIES = [
+    "I hear how exhausting this week has been, and it makes sense that you feel drained. "
+    "When your thoughts start racing at night, try breathing in for four counts and out for six. "
+    "It can also help to write down tomorrow's worries before bed, so they are not circling in your head. "
+    "Keep your phone out of reach for the last half hour of the evening. "
+    "If the sleeplessness continues for a few weeks, it is worth mentioning to your doctor. "
+    "You are doing a lot already by noticing what you need.",
+    "It sounds like the conflict with your manager is weighing on you. "
+    "Before your next conversation, note two or three concrete points you want them to hear. "
+    "Starting with what you agree on can make the rest easier to discuss. "
+    "Afterwards, give yourself a few minutes to decompress before the next task. "
+    "Would it help to plan that conversation together?",
+    "Feeling lonely after a move is very common, and it does not mean something is wrong with you. "
+    "Small, regular contact tends to help more than big plans. "
+    "Is there one person you could message today, even just to say hello? "
+    "Local groups around something you enjoy are another gentle way to meet people. "
+    "Be patient with yourself while new routines take shape.",
+]
+
+
+def simulated_backend(request_ms, ms_per_char, chars_per_request):
+    def synthesize(text):
+        requests = max(1, -(-len(text) // chars_per_request))
+        time.sleep((requests * request_ms + len(text) * ms_per_char) / 1000)
+        return pcm16_to_wav(b"\0\0" * len(text))
+    return synthesize
+
+
+def stream_words(text, tokens_per_s):
+    words = text.split(" ")
+    for position, word in enumerate(words):
+        time.sleep(1 / tokens_per_s)
+        yield word if position == len(words) - 1 else word + " "
+
+
+def before(reply, synthesize, tokens_per_s):
+    start = time.perf_counter()
+    text = "".join(stream_words(reply, tokens_per_s))
+    synthesize(text)
+    ready = time.perf_counter() - start
+    return ready, ready
+
+
+def after(reply, synthesize, tokens_per_s, executor):
+    start = time.perf_counter()
+    pipeline = SpeechPipeline(synthesize, executor)
+    # Measure from the first token, like before(); the pipeline's own clock starts at creation
+    first_audio = None
+    for chunk in stream_words(reply, tokens_per_s):
+        pipeline.feed(chunk)
+        if first_audio is None and pipeline.ready():
+            first_audio = time.perf_counter() - start
+    pipeline.close()
+    for _ in pipeline:
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+    return first_audio, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens-per-s", type=float, default=30.0, help="streamed words per second")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--request-ms", type=float, default=250.0, help="simulated TTS cost per request")
+    parser.add_argument("--ms-per-char", type=float, default=1.0, help="simulated TTS cost per character")
+    parser.add_argument("--chars-per-request", type=int, default=100)
+    parser.add_argument("--backend", default=None, help="use a real TTS backend (e.g. gtts, stub) instead")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    if args.backend:
+        synthesize = get_tts_backend(args.backend).synthesize
+    else:
+        synthesize = simulated_backend(args.request_ms, args.ms_per_char, args.chars_per_request)
+
+    results = {"before": [], "after": []}
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="tts") as executor:
+        for reply in REPLIES:
+            results["before"].append(before(reply, synthesize, args.tokens_per_s))
+            results["after"].append(after(reply, synthesize, args.tokens_per_s, executor))
+
+    summary = {
+        name: {
+            "first_audio_s": statistics.median(first for first, _ in runs),
+            "all_audio_s": statistics.median(total for _, total in runs),
+        }
+        for name, runs in results.items()
+    }
+    if args.json:
+        print(json.dumps({"settings": vars(args), "replies": results, "median": summary}, indent=2))
+        return
+
+    backend = args.backend or (
+        f"simulated ({args.request_ms:.0f} ms/request of {args.chars_per_request} chars + {args.ms_per_char} ms/char)"
+    )
+    print(f"{len(REPLIES)} replies streamed at {args.tokens_per_s:.0f} words/s, {args.workers} TTS workers, {backend}")
+    for name, stats in summary.items():
+        print(f"  {name:<7} time to first audio {stats['first_audio_s']:6.2f}s   all audio ready {stats['all_audio_s']:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
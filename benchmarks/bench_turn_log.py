@@ -0,0 +1,94 @@
+"""
+Benchmark per-session memory and per-rerun string building of the turn log.
+
+"lists" keeps every turn the way the pages used to: a message dict plus a
+formatted "Speaker: text" string per turn (and a third reference in the
+therapy session data), re-joining the therapy transcript on every rerun
+that builds the chatbot context. "turn log" keeps one TurnLog per
+conversation and derives the same views from it.
+
+Usage:
+    python benchmarks/bench_turn_log.py --therapy-turns 8 --chat-turns 60
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_knowledge_chatbot.turn_log import TurnLog
+
+TEXT = "I have been feeling stressed about work lately and it is starting to affect my sleep. " * 3
+
+
+def build_lists(therapy_turns, chat_turns):
+    state = {"therapy_messages": [], "therapy_transcript": [], "messages": [], "chat_history": []}
+    for turn in range(therapy_turns):
+        role = "assistant" if turn % 2 == 0 else "user"
+        text = f"{turn} {TEXT}"
+        state["therapy_messages"].append({"role": role, "content": text})
+        state["therapy_transcript"].append(f"{'Therapist' if role == 'assistant' else 'User'}: {text}")
+    state["therapy_session_data"] = {"transcript": state["therapy_transcript"]}
+    for turn in range(chat_turns):
+        role = "user" if turn % 2 == 0 else "assistant"
+        text = f"{turn} {TEXT}"
+        state["messages"].append({"role": role, "content": text})
+        state["chat_history"].append(f"{'User' if role == 'user' else 'Assistant'}: {text}")
+    return state
+
+
+def build_logs(therapy_turns, chat_turns):
+    therapy_log = TurnLog(labels={"user": "User", "assistant": "Therapist"})
+    for turn in range(therapy_turns):
+        therapy_log.append("assistant" if turn % 2 == 0 else "user", f"{turn} {TEXT}")
+    chat_log = TurnLog()
+    for turn in range(chat_turns):
+        chat_log.append("user" if turn % 2 == 0 else "assistant", f"{turn} {TEXT}")
+    return {"therapy_log": therapy_log, "therapy_session_data": {"transcript": therapy_log}, "chat_log": chat_log}
+
+
+def session_bytes(build, therapy_turns, chat_turns, sessions=200):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    states = [build(therapy_turns, chat_turns) for _ in range(sessions)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del states
+    return used / sessions
+
+
+def rerun_lists(state):
+    # What every context build did: join the transcript and tuple it for the cache key
+    transcript = state["therapy_session_data"]["transcript"]
+    return tuple(transcript), "\n".join(transcript)
+
+
+def rerun_logs(state):
+    return state["therapy_log"].transcript()
+
+
+def per_rerun_us(fn, state, repeats=20000):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(state)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--therapy-turns", type=int, default=8)
+    parser.add_argument("--chat-turns", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{args.therapy_turns} therapy turns and {args.chat_turns} chat turns per session")
+    for name, build, rerun in (("lists", build_lists, rerun_lists), ("turn log", build_logs, rerun_logs)):
+        size = session_bytes(build, args.therapy_turns, args.chat_turns)
+        state = build(args.therapy_turns, args.chat_turns)
+        print(f"  {name:<9} {size / 1024:8.1f} KiB/session   transcript per rerun {per_rerun_us(rerun, state):6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
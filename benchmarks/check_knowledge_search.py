@@ -0,0 +1,113 @@
+"""
+Check KnowledgeSearchTool's hybrid ranking and top_k limit offline.
+
+A small in-memory index is embedded with the deterministic hashing
+embedder, so the expected rankings are stable across machines and need no
+API key. The query shares common words ("stress", "work") with a long
+passage about workload and a rare word ("hypnagogia") with one other
+passage. Vector search alone ranks the workload passage ahead of it; with
+the tool's BM25 blend the rare keyword match must move up into the top
+``top_k``. The tool must return exactly ``top_k`` passages, ordered by the
+blended score ``(1 - keyword_weight) * cosine + keyword_weight * bm25``.
+Exits with status 1 if any check fails.
+
+Usage:
+    python benchmarks/check_knowledge_search.py
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from crewai_knowledge_chatbot.embeddings import HashingEmbedder  # noqa: E402
+from crewai_knowledge_chatbot.knowledge_index import KnowledgeIndex  # noqa: E402
+from crewai_knowledge_chatbot.tools.knowledge_search_tool import KnowledgeSearchTool  # noqa: E402
+
+PASSAGES = {
+    "workload.txt": "Work stress builds up when work keeps piling on. Work stress at work is common.",
+    "hypnagogia.txt": "Hypnagogia is the drowsy state between waking and sleep, sometimes mistaken for anxiety.",
+    "panic.txt": "Breathing slowly for a few minutes can calm a racing heart during a panic attack.",
+    "manager.txt": "Talking to a manager about workload and stress can make work feel more manageable.",
+    "sleep.txt": "A regular sleep routine and less screen time in the evening improve rest.",
+    "grounding.txt": "Grounding techniques bring attention back to the present moment.",
+}
+QUERY = "waking with hypnagogia and stress at work"
+
+
+def build_test_index():
+    embedder = HashingEmbedder()
+    chunks = [{"source": name, "chunk": 0, "page": 1, "text": text} for name, text in PASSAGES.items()]
+    return KnowledgeIndex(chunks, embedder.embed(list(PASSAGES.values())), embedder)
+
+
+def passage_ids(output):
+    """Passage ids in the order the tool rendered them."""
+    return re.findall(r"^\[([^\]]+)\] \(score", output, flags=re.MULTILINE)
+
+
+def run_checks():
+    index = build_test_index()
+    tool = KnowledgeSearchTool(index=index, top_k=2)
+    checks = []
+
+    def check(name, passed, detail):
+        checks.append({"check": name, "passed": bool(passed), "detail": detail})
+
+    vector_only = [result["id"] for result in index.search(QUERY, limit=tool.top_k)]
+    check(
+        "vector search alone misses the keyword match",
+        "hypnagogia.txt#0" not in vector_only,
+        vector_only,
+    )
+
+    hybrid = passage_ids(tool._run(QUERY))
+    check("tool returns top_k passages", len(hybrid) == tool.top_k, hybrid)
+    check("hybrid ranking promotes the keyword match", hybrid == ["workload.txt#0", "hypnagogia.txt#0"], hybrid)
+
+    results = index.search(QUERY, limit=len(PASSAGES), keyword_weight=tool.keyword_weight)
+    cosine = index.embeddings @ index.embedder.embed([QUERY])[0]
+    keyword = index.keyword_scorer.normalized_scores(QUERY)
+    expected = (1 - tool.keyword_weight) * cosine + tool.keyword_weight * keyword
+    names = list(PASSAGES)
+    ranked = [names.index(result["id"].split("#")[0]) for result in results]
+    scores = [result["score"] for result in results]
+    check(
+        "scores are the documented blend, best first",
+        np.allclose(scores, expected[ranked], atol=1e-5) and scores == sorted(scores, reverse=True),
+        [(result["id"], round(result["score"], 4)) for result in results],
+    )
+
+    everything = passage_ids(KnowledgeSearchTool(index=index, top_k=len(PASSAGES) + 5)._run(QUERY))
+    check(
+        "top_k above the index size returns every passage once",
+        sorted(everything) == sorted(f"{name}#0" for name in PASSAGES),
+        everything,
+    )
+
+    rebuilt = KnowledgeSearchTool(index=build_test_index(), top_k=tool.top_k)
+    check("output is deterministic", tool._run(QUERY) == rebuilt._run(QUERY), QUERY)
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    checks = run_checks()
+    if args.json:
+        print(json.dumps(checks, indent=2))
+    else:
+        for result in checks:
+            print(f"  {'ok  ' if result['passed'] else 'FAIL'} {result['check']}: {result['detail']}")
+    if not all(result["passed"] for result in checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
 import streamlit as st
+import sys
+import os
+import uuid
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_knowledge_chatbot.session_store import resume_session, save_session_state
+from src.crewai_knowledge_chatbot.warmup import format_initial_context, start_crew_preload, start_first_question
 
 st.set_page_config(
     page_title="User Information",
@@ -6,12 +15,25 @@ st.set_page_config(
     layout="wide",
 )
 
+# Restore the session named in the URL if the server lost it
+resume_session(st.session_state, st.query_params)
+
 st.title("Step 1: Tell Us About Yourself")
 st.markdown("Please provide some basic information to help personalize your experience.")
 
+@st.cache_resource
+def preload_crews():
+    """Import crewai and build the therapy crew once per process while the form is filled in"""
+    return start_crew_preload("therapy_crew")
+
+preload_crews()
+
 # Initialize session state for user data
 if 'user_data' not in st.session_state:
     st.session_state.user_data = {}
+# Each user gets their own memory partition
+if 'user_id' not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
 
 with st.form("user_info_form"):
     st.subheader("Personal Information")
@@ -69,6 +91,19 @@ with st.form("user_info_form"):
         }
         
         st.session_state.form_submitted = True
+        
+        # Persist the session so it survives restarts and dropped connections
+        save_session_state(st.session_state)
+        
+        # Start generating the first therapy question while the next page loads
+        if not st.session_state.get('therapy_log'):
+            previous = st.session_state.pop('pending_question', None)
+            if previous is not None:
+                previous.cancel()
+            st.session_state.initial_context = format_initial_context(st.session_state.user_data)
+            st.session_state.pending_question = start_first_question(
+                st.session_state.user_data, user_id=st.session_state.user_id
+            )
         st.success("Information saved! Redirecting to therapy session...")
         
         # Navigate to therapy session page
@@ -1,15 +1,25 @@
 import streamlit as st
 import sys
 import os
-from mem0 import MemoryClient
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.crewai_knowledge_chatbot.crew import CrewaiKnowledgeChatbot
+from src.crewai_knowledge_chatbot.memory import get_memory_writer
+from src.crewai_knowledge_chatbot.service import ask_therapist, get_crew_service
+from src.crewai_knowledge_chatbot.session_store import (
+    THERAPY,
+    get_session_store,
+    resume_session,
+    save_session_state,
+)
+from src.crewai_knowledge_chatbot.turn_log import TurnLog
+from src.crewai_knowledge_chatbot.warmup import format_initial_context, start_chatbot_warmup
 
-# Initialize memory client
-client = MemoryClient()
+# How long each script run waits on a pending question before rerunning
+POLL_INTERVAL = 0.5
 
 st.set_page_config(
     page_title="Therapy Session",
@@ -18,19 +28,27 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
+# Restore the session named in the URL if the server lost it
+resume_session(st.session_state, st.query_params)
+
+THERAPY_COMPLETE_MESSAGE = (
+    "Thank you for sharing with me. I now have a better understanding of your situation. "
+    "Let's proceed to get you the support you need."
+)
+
 # Initialize session state
-if 'therapy_messages' not in st.session_state:
-    st.session_state.therapy_messages = []
+if 'therapy_log' not in st.session_state:
+    st.session_state.therapy_log = TurnLog(labels={"user": "User", "assistant": "Therapist"})
 if 'therapy_complete' not in st.session_state:
     st.session_state.therapy_complete = False
 if 'current_question' not in st.session_state:
     st.session_state.current_question = None
 if 'question_count' not in st.session_state:
     st.session_state.question_count = 0
-if 'therapy_transcript' not in st.session_state:
-    st.session_state.therapy_transcript = []
 if 'initial_context' not in st.session_state:
     st.session_state.initial_context = None
+if 'user_id' not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
 
 # Check if user has completed basic info
 if 'user_data' not in st.session_state or not st.session_state.user_data:
@@ -41,48 +59,58 @@ else:
     st.title("Therapy Session")
     st.markdown("I'd like to understand your situation better. Please take your time answering these questions.")
 
+    # Sessions started before the profile was saved (e.g. after "Start New Session") get an id here
+    if 'session_id' not in st.session_state:
+        save_session_state(st.session_state)
+
     # Create initial context if not already created
     if st.session_state.initial_context is None:
-        user_data = st.session_state.user_data
-        st.session_state.initial_context = f"""
-        User Profile:
-        - Name: {user_data.get('name', 'Not provided')}
-        - Age Group: {user_data.get('age_group', 'Not provided')}
-        - Current Mood: {user_data.get('mood', 'Not provided')}
-        - Concerns: {', '.join(user_data.get('concerns', [])) or 'None'}
-        - Additional Info: {user_data.get('additional_info', 'None')}
-        """
+        st.session_state.initial_context = format_initial_context(st.session_state.user_data)
 
     # Display chat messages
-    for message in st.session_state.therapy_messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-
-    # Generate first question if not already done
-    if st.session_state.question_count == 0 and not st.session_state.current_question:
-        # Generate first question
-        with st.spinner("Preparing questions..."):
+    for turn in st.session_state.therapy_log:
+        with st.chat_message(turn.role):
+            st.markdown(turn.text)
+    if st.session_state.therapy_complete:
+        with st.chat_message("assistant"):
+            st.markdown(THERAPY_COMPLETE_MESSAGE)
+
+    # Generate the first question if not already done (or already started when the profile was
+    # saved), or the next one if the session was restored after an answer
+    if (not st.session_state.therapy_complete and not st.session_state.current_question
+            and 'pending_question' not in st.session_state):
+        st.session_state.pending_question = get_crew_service().submit(
+            ask_therapist(
+                st.session_state.initial_context,
+                st.session_state.therapy_log.transcript(),
+                st.session_state.question_count + 1,
+                st.session_state.user_id,
+            )
+        )
+
+    # Poll the crew service for the pending question, rerunning until it is ready
+    pending_question = st.session_state.get('pending_question')
+    if pending_question is not None:
+        question, error = None, None
+        with st.spinner("Preparing questions..." if st.session_state.question_count == 0 else "Thinking..."):
             try:
-                crew_instance = CrewaiKnowledgeChatbot().therapy_crew()
-                inputs = {
-                    "user_context": st.session_state.initial_context,
-                    "conversation_history": "",
-                    "question_number": "1"
-                }
-                result = crew_instance.kickoff(inputs=inputs)
-                
-                # Extract the question from the result
-                if hasattr(result, 'raw'):
-                    question = result.raw
-                else:
-                    question = str(result)
-                
-                st.session_state.current_question = question
-                st.session_state.therapy_messages.append({"role": "assistant", "content": question})
-                st.session_state.therapy_transcript.append(f"Therapist: {question}")
+                question = pending_question.result(timeout=POLL_INTERVAL)
+            except FutureTimeoutError:
                 st.rerun()
             except Exception as e:
-                st.error(f"Error generating question: {e}")
+                error = e
+        del st.session_state.pending_question
+        if error is not None:
+            st.error(f"Error generating question: {error}")
+        else:
+            st.session_state.current_question = question
+            st.session_state.therapy_log.append("assistant", question)
+            get_session_store().append_turn(st.session_state.session_id, THERAPY, "assistant", question)
+            st.rerun()
+
+    # Warm up the chatbot while the user answers the questions
+    if st.session_state.current_question and 'chatbot_warmup' not in st.session_state:
+        st.session_state.chatbot_warmup = start_chatbot_warmup(st.session_state.user_data.get('concerns', []))
 
     # Display input field if there's a current question
     if st.session_state.current_question and not st.session_state.therapy_complete:
@@ -90,11 +118,11 @@ else:
         
         if user_response:
             # Add user response to messages
-            st.session_state.therapy_messages.append({"role": "user", "content": user_response})
-            st.session_state.therapy_transcript.append(f"User: {user_response}")
+            st.session_state.therapy_log.append("user", user_response)
+            get_session_store().append_turn(st.session_state.session_id, THERAPY, "user", user_response)
             
-            # Store in memory
-            client.add(user_response, user_id="User")
+            # Store in memory (written in the background)
+            get_memory_writer().submit(user_response, user_id=st.session_state.user_id)
             
             # Increment question count
             st.session_state.question_count += 1
@@ -103,42 +131,28 @@ else:
             if st.session_state.question_count >= 4:
                 st.session_state.therapy_complete = True
                 
+                # Make sure all therapy answers are stored before the chat starts
+                get_memory_writer().flush(timeout=10)
+                
                 # Store the complete therapy session in session state
                 st.session_state.therapy_session_data = {
-                    "transcript": st.session_state.therapy_transcript,
+                    "transcript": st.session_state.therapy_log,
                     "user_data": st.session_state.user_data,
                     "timestamp": os.environ.get('CURRENT_TIMESTAMP', 'Unknown')
                 }
-                
-                st.session_state.therapy_messages.append({
-                    "role": "assistant", 
-                    "content": "Thank you for sharing with me. I now have a better understanding of your situation. Let's proceed to get you the support you need."
-                })
+                save_session_state(st.session_state)
                 st.rerun()
             else:
-                # Generate next question
-                with st.spinner("Thinking..."):
-                    try:
-                        crew_instance = CrewaiKnowledgeChatbot().therapy_crew()
-                        conversation_history = "\n".join(st.session_state.therapy_transcript)
-                        inputs = {
-                            "user_context": st.session_state.initial_context,
-                            "conversation_history": conversation_history,
-                            "question_number": str(st.session_state.question_count + 1)
-                        }
-                        result = crew_instance.kickoff(inputs=inputs)
-                        
-                        if hasattr(result, 'raw'):
-                            question = result.raw
-                        else:
-                            question = str(result)
-                        
-                        st.session_state.current_question = question
-                        st.session_state.therapy_messages.append({"role": "assistant", "content": question})
-                        st.session_state.therapy_transcript.append(f"Therapist: {question}")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error generating next question: {e}")
+                # Generate next question on the crew service; it is picked up above on rerun
+                st.session_state.pending_question = get_crew_service().submit(
+                    ask_therapist(
+                        st.session_state.initial_context,
+                        st.session_state.therapy_log.transcript(),
+                        st.session_state.question_count + 1,
+                        st.session_state.user_id,
+                    )
+                )
+                st.rerun()
 
     # Show completion options
     if st.session_state.therapy_complete:
@@ -157,7 +171,7 @@ else:
                     st.markdown(f"**Concerns:** {', '.join(user_data.get('concerns', [])) or 'None'}")
                     
                     st.markdown("### Therapy Session Transcript")
-                    for entry in st.session_state.therapy_transcript:
+                    for entry in st.session_state.therapy_log.lines():
                         st.markdown(entry)
         
         with col2:
@@ -2,21 +2,35 @@ import streamlit as st
 import sys
 import os
 from dotenv import load_dotenv
-import speech_recognition as sr
-from gtts import gTTS
-import tempfile
-import io
-from io import BytesIO
-import base64
+import json
 import streamlit.components.v1 as components
 import time
-from audiorecorder import audiorecorder
+import uuid
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import your CrewAI chatbot
-from src.crewai_knowledge_chatbot.crew import CrewaiKnowledgeChatbot
+# Import the CrewAI chatbot
+from src.crewai_knowledge_chatbot.chatbot import get_chatbot_mode, stream_chatbot
+from src.crewai_knowledge_chatbot.context_window import ContextWindow
+from src.crewai_knowledge_chatbot.metrics import get_metrics
+from src.crewai_knowledge_chatbot.audio_cache import get_audio_cache
+from src.crewai_knowledge_chatbot.audio_server import audio_server_enabled, audio_url
+from src.crewai_knowledge_chatbot.memory import get_memory_writer
+from src.crewai_knowledge_chatbot.response_cache import get_response_cache, response_scope
+from src.crewai_knowledge_chatbot.session_store import CHAT, get_session_store, resume_session
+from src.crewai_knowledge_chatbot.turn_log import TurnLog
+from src.crewai_knowledge_chatbot.tracing import is_enabled as tracing_enabled, span, trace, waterfall
+from src.crewai_knowledge_chatbot.speech import (
+    TranscriptionError,
+    UnintelligibleAudioError,
+    audio_fingerprint,
+    get_stt_backend,
+    get_tts_backend,
+    join_clips,
+    to_wav_bytes,
+)
+from src.crewai_knowledge_chatbot.speech_pipeline import SpeechPipeline, get_tts_executor, split_sentences
 
 # Load environment variables
 load_dotenv()
@@ -28,47 +42,8 @@ st.set_page_config(
     layout="wide",
 )
 
-# Add JavaScript for better autoplay support
-st.markdown("""
-<script>
-// Function to enable audio autoplay
-function enableAudioAutoplay() {
-    // Create an AudioContext
-    if (typeof window.audioContext === 'undefined') {
-        window.audioContext = new (window.AudioContext || window.webkitAudioContext)();
-    }
-    
-    // Resume the audio context on user interaction
-    document.addEventListener('click', function() {
-        if (window.audioContext.state !== 'running') {
-            window.audioContext.resume();
-        }
-    }, { once: true });
-}
-
-// Function to play audio
-function playAudio(audioId) {
-    const audio = document.getElementById(audioId);
-    if (audio) {
-        // Try to play with a promise
-        const playPromise = audio.play();
-        
-        if (playPromise !== undefined) {
-            playPromise.then(() => {
-                console.log('Audio playback started successfully');
-            }).catch((error) => {
-                console.log('Audio playback failed:', error);
-                // Fallback: show the audio controls
-                audio.controls = true;
-            });
-        }
-    }
-}
-
-// Enable autoplay when the page loads
-window.addEventListener('load', enableAudioAutoplay);
-</script>
-""", unsafe_allow_html=True)
+# Restore the session named in the URL if the server lost it
+resume_session(st.session_state, st.query_params)
 
 # Add CSS
 st.markdown("""
@@ -119,10 +94,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+if "chat_log" not in st.session_state:
+    st.session_state.chat_log = TurnLog()
 if "voice_mode" not in st.session_state:
     st.session_state.voice_mode = False
 if "last_audio_input" not in st.session_state:
@@ -131,157 +104,191 @@ if "processed_audio" not in st.session_state:
     st.session_state.processed_audio = True
 if "user_has_interacted" not in st.session_state:
     st.session_state.user_has_interacted = False
+if "context_window" not in st.session_state:
+    st.session_state.context_window = ContextWindow()
+if "user_id" not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
+if "use_response_cache" not in st.session_state:
+    st.session_state.use_response_cache = True
+
+# Stop generating therapy questions the user navigated away from
+if "pending_question" in st.session_state:
+    st.session_state.pop("pending_question").cancel()
 
 # Audio helper functions
+def get_audiorecorder():
+    """The recorder component, imported on first use since it pulls in pydub"""
+    from audiorecorder import audiorecorder
+    return audiorecorder
+
 def transcribe_audio(audio_bytes):
-    """Convert audio bytes to text using speech recognition"""
+    """Convert audio to text using the configured speech-to-text backend"""
     try:
-        recognizer = sr.Recognizer()
-        
-        # Create a temporary file with the audio data
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-            # If audio_bytes is already bytes, write directly
-            if isinstance(audio_bytes, bytes):
-                temp_audio.write(audio_bytes)
-            # If it's a BytesIO object, get the value
-            elif isinstance(audio_bytes, BytesIO):
-                temp_audio.write(audio_bytes.getvalue())
-            # If it's an AudioSegment, export to the temp file
-            elif hasattr(audio_bytes, 'export'):
-                audio_bytes.export(temp_audio.name, format='wav')
-            else:
-                temp_audio.write(audio_bytes)
-            
-            temp_audio_path = temp_audio.name
-        
-        # Convert audio file to text using Google Speech Recognition
-        with sr.AudioFile(temp_audio_path) as source:
-            # Adjust for ambient noise
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio_data = recognizer.record(source)
-            text = recognizer.recognize_google(audio_data)
-        
-        # Clean up temporary file
-        os.unlink(temp_audio_path)
-        
-        return text
-    except sr.UnknownValueError:
+        with span("stt", backend=get_stt_backend().name):
+            return get_stt_backend().transcribe(audio_bytes)
+    except UnintelligibleAudioError:
         return "Sorry, I couldn't understand the audio."
-    except sr.RequestError as e:
+    except TranscriptionError as e:
         return f"Sorry, there was an error with the speech recognition service: {str(e)}"
     except Exception as e:
         return f"Error transcribing audio: {str(e)}"
 
 def text_to_speech(text):
-    """Convert text to speech audio"""
-    try:
-        # Ensure text is a string
-        if not isinstance(text, str):
-            text = str(text)
-        
-        tts = gTTS(text=text, lang='en', slow=False)
-        
-        # Create a BytesIO object to store the audio
-        audio_buffer = BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
-        
-        return audio_buffer.getvalue()
-    except Exception as e:
-        st.error(f"Error generating speech: {str(e)}")
-        return None
+    """Convert text to speech audio sentence by sentence, reusing previously synthesized sentences"""
+    # Ensure text is a string
+    if not isinstance(text, str):
+        text = str(text)
+    
+    with span("tts", backend=get_tts_backend().name):
+        try:
+            clips = list(get_tts_executor().map(synthesize_sentence, split_sentences(text)))
+        except Exception as e:
+            st.error(f"Error generating speech: {str(e)}")
+            return None
+    return join_clips(clips, get_tts_backend().audio_format) or None
+
+def synthesize_sentence(sentence):
+    """Synthesize one sentence, reusing earlier audio for the same sentence (runs in the TTS pool)"""
+    backend = get_tts_backend()
+    return get_audio_cache().get_or_create(sentence, backend.synthesize, voice=backend.name)
+
+# Plays queued clips back to back. The player lives in the parent page, so it
+# keeps playing when Streamlit reruns and removes the component that queued a clip.
+VOICE_PLAYER_SCRIPT = """
+function enqueueVoiceClip(src) {
+    let host = window;
+    try {
+        host = window.parent;
+        host.document;
+    } catch (error) {
+        host = window;
+    }
+    if (!host.voiceReplyPlayer) {
+        host.voiceReplyPlayer = new host.Function(`
+            const queue = [];
+            let playing = false;
+            function playNext() {
+                if (playing || !queue.length) return;
+                playing = true;
+                const audio = new Audio(queue.shift());
+                audio.onended = audio.onerror = function() { playing = false; playNext(); };
+                audio.play().catch(function(error) {
+                    console.log('Audio playback failed:', error);
+                    playing = false;
+                    playNext();
+                });
+            }
+            return { enqueue: function(src) { queue.push(src); playNext(); } };
+        `)();
+    }
+    host.voiceReplyPlayer.enqueue(src);
+}
+"""
 
 def create_autoplay_audio(audio_bytes):
-    """Create an HTML audio element with autoplay capabilities"""
-    # Convert audio to base64
-    audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-    
-    # Generate a unique ID for this audio element
-    audio_id = f"audio_{int(time.time() * 1000)}"
+    """Create an HTML snippet that queues a clip on the page's voice player, after any clip still playing"""
+    # Only the clip's URL goes over the websocket; the browser fetches (and caches) the audio itself
+    source = json.dumps(audio_url(audio_bytes, get_tts_backend().audio_format))
+    return f"<script>{VOICE_PLAYER_SCRIPT}\nenqueueVoiceClip({source});</script>"
+
+def render_audio_player(audio_bytes):
+    """Show an audio player for a clip, referenced by URL when the audio server is enabled"""
+    audio_format = get_tts_backend().audio_format
+    st.audio(audio_url(audio_bytes, audio_format) if audio_server_enabled() else audio_bytes, format=audio_format)
+
+def render_chat_message(role, content):
+    """Create the HTML for a single chat message bubble"""
+    avatar = "💭" if role == "user" else "🤖"
+    avatar_class = "user-avatar" if role == "user" else "assistant-avatar"
+    message_class = "user" if role == "user" else "assistant"
     
-    # Create the HTML with autoplay
-    audio_html = f"""
-    <audio id="{audio_id}" style="display: none;">
-        <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
-    </audio>
-    <script>
-        // Wait for the audio element to be ready
-        setTimeout(function() {{
-            playAudio('{audio_id}');
-        }}, 100);
-    </script>
+    return f"""
+    <div class="chat-message {message_class}">
+        <div class="avatar {avatar_class}">{avatar}</div>
+        <div class="content">
+            <p class="chat-message-text">{content}</p>
+        </div>
+    </div>
     """
-    
-    return audio_html
 
-def process_message(user_input):
-    """Process user input through the chatbot"""
-    # Add user message to chat
-    st.session_state.messages.append({"role": "user", "content": user_input})
-    st.session_state.chat_history.append(f"User: {user_input}")
+def process_message(user_input, placeholder, use_cache=None, on_text=None):
+    """
+    Process user input through the chatbot.
+    The response is streamed into the placeholder as it is generated,
+    and on_text (if given) is called with each piece of text as it arrives.
+    The crew is cancelled if the script stops first, e.g. when the user navigates away.
+    Answers to similar earlier questions from this user are reused unless
+    use_cache is False (defaults to the sidebar setting).
+    """
+    if use_cache is None:
+        use_cache = st.session_state.use_response_cache
+
+    with trace("chat turn", mode=get_chatbot_mode()) as turn_span:
+        # Add user message to chat, and persist it before the crew runs so a failed
+        # or interrupted answer does not lose it
+        st.session_state.chat_log.append("user", user_input)
+        session_store = get_session_store()
+        session_store.append_turn(st.session_state.session_id, CHAT, "user", user_input)
     
-    # Prepare comprehensive context
-    full_context = ""
+        # Prepare context within the token budget: the profile/therapy preamble
+        # is only re-rendered when it changes, and older turns are summarized
+        context_window = st.session_state.context_window
+        with span("context.build"):
+            context_window.set_preamble(
+                st.session_state.get('user_data'),
+                st.session_state.get('therapy_session_data', {}).get('transcript', []),
+            )
+            context_window.add_turn("User", user_input)
+            full_context = context_window.render()
+        st.session_state.context_tokens = context_window.token_report()
     
-    # Add user profile data
-    if st.session_state.get('user_data'):
-        user_data = st.session_state.user_data
-        full_context += f"""User Profile:
-        - Name: {user_data.get('name', 'Not provided')}
-        - Age Group: {user_data.get('age_group', 'Not provided')}
-        - Current Mood: {user_data.get('mood', 'Not provided')}
-        - Concerns: {', '.join(user_data.get('concerns', [])) or 'None'}
-        - Preferred Style: {user_data.get('preferred_style', 'Not provided')}
-        - Additional Info: {user_data.get('additional_info', 'None')}
+        try:
+            # Let the background warm-up finish rather than building the same crews twice
+            chatbot_warmup = st.session_state.pop('chatbot_warmup', None)
+            if chatbot_warmup is not None:
+                chatbot_warmup.exception()
         
-        """
-    
-    # Add therapy session context
-    if st.session_state.get('therapy_session_data'):
-        therapy_data = st.session_state.therapy_session_data
-        full_context += f"""Therapy Session Summary:
-        {chr(10).join(therapy_data.get('transcript', []))}
+            # The context is personal, so cached answers are scoped to this user
+            cache_scope = response_scope(
+                st.session_state.get('user_data'), get_chatbot_mode(), user_id=st.session_state.user_id
+            )
+            response = get_response_cache().get(user_input, cache_scope) if use_cache else None
         
-        """
-    
-    # Add conversation history
-    full_context += f"""Current Conversation:
-    {chr(10).join(st.session_state.chat_history)}"""
-    
-    # Process with CrewAI chatbot crew
-    inputs = {
-        "user_message": user_input,
-        "full_context": full_context
-    }
-    
-    try:
-        # Get response from CrewAI
-        crew_output = CrewaiKnowledgeChatbot().chatbot_crew().kickoff(inputs=inputs)
-        
-        # Extract the final response (from the last task output)
-        if hasattr(crew_output, 'tasks_output') and crew_output.tasks_output:
-            # Get the last task output (summary task)
-            final_task_output = crew_output.tasks_output[-1]
-            if hasattr(final_task_output, 'raw'):
-                response = final_task_output.raw
+            # Get response from the CrewAI chatbot (fast or thorough mode)
+            if response is not None:
+                placeholder.markdown(render_chat_message("assistant", response), unsafe_allow_html=True)
+                if on_text is not None:
+                    on_text(response)
             else:
-                response = str(final_task_output)
-        elif hasattr(crew_output, 'raw'):
-            response = crew_output.raw
-        else:
-            response = str(crew_output)
+                stream = stream_chatbot(user_input, full_context, user_id=st.session_state.user_id)
+                streamed_text = ""
+                try:
+                    with span("chatbot.crew", mode=stream.mode, streamed=True):
+                        for chunk in stream:
+                            streamed_text += chunk
+                            placeholder.markdown(render_chat_message("assistant", streamed_text + "▌"), unsafe_allow_html=True)
+                            if on_text is not None:
+                                on_text(chunk)
+                finally:
+                    # Cancels the crew if Streamlit stopped this script before it finished
+                    stream.cancel()
+                response = stream.response
+                if use_cache:
+                    get_response_cache().put(user_input, cache_scope, response)
         
-        # Update history
-        st.session_state.chat_history.append(f"Assistant: {response}")
+            # Update history
+            st.session_state.chat_log.append("assistant", response)
+            session_store.append_turn(st.session_state.session_id, CHAT, "assistant", response)
+            context_window.add_turn("Assistant", response)
         
-        # Add assistant response to messages
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        
-        return response
-    except Exception as e:
-        error_message = f"I apologize, but I encountered an error: {str(e)}. Please try again."
-        st.session_state.messages.append({"role": "assistant", "content": error_message})
-        return error_message
+        except Exception as e:
+            error_message = f"I apologize, but I encountered an error: {str(e)}. Please try again."
+            st.session_state.chat_log.append("assistant", error_message)
+            response = error_message
+    
+    if turn_span is not None:
+        st.session_state.last_trace = turn_span.root
+    return response
 
 # Check if user has completed therapy session
 if 'therapy_session_data' not in st.session_state:
@@ -300,6 +307,12 @@ else:
         else:
             st.info("⌨️ Text Mode")
         
+        st.session_state.use_response_cache = st.toggle(
+            "♻️ Reuse Similar Answers",
+            value=st.session_state.use_response_cache,
+            help="Answer questions similar to ones you asked earlier from cache instead of asking the chatbot again",
+        )
+        
         # Add instructions on how to use the Voice mode
         with st.expander("**ℹ️ How to use Voice Mode:**"):
             st.markdown("""
@@ -322,18 +335,73 @@ else:
                 st.markdown(f"**Additional Information:** {user_data.get('additional_info', '')}")
                 st.markdown(f"**Chatbot Tone Preference:** {user_data.get('preferred_style', 'Supportive and empathetic')}")
 
+        if st.session_state.get('context_tokens'):
+            with st.expander("**📏 Context Usage**"):
+                context_tokens = st.session_state.context_tokens
+                st.markdown(f"**Profile & Therapy:** {context_tokens['preamble']} tokens")
+                st.markdown(f"**Earlier Summary:** {context_tokens['summary']} tokens")
+                st.markdown(f"**Recent Turns:** {context_tokens['recent_turns']} tokens")
+                st.markdown(f"**Total:** {context_tokens['total']} / {context_tokens['budget']} tokens")
+
+        with st.expander("**⏱️ Performance**"):
+            last_trace = st.session_state.get('last_trace')
+            if not tracing_enabled():
+                st.caption("Set TRACING=1 to record a timing breakdown of each turn.")
+            elif last_trace is None:
+                st.caption("Send a message to see where the time goes.")
+            else:
+                st.markdown(f"**Last {last_trace.name}:** {last_trace.duration * 1000:.0f} ms")
+                total_ms = max(last_trace.duration * 1000, 1e-3)
+                rows = []
+                for depth, name, offset_ms, duration_ms, _ in waterfall(last_trace):
+                    rows.append(
+                        f"<div style='font-size:0.75rem;margin-left:{depth * 8}px'>{name} "
+                        f"<span style='color:#888'>{duration_ms:.0f} ms</span></div>"
+                        f"<div style='background:#eee;height:6px;margin:0 0 4px {depth * 8}px'>"
+                        f"<div style='background:#4c8bf5;height:6px;margin-left:{offset_ms / total_ms * 100:.1f}%;"
+                        f"width:{max(duration_ms / total_ms * 100, 0.5):.1f}%'></div></div>"
+                    )
+                st.markdown("".join(rows), unsafe_allow_html=True)
+
+        with st.expander("**⚡ Response Metrics**"):
+            st.markdown(f"**Chatbot Mode:** {get_chatbot_mode()}")
+            for label, summary in get_metrics().summary().items():
+                if label.startswith("chatbot."):
+                    st.markdown(
+                        f"**{label.split('.', 1)[1].title()}:** {summary['count']} responses, "
+                        f"p50 {summary['p50_ms']:.0f} ms, p95 {summary['p95_ms']:.0f} ms, "
+                        f"{summary['mean_tokens']:.0f} tokens/response"
+                    )
+                    if "p50_ttft_ms" in summary:
+                        st.markdown(
+                            f"&nbsp;&nbsp;time to first token: p50 {summary['p50_ttft_ms']:.0f} ms, "
+                            f"p95 {summary['p95_ttft_ms']:.0f} ms"
+                        )
+                elif label == "voice.first_audio":
+                    st.markdown(
+                        f"**Voice:** {summary['count']} replies, time to first audio "
+                        f"p50 {summary['p50_ms']:.0f} ms, p95 {summary['p95_ms']:.0f} ms"
+                    )
+            cache_stats = get_response_cache().stats()
+            st.markdown(
+                f"**Answer Cache:** {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} entries)"
+            )
+
         st.divider()
         
         st.markdown("### Session Actions")
         
         if st.button("🔄 Clear Current Chat", help="Clear this conversation but stay in session"):
-            st.session_state.messages = []
-            st.session_state.chat_history = []
+            st.session_state.chat_log.clear()
+            st.session_state.context_window.clear_turns()
+            get_session_store().clear_turns(st.session_state.session_id, CHAT)
             st.session_state.last_audio_input = None
             st.session_state.processed_audio = True
             st.rerun()
         
         if st.button("🏁 End Session", type="primary", help="End session and view summary"):
+            get_memory_writer().flush(timeout=10)
             st.switch_page("pages/4_session_summary.py")
 
     # Main chat interface
@@ -341,25 +409,14 @@ else:
     st.markdown("Based on our therapy session, I'm here to provide you with personalized support and resources.")
 
     # Display chat messages
-    for message in st.session_state.messages:
-        avatar = "💭" if message["role"] == "user" else "🤖"
-        avatar_class = "user-avatar" if message["role"] == "user" else "assistant-avatar"
-        message_class = "user" if message["role"] == "user" else "assistant"
-        
-        st.markdown(f"""
-        <div class="chat-message {message_class}">
-            <div class="avatar {avatar_class}">{avatar}</div>
-            <div class="content">
-                <p class="chat-message-text">{message["content"]}</p>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    for turn in st.session_state.chat_log:
+        st.markdown(render_chat_message(turn.role, turn.text), unsafe_allow_html=True)
         
         # Add audio playback for assistant messages if voice mode is enabled
-        if st.session_state.voice_mode and message["role"] == "assistant":
-            audio_bytes = text_to_speech(message["content"])
+        if st.session_state.voice_mode and turn.role == "assistant":
+            audio_bytes = text_to_speech(turn.text)
             if audio_bytes:
-                st.audio(audio_bytes, format='audio/mp3')
+                render_audio_player(audio_bytes)
 
     # Input area
     if st.session_state.voice_mode:
@@ -372,48 +429,67 @@ else:
         else:
             # Voice input using audiorecorder
             # Audio recorder
-            audio_segment = audiorecorder("Start sharing your thoughts", "Click to stop")
+            audio_segment = get_audiorecorder()("Start sharing your thoughts", "Click to stop")
             
             if audio_segment:
-                # Convert AudioSegment to bytes for Streamlit
-                audio_buffer = io.BytesIO()
-                audio_segment.export(audio_buffer, format="wav")
-                audio_bytes = audio_buffer.getvalue()
-                
-                # Check if we have new audio
-                if audio_bytes != st.session_state.last_audio_input:
-                    st.session_state.last_audio_input = audio_bytes
+                # Check if we have new audio by hashing its PCM buffer
+                audio_id = audio_fingerprint(audio_segment)
+                if audio_id != st.session_state.last_audio_input:
+                    st.session_state.last_audio_input = audio_id
                     st.session_state.processed_audio = False
                 
                 # Process unprocessed audio
                 if not st.session_state.processed_audio:
-                    # Show the audio player
-                    st.audio(audio_bytes, format="audio/wav")
-                    
-                    # Transcribe audio
-                    with st.spinner("Transcribing..."):
-                        user_input = transcribe_audio(audio_bytes)
+                    # Show the audio player; export into memory, not a temp file
+                    st.audio(to_wav_bytes(audio_segment), format="audio/wav")
                     
-                    if user_input and not user_input.startswith("Sorry"):
-                        st.success(f"You said: {user_input}")
+                    with trace("voice turn") as voice_span:
+                        # Transcribe audio straight from the in-memory PCM
+                        with st.spinner("Transcribing..."):
+                            user_input = transcribe_audio(audio_segment)
                         
-                        # Mark audio as processed
-                        st.session_state.processed_audio = True
-                        
-                        # Process the transcribed text
-                        with st.spinner("Thinking..."):
-                            response = process_message(user_input)
-                        
-                        # Generate and play response audio with autoplay
-                        response_audio = text_to_speech(response)
-                        if response_audio:
-                            # Create autoplay audio element
-                            audio_html = create_autoplay_audio(response_audio)
-                            components.html(audio_html, height=0)
+                        understood = user_input and not user_input.startswith("Sorry")
+                        if understood:
+                            st.success(f"You said: {user_input}")
+                            
+                            # Mark audio as processed
+                            st.session_state.processed_audio = True
                             
-                            # Also provide a visible audio player as fallback
-                            st.markdown("**Assistant's Response:**")
-                            st.audio(response_audio, format='audio/mp3')
+                            # Stream the response and speak each sentence as soon as it is
+                            # complete, while the rest is still being generated
+                            response_placeholder = st.empty()
+                            response_placeholder.markdown(render_chat_message("assistant", "Thinking..."), unsafe_allow_html=True)
+                            speech = SpeechPipeline(synthesize_sentence)
+                            streamed = []
+                            
+                            def play_ready_clips():
+                                for clip in speech.ready():
+                                    components.html(create_autoplay_audio(clip), height=0)
+                            
+                            def speak(text):
+                                streamed.append(text)
+                                speech.feed(text)
+                                play_ready_clips()
+                            
+                            try:
+                                response = process_message(user_input, placeholder=response_placeholder, on_text=speak)
+                                if not streamed:
+                                    # Nothing was streamed, e.g. the chatbot failed; speak the reply as a whole
+                                    speech.feed(response)
+                                speech.close()
+                                with span("tts", backend=get_tts_backend().name, sentences=len(speech.sentences)):
+                                    for clip in speech:
+                                        components.html(create_autoplay_audio(clip), height=0)
+                            finally:
+                                speech.cancel()
+                            if speech.time_to_first_audio is not None:
+                                get_metrics().record("voice.first_audio", speech.time_to_first_audio)
+                    if voice_span is not None:
+                        st.session_state.last_trace = voice_span
+                    
+                    if understood:
+                        if speech.errors:
+                            st.error(f"Error generating speech: {str(speech.errors[0])}")
                         
                         # Force a rerun to update the UI
                         time.sleep(0.5)  # Small delay to ensure audio starts playing
@@ -427,9 +503,11 @@ else:
         user_input = st.chat_input("How can I help you today?")
         
         if user_input:
-            # Process message
-            with st.spinner("Thinking..."):
-                response = process_message(user_input)
+            # Show the user's message right away and stream the response below it
+            st.markdown(render_chat_message("user", user_input), unsafe_allow_html=True)
+            response_placeholder = st.empty()
+            response_placeholder.markdown(render_chat_message("assistant", "Thinking..."), unsafe_allow_html=True)
+            response = process_message(user_input, placeholder=response_placeholder)
             
             # Force a rerun to update the UI
             st.rerun()
\ No newline at end of file
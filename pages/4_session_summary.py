@@ -1,13 +1,27 @@
 import streamlit as st
 import pandas as pd
+import sys
+import os
 from datetime import datetime
 
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_knowledge_chatbot.session_store import get_session_store, resume_session
+
 st.set_page_config(
     page_title="Session Summary",
     page_icon="📋",
     layout="wide",
 )
 
+# Restore the session named in the URL if the server lost it
+resume_session(st.session_state, st.query_params)
+
+# Stop generating therapy questions the user navigated away from
+if 'pending_question' in st.session_state:
+    st.session_state.pop('pending_question').cancel()
+
 # Check if user has completed a session
 if 'therapy_session_data' not in st.session_state:
     st.warning("No session data found. Please complete a session first.")
@@ -39,6 +53,8 @@ else:
     
     with col2:
         st.markdown("### 📊 Session Statistics")
+        session_stats = get_session_store().session_stats(st.session_state.session_id)
+        minutes, seconds = divmod(int(session_stats['duration_seconds']), 60)
         stats_data = {
             "Metric": [
                 "Therapy Questions Answered",
@@ -47,10 +63,10 @@ else:
                 "Support Topics Discussed"
             ],
             "Value": [
-                f"{st.session_state.get('question_count', 0)} questions",
-                f"{len(st.session_state.get('messages', []))} messages",
-                "Completed",
-                len(st.session_state.get('user_data', {}).get('concerns', []))
+                f"{session_stats['therapy_answers']} questions",
+                f"{session_stats['chat_messages']} messages",
+                f"{minutes}m {seconds}s",
+                str(len(st.session_state.get('user_data', {}).get('concerns', [])))
             ]
         }
         df_stats = pd.DataFrame(stats_data)
@@ -60,9 +76,9 @@ else:
     
     # Therapy Session Summary
     st.markdown("### 🗣️ Therapy Session Insights")
-    if st.session_state.get('therapy_transcript'):
+    if st.session_state.get('therapy_log'):
         with st.expander("View Therapy Conversation", expanded=False):
-            for entry in st.session_state.therapy_transcript:
+            for entry in st.session_state.therapy_log.lines():
                 if entry.startswith("Therapist:"):
                     st.markdown(f"**{entry}**")
                 else:
@@ -152,12 +168,11 @@ else:
     
     with col7:
         if st.button("Start New Session", type="primary"):
-            # Clear existing session data but keep user profile
-            user_data = st.session_state.get('user_data', {})
+            # Clear existing session data but keep user profile and memory partition
             for key in list(st.session_state.keys()):
-                if key != 'user_data':
+                if key not in ('user_data', 'user_id'):
                     del st.session_state[key]
-            st.session_state.user_data = user_data
+            st.session_state.setdefault('user_data', {})
             st.switch_page("pages/1_user_input.py")
     
     with col8:
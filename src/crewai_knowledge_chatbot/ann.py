@@ -0,0 +1,190 @@
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from .embeddings import normalize_rows
+
+CENTROIDS_FILENAME = "centroids.npy"
+OFFSETS_FILENAME = "offsets.npy"
+IDS_FILENAME = "ids.npy"
+META_FILENAME = "meta.json"
+# Names the generation subdirectory that holds the index's current files
+CURRENT_FILENAME = "CURRENT"
+
+
+def default_nlist(count):
+    """Number of inverted lists for ``count`` vectors: about 2 * sqrt(count)."""
+    return max(1, int(round(2 * np.sqrt(count))))
+
+
+def train_centroids(vectors, nlist, iterations=10, sample_size=50_000, seed=0):
+    """
+    Spherical k-means over (a sample of) unit-length ``vectors``.
+
+    Vectors are assigned to the centroid with the highest dot product, and
+    centroids are re-normalized every iteration. An empty cluster is
+    re-seeded with the vector its centroid fits worst.
+    """
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) > sample_size:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+    nlist = min(nlist, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        similarities = vectors @ centroids.T
+        assignment = similarities.argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=nlist) == 0
+        if empty.any():
+            worst = np.argsort(similarities[np.arange(len(vectors)), assignment])[:empty.sum()]
+            sums[empty] = vectors[worst]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over unit vectors.
+
+    Vectors are partitioned by their nearest k-means centroid. A query is
+    compared with the centroids and only the vectors in its ``nprobe``
+    closest lists are returned as candidates, which the caller scores
+    exactly. The lists are stored as one array of row ids sorted by list,
+    plus the offset where each list starts, so a saved index is three flat
+    ``.npy`` files that load memory-mapped. Inserting and removing rows
+    rebuilds those arrays without re-training; ``trained_on`` records how
+    many vectors the centroids were trained with, so callers can decide when
+    the lists have grown enough to re-train.
+    """
+
+    def __init__(self, centroids, offsets, ids, trained_on=None, nprobe=None):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.trained_on = len(ids) if trained_on is None else trained_on
+        self.nprobe = nprobe or max(1, int(np.ceil(len(centroids) / 16)))
+
+    @classmethod
+    def build(cls, vectors, ids=None, nlist=None, **kwargs):
+        """Train centroids on ``vectors`` and index them under ``ids`` (default: row numbers)."""
+        nlist = nlist or default_nlist(len(vectors))
+        centroids = train_centroids(vectors, nlist, **kwargs)
+        index = cls(centroids, np.zeros(len(centroids) + 1, dtype=np.int64), np.zeros(0, dtype=np.int64), 0)
+        index.add(vectors, ids)
+        index.trained_on = len(vectors)
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    def _lists(self):
+        """The list each stored id belongs to."""
+        return np.repeat(np.arange(self.nlist), np.diff(self.offsets))
+
+    def _rebuild(self, lists, ids):
+        order = np.argsort(lists, kind="stable")
+        self.ids = np.asarray(ids, dtype=np.int64)[order]
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(lists, minlength=self.nlist)))).astype(np.int64)
+
+    def assign(self, vectors, batch_size=8192):
+        """The nearest centroid of each vector."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return np.concatenate([
+            (vectors[start:start + batch_size] @ self.centroids.T).argmax(axis=1)
+            for start in range(0, len(vectors), batch_size)
+        ] or [np.zeros(0, dtype=np.int64)])
+
+    def add(self, vectors, ids=None):
+        """Insert ``vectors`` under ``ids`` (default: the next unused row numbers)."""
+        if ids is None:
+            start = int(self.ids.max()) + 1 if len(self.ids) else 0
+            ids = np.arange(start, start + len(vectors))
+        lists = np.concatenate((self._lists(), self.assign(vectors)))
+        self._rebuild(lists, np.concatenate((self.ids, ids)))
+
+    def remap(self, mapping):
+        """
+        Renumber stored ids with the array ``mapping`` (old id -> new id).
+
+        Ids mapped to -1 are removed.
+        """
+        new_ids = np.asarray(mapping)[self.ids]
+        keep = new_ids >= 0
+        self._rebuild(self._lists()[keep], new_ids[keep])
+
+    def candidates(self, query_vector, nprobe=None):
+        """Ids of every vector in the ``nprobe`` lists whose centroids are closest to the query."""
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        similarities = self.centroids @ query_vector
+        lists = np.argpartition(-similarities, nprobe - 1)[:nprobe]
+        return np.concatenate([self.ids[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+
+    def save(self, directory, meta=None):
+        """
+        Write the index to ``directory``; ``meta`` is stored alongside as JSON.
+
+        Every save writes a new generation subdirectory and then switches the
+        ``CURRENT`` pointer to it with one atomic rename, so a reader always
+        opens centroids, lists and meta of the same generation. Older
+        generations are removed afterwards; processes that have them mapped
+        keep a valid copy.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        generation = f"gen-{uuid.uuid4().hex[:12]}"
+        target = directory / generation
+        target.mkdir()
+        np.save(target / CENTROIDS_FILENAME, np.asarray(self.centroids, dtype=np.float32))
+        np.save(target / OFFSETS_FILENAME, np.asarray(self.offsets))
+        np.save(target / IDS_FILENAME, np.asarray(self.ids))
+        (target / META_FILENAME).write_text(json.dumps(dict(meta or {}, trained_on=self.trained_on)), encoding="utf-8")
+
+        temporary = directory / f"{CURRENT_FILENAME}.tmp"
+        temporary.write_text(generation, encoding="utf-8")
+        os.replace(temporary, directory / CURRENT_FILENAME)
+        for path in directory.iterdir():
+            if path.name == generation or path.name == CURRENT_FILENAME:
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, directory, nprobe=None):
+        """
+        Open a saved index memory-mapped; returns ``(index, meta)`` or ``(None, None)``.
+
+        Nothing is read into memory until a query touches it, and processes
+        that open the same files share their pages.
+        """
+        directory = Path(directory)
+        # A save may remove the generation between reading the pointer and opening it; retry with the new one
+        for _ in range(3):
+            try:
+                target = directory / (directory / CURRENT_FILENAME).read_text(encoding="utf-8").strip()
+            except FileNotFoundError:
+                return None, None
+            try:
+                meta = json.loads((target / META_FILENAME).read_text(encoding="utf-8"))
+                index = cls(
+                    np.load(target / CENTROIDS_FILENAME, mmap_mode="r"),
+                    np.load(target / OFFSETS_FILENAME, mmap_mode="r"),
+                    np.load(target / IDS_FILENAME, mmap_mode="r"),
+                    meta["trained_on"],
+                    nprobe,
+                )
+            except FileNotFoundError:
+                continue
+            return index, meta
+        return None, None
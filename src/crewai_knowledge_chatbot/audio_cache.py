@@ -0,0 +1,107 @@
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def audio_key(text, voice="en"):
+    """Content hash identifying the synthesized audio for ``text`` in ``voice``."""
+    return hashlib.sha256(f"{voice}\0{text}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    Process-wide LRU cache of synthesized speech, bounded by total bytes.
+
+    Entries are keyed by a hash of the text and voice, so identical responses
+    are synthesized once and shared by every session. The least recently
+    used clips are evicted once ``max_bytes`` is exceeded. The same clip may
+    be stored under several keys (the audio server adds it under its content
+    hash); it is held and counted against ``max_bytes`` once.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._references = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def put(self, key, audio):
+        if len(audio) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._release(previous)
+            self._entries[key] = audio
+            if not self._references[id(audio)]:
+                self.size += len(audio)
+            self._references[id(audio)] += 1
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._release(evicted)
+
+    def _release(self, audio):
+        self._references[id(audio)] -= 1
+        if not self._references[id(audio)]:
+            del self._references[id(audio)]
+            self.size -= len(audio)
+
+    def get_or_create(self, text, synthesize, voice="en"):
+        """
+        Return cached audio for ``text``, calling ``synthesize(text)`` on a miss.
+
+        Failed syntheses (a None result) are not cached.
+        """
+        key = audio_key(text, voice)
+        audio = self.get(key)
+        if audio is None:
+            audio = synthesize(text)
+            if audio:
+                self.put(key, audio)
+        return audio
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """Return the process-wide audio cache, creating it on first use."""
+    global _audio_cache
+    if _audio_cache is None:
+        with _audio_cache_lock:
+            if _audio_cache is None:
+                _audio_cache = AudioCache()
+    return _audio_cache
@@ -0,0 +1,191 @@
+import base64
+import hashlib
+import logging
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .audio_cache import get_audio_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Clips are named by their content hash, so a URL's bytes never change
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+EXTENSIONS = {"audio/mp3": "mp3", "audio/mpeg": "mp3", "audio/wav": "wav"}
+CONTENT_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav"}
+
+_PATH = re.compile(r"^/audio/([0-9a-f]{32})\.(mp3|wav)$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def clip_id(audio):
+    """Content hash naming a clip in URLs."""
+    return hashlib.sha256(audio).hexdigest()[:32]
+
+
+class _AudioRequestHandler(BaseHTTPRequestHandler):
+    server_version = "AudioServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        match = _PATH.match(self.path.split("?", 1)[0])
+        audio = self.server.clips.get(match.group(1)) if match else None
+        if audio is None:
+            self._send_empty(404)
+            return
+
+        etag = f'"{match.group(1)}"'
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self._send_empty(304, etag)
+            return
+
+        start, end, status = 0, len(audio) - 1, 200
+        requested = self.headers.get("Range")
+        if requested:
+            byte_range = self._parse_range(requested, len(audio))
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(audio)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            (start, end), status = byte_range, 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", CONTENT_TYPES[match.group(2)])
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Cache-Control", CACHE_CONTROL)
+        self.send_header("ETag", etag)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(audio)}")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(memoryview(audio)[start:end + 1])
+
+    @staticmethod
+    def _parse_range(header, size):
+        """``(start, end)`` for a single ``bytes=`` range, or None if it cannot be satisfied."""
+        match = _RANGE.match(header.strip())
+        if match is None or not (match.group(1) or match.group(2)):
+            return None
+        if not match.group(1):
+            # Suffix range: the last N bytes
+            length = int(match.group(2))
+            return (max(0, size - length), size - 1) if length else None
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        return (start, end) if start <= end else None
+
+    def _send_empty(self, status, etag=None):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", CACHE_CONTROL)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class AudioServer:
+    """
+    Small local HTTP server for synthesized speech, so pages reference clips by URL.
+
+    Clips are published under the hash of their content, which makes every
+    URL immutable: responses carry a year-long ``Cache-Control``, an ETag
+    for revalidation, and honour ``Range`` requests so browsers can seek
+    and stream. Clips are held in the process-wide audio cache, next to
+    the synthesized sentences they usually are, so each is kept once. The
+    server binds to
+    ``host``/``port`` (AUDIO_SERVER_HOST/AUDIO_SERVER_PORT); ``base_url``
+    (AUDIO_SERVER_URL) is the address browsers use to reach it, for when it
+    sits behind a proxy.
+
+    If the default port is taken, e.g. by another Streamlit worker, a free
+    port is used instead. When the port or ``base_url`` is configured
+    explicitly, browsers are expected at that address, so a taken port
+    raises OSError rather than serving clips somewhere they would not look.
+    """
+
+    def __init__(self, host=None, port=None, base_url=None, clips=None):
+        host = host or os.environ.get("AUDIO_SERVER_HOST", DEFAULT_HOST)
+        if port is None:
+            port = os.environ.get("AUDIO_SERVER_PORT") or None
+        base_url = base_url or os.environ.get("AUDIO_SERVER_URL")
+        configured = port is not None or base_url is not None
+        port = int(port) if port is not None else DEFAULT_PORT
+        self.clips = clips if clips is not None else get_audio_cache()
+        try:
+            self.httpd = ThreadingHTTPServer((host, port), _AudioRequestHandler)
+        except OSError as e:
+            if configured:
+                raise OSError(
+                    f"Audio server port {port} is in use. Free it, or point AUDIO_SERVER_PORT "
+                    f"(and AUDIO_SERVER_URL) at a free port: {e}"
+                ) from e
+            logger.warning("Audio server port %d is in use; using a free port instead", port)
+            self.httpd = ThreadingHTTPServer((host, 0), _AudioRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.clips = self.clips
+        self.port = self.httpd.server_address[1]
+        self.base_url = (base_url or f"http://{'localhost' if host in ('127.0.0.1', '0.0.0.0') else host}:{self.port}").rstrip("/")
+        logger.info("Serving synthesized audio on %s:%d at %s", host, self.port, self.base_url)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="audio-server", daemon=True)
+        self._thread.start()
+
+    def publish(self, audio, audio_format):
+        """Store a clip and return its URL."""
+        key = clip_id(audio)
+        if key not in self.clips:
+            self.clips.put(key, audio)
+        return f"{self.base_url}/audio/{key}.{EXTENSIONS.get(audio_format, 'wav')}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_audio_server():
+    """Return the process-wide audio server, starting it on first use."""
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                _server = AudioServer()
+    return _server
+
+
+def audio_server_enabled():
+    """
+    True when AUDIO_SERVER=on, or when AUDIO_SERVER is unset and AUDIO_SERVER_URL is set.
+
+    The server is off by default: on a remote or HTTPS deployment browsers
+    cannot load ``http://localhost`` URLs, while data URIs work everywhere.
+    """
+    enabled = os.environ.get("AUDIO_SERVER")
+    if not enabled:
+        return bool(os.environ.get("AUDIO_SERVER_URL"))
+    return enabled.lower() not in ("0", "off", "false", "no")
+
+
+def audio_url(audio, audio_format):
+    """URL for a synthesized clip: a base64 data URI, or its URL on the audio server when that is enabled."""
+    if not audio_server_enabled():
+        return f"data:{audio_format};base64,{base64.b64encode(audio).decode('ascii')}"
+    return get_audio_server().publish(audio, audio_format)
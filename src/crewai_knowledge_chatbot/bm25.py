@@ -0,0 +1,61 @@
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from .embeddings import tokenize
+
+
+class BM25Scorer:
+    """
+    Okapi BM25 keyword scoring over a fixed list of documents.
+
+    Postings are stored as NumPy arrays per term, so scoring a query is a
+    handful of vectorized operations per query term rather than a loop over
+    every document.
+    """
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+
+        doc_ids = defaultdict(list)
+        term_freqs = defaultdict(list)
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for doc_id, document in enumerate(documents):
+            counts = Counter(tokenize(document))
+            lengths[doc_id] = sum(counts.values())
+            for term, count in counts.items():
+                doc_ids[term].append(doc_id)
+                term_freqs[term].append(count)
+
+        average_length = lengths.mean() if self.size and lengths.mean() else 1.0
+        self._length_norm = k1 * (1 - b + b * lengths / average_length)
+        self._postings = {
+            term: (np.array(ids, dtype=np.int64), np.array(term_freqs[term], dtype=np.float32))
+            for term, ids in doc_ids.items()
+        }
+
+    def idf(self, term):
+        postings = self._postings.get(term)
+        if postings is None:
+            return 0.0
+        df = len(postings[0])
+        return float(np.log(1 + (self.size - df + 0.5) / (df + 0.5)))
+
+    def scores(self, query):
+        """Return the BM25 score of every document for ``query``."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            ids, tf = postings
+            scores[ids] += self.idf(term) * tf * (self.k1 + 1) / (tf + self._length_norm[ids])
+        return scores
+
+    def normalized_scores(self, query):
+        """BM25 scores scaled into [0, 1] so they can be blended with cosine scores."""
+        scores = self.scores(query)
+        top = scores.max() if self.size else 0.0
+        return scores / top if top > 0 else scores
@@ -0,0 +1,125 @@
+import os
+import time
+from functools import lru_cache
+
+from .knowledge_index import format_passages, load_knowledge_index
+from .memory import with_memories
+from .metrics import get_metrics
+from .pool import get_crew_pool
+from .streaming import CrewStream
+from .tracing import span
+
+FAST_MODE = "fast"
+THOROUGH_MODE = "thorough"
+CHATBOT_MODES = (FAST_MODE, THOROUGH_MODE)
+
+FAST_MODE_PASSAGES = 4
+FAST_MODE_KEYWORD_WEIGHT = 0.3
+
+
+def get_chatbot_mode():
+    """Return the configured chatbot mode from the CHATBOT_MODE environment variable."""
+    mode = os.environ.get("CHATBOT_MODE", THOROUGH_MODE).lower()
+    if mode not in CHATBOT_MODES:
+        raise ValueError(f"CHATBOT_MODE must be one of {CHATBOT_MODES}, got {mode!r}")
+    return mode
+
+
+@lru_cache(maxsize=256)
+def retrieve_passages(query, limit=FAST_MODE_PASSAGES):
+    """Deterministically retrieve knowledge base passages for ``query``; results are cached per process."""
+    index = load_knowledge_index()
+    if index is None or not len(index):
+        return "No knowledge base passages are available."
+    return format_passages(index.search(query, limit=limit, keyword_weight=FAST_MODE_KEYWORD_WEIGHT))
+
+
+def build_chatbot_request(user_message, full_context, mode=None, user_id=None):
+    """
+    Check out a chatbot crew for one user message.
+
+    In thorough mode the knowledge specialist and summarizer run as two
+    sequential LLM calls. In fast mode retrieval happens here in Python and
+    only the summarizer is called, with the retrieved passages inlined.
+    With a ``user_id``, that user's memories relevant to the message are
+    recalled into ``full_context``.
+    """
+    mode = mode or get_chatbot_mode()
+    inputs = {"user_message": user_message, "full_context": with_memories(full_context, user_message, user_id)}
+    if mode == FAST_MODE:
+        with span("knowledge.retrieve"):
+            inputs["knowledge_passages"] = retrieve_passages(user_message)
+        return get_crew_pool().checkout("fast_chatbot_crew", inputs)
+    return get_crew_pool().checkout("chatbot_crew", inputs)
+
+
+def extract_response(crew_output):
+    """Return the final (summary) text from a chatbot crew's output."""
+    if hasattr(crew_output, 'tasks_output') and crew_output.tasks_output:
+        final_task_output = crew_output.tasks_output[-1]
+        if hasattr(final_task_output, 'raw'):
+            return final_task_output.raw
+        return str(final_task_output)
+    if hasattr(crew_output, 'raw'):
+        return crew_output.raw
+    return str(crew_output)
+
+
+def total_tokens(crew_output):
+    token_usage = getattr(crew_output, "token_usage", None)
+    return getattr(token_usage, "total_tokens", 0) or 0
+
+
+def run_chatbot(user_message, full_context, mode=None, user_id=None):
+    """Answer one user message and record latency and token usage for the mode."""
+    mode = mode or get_chatbot_mode()
+    start = time.perf_counter()
+    crew_output = build_chatbot_request(user_message, full_context, mode, user_id).kickoff()
+    get_metrics().record(
+        f"chatbot.{mode}",
+        time.perf_counter() - start,
+        tokens=total_tokens(crew_output),
+    )
+    return extract_response(crew_output)
+
+
+class ChatbotStream:
+    """
+    Streams the answer to one user message as it is generated.
+
+    Iterating yields text chunks of the summarizer's final answer. After
+    iteration completes, ``response`` holds the full answer and the latency,
+    time-to-first-token and token usage have been recorded for the mode.
+    Call ``cancel()`` when the reader goes away before the answer is done.
+    """
+
+    def __init__(self, user_message, full_context, mode=None, user_id=None):
+        self.mode = mode or get_chatbot_mode()
+        self.response = None
+        # The service module imports this one, so it is imported here
+        from .service import get_crew_service
+
+        # Streamed crews share the service's CREW_MAX_CONCURRENCY limit
+        self._stream = CrewStream(
+            build_chatbot_request(user_message, full_context, self.mode, user_id), get_crew_service().submit_crew
+        )
+
+    def cancel(self):
+        self._stream.cancel()
+
+    def __iter__(self):
+        start = time.perf_counter()
+        yield from self._stream
+        crew_output = self._stream.output
+        get_metrics().record(
+            f"chatbot.{self.mode}",
+            time.perf_counter() - start,
+            tokens=total_tokens(crew_output),
+            time_to_first_token=self._stream.time_to_first_token,
+        )
+        self.response = extract_response(crew_output)
+
+
+def stream_chatbot(user_message, full_context, mode=None, user_id=None):
+    """Return a ChatbotStream for ``user_message``; see ChatbotStream."""
+    return ChatbotStream(user_message, full_context, mode, user_id)
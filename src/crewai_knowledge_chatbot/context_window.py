@@ -0,0 +1,156 @@
+import re
+from collections import deque
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_encoding = None
+
+
+def count_tokens(text):
+    """Count tokens with tiktoken when available, otherwise estimate ~4 chars per token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4) if text else 0
+
+
+def format_user_profile(user_data):
+    return f"""User Profile:
+- Name: {user_data.get('name', 'Not provided')}
+- Age Group: {user_data.get('age_group', 'Not provided')}
+- Current Mood: {user_data.get('mood', 'Not provided')}
+- Concerns: {', '.join(user_data.get('concerns', [])) or 'None'}
+- Preferred Style: {user_data.get('preferred_style', 'Not provided')}
+- Additional Info: {user_data.get('additional_info', 'None')}
+"""
+
+
+def format_therapy_session(transcript):
+    """``transcript`` is the joined transcript or a list of its lines."""
+    if not isinstance(transcript, str):
+        transcript = "\n".join(transcript)
+    return "Therapy Session Summary:\n" + transcript + "\n"
+
+
+def _condense(line, max_tokens):
+    """Reduce a turn to its first sentence, capped at roughly ``max_tokens`` tokens."""
+    role, _, text = line.partition(": ")
+    sentence = _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    max_chars = max_tokens * 4
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars].rsplit(" ", 1)[0] + "..."
+    return f"{role}: {sentence}"
+
+
+class ContextWindow:
+    """
+    Builds the chatbot's ``full_context`` within a fixed token budget.
+
+    The profile and therapy preamble is rendered once and reused until its
+    inputs change. The most recent ``recent_turns`` turns are kept verbatim;
+    older turns are condensed into a running summary as they fall out of
+    that window, and the oldest summary lines are dropped once the summary
+    exceeds ``summary_tokens``. Token counts are tracked per section so the
+    cost of each turn is known without re-tokenizing the whole prompt.
+    """
+
+    def __init__(self, max_tokens=3000, recent_turns=6, summary_tokens=400, condensed_turn_tokens=40):
+        self.max_tokens = max_tokens
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.condensed_turn_tokens = condensed_turn_tokens
+
+        self._preamble_key = None
+        self._preamble = ""
+        self._preamble_tokens = 0
+
+        self._recent = deque()
+        self._recent_tokens = 0
+        self._summary = deque()
+        self._summary_tokens = 0
+        self._omitted_turns = 0
+
+    def set_preamble(self, user_data=None, therapy_transcript=None):
+        """
+        Render the profile/therapy preamble, reusing the cached copy when unchanged.
+
+        ``therapy_transcript`` is a TurnLog or a list of transcript lines.
+        """
+        user_data = user_data or {}
+        if hasattr(therapy_transcript, "transcript"):
+            # A TurnLog's joined transcript is memoized, so this builds no strings
+            therapy_transcript = therapy_transcript.transcript()
+        elif therapy_transcript:
+            therapy_transcript = "\n".join(therapy_transcript)
+        key = (repr(sorted(user_data.items())), therapy_transcript or "")
+        if key == self._preamble_key:
+            return
+
+        sections = []
+        if user_data:
+            sections.append(format_user_profile(user_data))
+        if therapy_transcript:
+            sections.append(format_therapy_session(therapy_transcript))
+        self._preamble = "\n".join(sections)
+        self._preamble_tokens = count_tokens(self._preamble)
+        self._preamble_key = key
+
+    def add_turn(self, role, text):
+        """Append a conversation turn, e.g. ``add_turn("User", "...")``."""
+        line = f"{role}: {text}"
+        self._recent.append((line, count_tokens(line)))
+        self._recent_tokens += self._recent[-1][1]
+        self._enforce_budget()
+
+    def clear_turns(self):
+        self._recent.clear()
+        self._summary.clear()
+        self._recent_tokens = self._summary_tokens = self._omitted_turns = 0
+
+    def _roll_oldest_turn(self):
+        line, tokens = self._recent.popleft()
+        self._recent_tokens -= tokens
+        condensed = _condense(line, self.condensed_turn_tokens)
+        self._summary.append((condensed, count_tokens(condensed)))
+        self._summary_tokens += self._summary[-1][1]
+        while self._summary and self._summary_tokens > self.summary_tokens:
+            self._summary_tokens -= self._summary.popleft()[1]
+            self._omitted_turns += 1
+
+    def _enforce_budget(self):
+        while len(self._recent) > self.recent_turns:
+            self._roll_oldest_turn()
+        # Always keep the latest turn verbatim, even if it alone is over budget
+        while len(self._recent) > 1 and self.total_tokens > self.max_tokens:
+            self._roll_oldest_turn()
+
+    @property
+    def total_tokens(self):
+        return self._preamble_tokens + self._summary_tokens + self._recent_tokens
+
+    def token_report(self):
+        """Token usage per section of the rendered context."""
+        return {
+            "preamble": self._preamble_tokens,
+            "summary": self._summary_tokens,
+            "recent_turns": self._recent_tokens,
+            "total": self.total_tokens,
+            "budget": self.max_tokens,
+        }
+
+    def render(self):
+        """Return the full context string passed to the chatbot crew."""
+        sections = [self._preamble] if self._preamble else []
+        if self._summary:
+            summary = [line for line, _ in self._summary]
+            if self._omitted_turns:
+                summary.insert(0, f"({self._omitted_turns} earlier turns omitted)")
+            sections.append("Earlier Conversation Summary:\n" + "\n".join(summary) + "\n")
+        sections.append("Current Conversation:\n" + "\n".join(line for line, _ in self._recent))
+        return "\n".join(sections)
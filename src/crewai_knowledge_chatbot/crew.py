@@ -1,18 +1,8 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
 
-# Create a PDF knowledge source
-pdf_source = PDFKnowledgeSource(
-    file_paths=["first_resource.pdf", "second_resource.pdf", "third_resource.pdf"], 
-    name="mental health knowledge base",
-    description="Authorized mental health resource containing approved information"
-)
-
-memory_config = {
-    "provider": "mem0",
-    "config": {"user_id": "User"},
-}
+from .indexed_knowledge import load_knowledge
+from .tools.knowledge_search_tool import KnowledgeSearchTool
 
 @CrewBase
 class CrewaiKnowledgeChatbot():
@@ -26,8 +16,6 @@ class CrewaiKnowledgeChatbot():
         """Agent 1: Therapist for understanding user's condition"""
         return Agent(
             config=self.agents_config['therapist'],
-            memory=True,
-            memory_config=memory_config,
             verbose=False,
         )
 
@@ -36,8 +24,7 @@ class CrewaiKnowledgeChatbot():
         """Agent 2: Searches knowledge base for mental health information"""
         return Agent(
             config=self.agents_config['knowledge_specialist'],
-            memory=True,
-            memory_config=memory_config,
+            tools=[KnowledgeSearchTool()],
             verbose=False,
         )
 
@@ -46,8 +33,6 @@ class CrewaiKnowledgeChatbot():
         """Agent 3: Creates digestible information for the user"""
         return Agent(
             config=self.agents_config['summarizer'],
-            memory=True,
-            memory_config=memory_config,
             verbose=False,
         )
 
@@ -73,6 +58,13 @@ class CrewaiKnowledgeChatbot():
             context=[self.knowledge_search_task()],
         )
 
+    @task
+    def fast_summary_task(self) -> Task:
+        """Task for answering directly from pre-retrieved knowledge passages"""
+        return Task(
+            config=self.tasks_config["fast_summary_task"],
+        )
+
     @crew
     def therapy_crew(self) -> Crew:
         """Creates the therapy session crew"""
@@ -90,6 +82,16 @@ class CrewaiKnowledgeChatbot():
             agents=[self.knowledge_specialist(), self.summarizer()],
             tasks=[self.knowledge_search_task(), self.summary_task()],
             process=Process.sequential,
-            knowledge_sources=[pdf_source],
+            knowledge=load_knowledge(),
+            verbose=False,
+        )
+
+    @crew
+    def fast_chatbot_crew(self) -> Crew:
+        """Creates the single-call chatbot crew used in fast mode"""
+        return Crew(
+            agents=[self.summarizer()],
+            tasks=[self.fast_summary_task()],
+            process=Process.sequential,
             verbose=False,
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+
+DEFAULT_EMBEDDER = "openai"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def normalize_rows(matrix):
+    """L2-normalize each row so that dot products are cosine similarities."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def tokenize(text):
+    """Lowercase word tokens used by the local embedder and keyword scoring."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class OpenAIEmbedder:
+    """Embeds text with the OpenAI embeddings API (CrewAI's default model)."""
+
+    def __init__(self, model="text-embedding-3-small", batch_size=100):
+        self.model = model
+        self.batch_size = batch_size
+        self.name = f"openai:{model}"
+        self._client = None
+
+    def embed(self, texts):
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI()
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            response = self._client.embeddings.create(model=self.model, input=batch)
+            vectors.extend(item.embedding for item in response.data)
+        return normalize_rows(vectors)
+
+
+class HashingEmbedder:
+    """
+    Deterministic, fully offline embedder based on feature hashing.
+
+    Word unigrams and bigrams are hashed into a fixed number of signed
+    buckets. It has no semantic understanding, but it is fast, stable across
+    processes and needs no network access, which makes it suitable for
+    tests, benchmarks and air-gapped deployments.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def _features(self, text):
+        tokens = tokenize(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                matrix[row, value % self.dim] += 1.0 if value & (1 << 63) else -1.0
+        return normalize_rows(matrix)
+
+
+def get_embedder(name=None):
+    """
+    Return an embedder by name.
+
+    ``name`` may be a bare provider ("openai", "hashing") or a full embedder
+    name as stored in an index ("openai:text-embedding-3-small",
+    "hashing:384"). Defaults to the KNOWLEDGE_EMBEDDER environment variable.
+    """
+    name = name or os.environ.get("KNOWLEDGE_EMBEDDER", DEFAULT_EMBEDDER)
+    provider, _, option = name.partition(":")
+    if provider == "openai":
+        return OpenAIEmbedder(model=option) if option else OpenAIEmbedder()
+    if provider == "hashing":
+        return HashingEmbedder(dim=int(option)) if option else HashingEmbedder()
+    raise ValueError(f"Unknown embedder: {name}")
@@ -0,0 +1,31 @@
+from functools import lru_cache
+from typing import Any
+
+from crewai.knowledge.knowledge import Knowledge
+from pydantic import BaseModel, ConfigDict
+
+from .knowledge_index import load_knowledge_index
+
+
+class IndexedKnowledge(Knowledge):
+    """CrewAI knowledge backed by a prebuilt KnowledgeIndex instead of a vector DB."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    index: Any = None
+
+    def __init__(self, index, **data):
+        # Skip Knowledge.__init__, which would create storage and re-add sources
+        BaseModel.__init__(self, collection_name="crew", sources=[], index=index, **data)
+
+    def query(self, query, limit=3):
+        return self.index.search("\n".join(query), limit)
+
+    def reset(self):
+        raise ValueError("IndexedKnowledge is read-only. Rebuild it with build-index.")
+
+
+@lru_cache(maxsize=None)
+def load_knowledge():
+    """Wrap the process-wide knowledge index for use as crew knowledge."""
+    index = load_knowledge_index()
+    return IndexedKnowledge(index) if index is not None else None
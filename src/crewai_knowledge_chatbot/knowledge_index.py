@@ -0,0 +1,679 @@
+#!/usr/bin/env python
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from .ann import IVFIndex
+from .bm25 import BM25Scorer
+from .embeddings import get_embedder
+from .quantized import PRECISIONS, get_precision, open_embeddings, save_embeddings
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_DIR = Path(os.environ.get("KNOWLEDGE_DIR", "knowledge"))
+INDEX_DIRNAME = ".index"
+MANIFEST_FILENAME = "manifest.json"
+# Version 2 stores chunks per page with page fingerprints
+INDEX_VERSION = 2
+SUPPORTED_SUFFIXES = (".pdf", ".txt")
+
+# Same chunking parameters as CrewAI's knowledge sources
+CHUNK_SIZE = 4000
+CHUNK_OVERLAP = 200
+EMBED_BATCH_SIZE = 64
+
+# Below this many chunks exact search is fast enough that no ANN index is built
+ANN_MIN_CHUNKS = 4096
+ANN_DIRNAME = "ann"
+# The whole index's embeddings, concatenated in manifest order at the configured precision
+MATRIX_DIRNAME = "matrix"
+MATRIX_ENTRIES_FILENAME = "entries.json"
+# Re-train the ANN centroids once the index has grown or shrunk by this factor
+ANN_RETRAIN_FACTOR = 2.0
+# Keyword matches added to the ANN candidates per requested result in hybrid search
+KEYWORD_CANDIDATES_PER_RESULT = 8
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discover_files(knowledge_dir):
+    """Return the indexable files under ``knowledge_dir`` keyed by relative path."""
+    knowledge_dir = Path(knowledge_dir)
+    return {
+        path.relative_to(knowledge_dir).as_posix(): path
+        for path in sorted(knowledge_dir.rglob("*"))
+        if path.is_file()
+        and path.suffix.lower() in SUPPORTED_SUFFIXES
+        and INDEX_DIRNAME not in path.relative_to(knowledge_dir).parts
+    }
+
+
+def iter_pages(path):
+    """
+    Yield ``(page_number, text)`` for each page of a PDF; a text file is one page.
+
+    PDFs are read with pdfium, which extracts text dozens of times faster
+    than a pure-Python parser. Each page is closed before the next is read,
+    so memory does not grow with the length of the document.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".pdf":
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            for number in range(len(pdf)):
+                page = pdf[number]
+                text_page = page.get_textpage()
+                text = text_page.get_text_range().replace("\r\n", "\n")
+                text_page.close()
+                page.close()
+                yield number + 1, text
+        finally:
+            pdf.close()
+    else:
+        yield 1, path.read_text(encoding="utf-8")
+
+
+def extract_text(path):
+    """Extract the plain text of a PDF or text file."""
+    return "".join(text + "\n" for _, text in iter_pages(path) if text)
+
+
+def extract_pages(path):
+    """
+    Return ``(page_number, page_sha256, chunks)`` for every page of a file.
+
+    Runs in the build_index worker processes. Chunks never span pages, so a
+    page's chunks (and embeddings) depend only on that page's text.
+    """
+    return [
+        (number, hashlib.sha256(text.encode("utf-8")).hexdigest(), chunk_text(text))
+        for number, text in iter_pages(path)
+    ]
+
+
+def chunk_text(text, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """Split text into overlapping fixed-size character chunks."""
+    return [
+        text[i:i + chunk_size]
+        for i in range(0, len(text), chunk_size - chunk_overlap)
+    ]
+
+
+def _embedder_dir(index_dir, embedder_name):
+    return Path(index_dir) / embedder_name.replace(":", "-")
+
+
+def _read_manifest(index_dir):
+    try:
+        with open(Path(index_dir) / MANIFEST_FILENAME, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path, write):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as file:
+        write(file)
+    os.replace(tmp_path, path)
+
+
+def _extract_all(files, workers):
+    """
+    Yield ``(name, sha, pages or exception)`` for each file as soon as it is extracted.
+
+    With more than one worker the files are extracted in a process pool, with
+    at most two files per worker in flight so extracted text never piles up
+    ahead of the embedder.
+    """
+    if workers <= 1 or len(files) <= 1:
+        for name, path, sha in files:
+            try:
+                yield name, sha, extract_pages(path)
+            except Exception as e:
+                yield name, sha, e
+        return
+
+    remaining = iter(files)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {
+            executor.submit(extract_pages, path): (name, sha)
+            for name, path, sha in itertools.islice(remaining, workers * 2)
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, sha = pending.pop(future)
+                exception = future.exception()
+                yield name, sha, future.result() if exception is None else exception
+                for name, path, sha in itertools.islice(remaining, 1):
+                    pending[executor.submit(extract_pages, path)] = (name, sha)
+
+
+def _read_entry(entry_dir, sha):
+    """Load an index entry's chunk JSON; version 1 entries are a plain list of chunks."""
+    with open(entry_dir / f"{sha}.json", "r", encoding="utf-8") as file:
+        entry = json.load(file)
+    if isinstance(entry, list):
+        return {"pages": [{"page": None, "sha": None, "chunks": len(entry)}], "chunks": entry}
+    return entry
+
+
+def _previous_page_rows(entry_dir, sha):
+    """Map each page fingerprint of a previously indexed file version to its embedding rows."""
+    if sha is None or not (entry_dir / f"{sha}.npy").exists():
+        return {}
+    entry = _read_entry(entry_dir, sha)
+    embeddings = np.load(entry_dir / f"{sha}.npy", mmap_mode="r")
+    rows = {}
+    start = 0
+    for page in entry["pages"]:
+        if page["sha"] is not None:
+            rows[page["sha"]] = embeddings[start:start + page["chunks"]]
+        start += page["chunks"]
+    return rows
+
+
+class _PendingEntry:
+    """A file whose chunks are waiting for embeddings before its entry can be written."""
+
+    __slots__ = ("sha", "pages", "chunks", "rows", "missing")
+
+    def __init__(self, sha, pages):
+        self.sha = sha
+        self.pages = [{"page": number, "sha": page_sha, "chunks": len(chunks)} for number, page_sha, chunks in pages]
+        self.chunks = [chunk for _, _, chunks in pages for chunk in chunks]
+        self.rows = [None] * len(self.chunks)
+        self.missing = len(self.chunks)
+
+    def write(self, entry_dir):
+        embeddings = np.vstack(self.rows).astype(np.float32) if self.rows else np.zeros((0, 0), dtype=np.float32)
+        entry = {"pages": self.pages, "chunks": self.chunks}
+        _write_atomic(entry_dir / f"{self.sha}.json", lambda file: file.write(json.dumps(entry).encode("utf-8")))
+        _write_atomic(entry_dir / f"{self.sha}.npy", lambda file: np.save(file, embeddings))
+
+
+def _sync_ann(ann, old_entries, new_entries, load_rows):
+    """
+    Bring an ANN index built over ``old_entries`` up to date with ``new_entries``.
+
+    Entries are ``(sha, rows)`` pairs in index order. Rows of entries that
+    are still present are renumbered, rows of removed entries are dropped and
+    the rows of new entries, fetched with ``load_rows(sha)``, are inserted
+    into their nearest lists without re-training.
+    """
+    old_starts = {}
+    start = 0
+    for sha, rows in old_entries:
+        old_starts.setdefault(sha, []).append(start)
+        start += rows
+    mapping = np.full(start, -1, dtype=np.int64)
+    added_vectors = []
+    added_ids = []
+    position = 0
+    for sha, rows in new_entries:
+        if old_starts.get(sha):
+            old_start = old_starts[sha].pop(0)
+            mapping[old_start:old_start + rows] = np.arange(position, position + rows)
+        elif rows:
+            added_vectors.append(load_rows(sha))
+            added_ids.append(np.arange(position, position + rows))
+        position += rows
+    ann.remap(mapping)
+    if added_vectors:
+        ann.add(np.vstack(added_vectors), np.concatenate(added_ids))
+    return ann
+
+
+def _covers(old_entries, new_entries):
+    """True if every entry of ``new_entries`` is also in ``old_entries``, so syncing needs no new rows."""
+    return not Counter(map(tuple, new_entries)) - Counter(map(tuple, old_entries))
+
+
+def _load_rows(entry_dir, sha):
+    return np.load(entry_dir / f"{sha}.npy", mmap_mode="r")
+
+
+def _matrix_entries(matrix_dir):
+    """The manifest entries a concatenated matrix was built from, or None."""
+    try:
+        return json.loads((matrix_dir / MATRIX_ENTRIES_FILENAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def _update_matrix(entry_dir, entries, precision, previous):
+    """
+    Write the concatenated embedding matrix unless the previous one still matches.
+
+    ``previous`` is the old manifest. Every matrix is written to a new
+    directory that only the manifest written after it names, so readers
+    never pair a manifest with a matrix built for different entries, even
+    when a build is interrupted; its entries are stored next to it as a
+    second check. Returns ``(directory name, written)``.
+    """
+    name = previous.get("matrix") if previous else None
+    unchanged = (
+        name
+        and previous.get("precision") == precision
+        and previous.get("entries") == entries
+        and _matrix_entries(entry_dir / name) == entries
+        and open_embeddings(entry_dir / name, precision) is not None
+    )
+    if unchanged:
+        return name, False
+    name = f"{MATRIX_DIRNAME}-{uuid.uuid4().hex[:12]}"
+    matrix_dir = entry_dir / name
+    matrix_dir.mkdir()
+    matrices = [_load_rows(entry_dir, sha) for sha, rows in entries if rows]
+    save_embeddings(matrix_dir, np.vstack(matrices) if matrices else np.zeros((0, 0), dtype=np.float32), precision)
+    _write_atomic(matrix_dir / MATRIX_ENTRIES_FILENAME, lambda file: file.write(json.dumps(entries).encode("utf-8")))
+    return name, True
+
+
+def _remove_old_matrices(entry_dir, keep):
+    """Delete every matrix directory except ``keep``; processes that have one mapped keep a valid copy."""
+    for path in entry_dir.glob(f"{MATRIX_DIRNAME}*"):
+        if path.is_dir() and path.name != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _update_ann(entry_dir, entries, min_chunks):
+    """
+    Train, update or remove the ANN index for the manifest ``entries``.
+
+    Returns what was done: "trained", "updated", "removed" or "none".
+    """
+    ann_dir = entry_dir / ANN_DIRNAME
+
+    def load_rows(sha):
+        return _load_rows(entry_dir, sha)
+
+    total = sum(rows for _, rows in entries)
+    if total < min_chunks:
+        if ann_dir.exists():
+            shutil.rmtree(ann_dir)
+            return "removed"
+        return "none"
+
+    ann, meta = IVFIndex.load(ann_dir)
+    if ann is not None and meta["entries"] == entries:
+        return "none"
+    if ann is not None and meta["trained_on"] / ANN_RETRAIN_FACTOR <= total <= meta["trained_on"] * ANN_RETRAIN_FACTOR:
+        _sync_ann(ann, meta["entries"], entries, load_rows)
+        action = "updated"
+    else:
+        ann = IVFIndex.build(np.vstack([load_rows(sha) for sha, rows in entries if rows]))
+        action = "trained"
+    ann.save(ann_dir, {"entries": entries})
+    return action
+
+
+def build_index(knowledge_dir=KNOWLEDGE_DIR, index_dir=None, embedder=None, workers=None,
+                batch_size=EMBED_BATCH_SIZE, ann_min_chunks=ANN_MIN_CHUNKS, precision=None):
+    """
+    Chunk and embed every supported file under ``knowledge_dir``.
+
+    Files whose content hash is already indexed are reused without being
+    opened. New and changed files are extracted page by page in a pool of
+    ``workers`` processes (default: one per CPU). Every page is
+    fingerprinted, and a page whose text is unchanged since the file was
+    last indexed keeps its stored embeddings, so editing one page re-embeds
+    only that page. New chunks from all files are embedded together in
+    batches of ``batch_size``. Entries for files that no longer exist are
+    removed; files that fail to extract are logged and left out of the
+    index.
+
+    Once the index holds ``ann_min_chunks`` chunks, an IVF approximate
+    nearest-neighbour index is kept alongside it. New chunks are inserted
+    into the existing lists; the centroids are only re-trained when the
+    index has doubled or halved since they were trained.
+
+    Per-file embeddings are kept in float32 so incremental builds never lose
+    precision. The embeddings of the whole index are also written as one
+    matrix at ``precision`` (float32, float16 or int8; default
+    KNOWLEDGE_PRECISION or float16), which is what the app memory-maps.
+    Returns a dict of counts and timings.
+    """
+    start_time = time.perf_counter()
+    knowledge_dir = Path(knowledge_dir)
+    index_dir = Path(index_dir) if index_dir else knowledge_dir / INDEX_DIRNAME
+    embedder = embedder or get_embedder()
+    precision = get_precision(precision)
+    workers = workers or os.cpu_count() or 1
+    entry_dir = _embedder_dir(index_dir, embedder.name)
+    entry_dir.mkdir(parents=True, exist_ok=True)
+
+    previous_manifest = _read_manifest(index_dir)
+    previous = {}
+    if (
+        previous_manifest
+        and previous_manifest.get("version") == INDEX_VERSION
+        and previous_manifest["embedder"] == embedder.name
+    ):
+        previous = previous_manifest["files"]
+    else:
+        previous_manifest = None
+    indexed = set(previous.values())
+
+    files = {}
+    to_extract = []
+    stats = {
+        "embedded": 0, "reused": 0, "removed": 0, "failed": 0, "chunks": 0,
+        "pages": 0, "pages_embedded": 0, "pages_reused": 0,
+    }
+    for name, path in discover_files(knowledge_dir).items():
+        sha = file_sha256(path)
+        files[name] = sha
+        if sha in indexed and (entry_dir / f"{sha}.npy").exists():
+            stats["reused"] += 1
+        else:
+            to_extract.append((name, path, sha))
+
+    batch = []
+
+    def embed_batch():
+        vectors = embedder.embed([text for _, _, text in batch])
+        for (entry, row, _), vector in zip(batch, vectors):
+            entry.rows[row] = vector
+            entry.missing -= 1
+            if entry.missing == 0:
+                entry.write(entry_dir)
+        stats["chunks"] += len(batch)
+        batch.clear()
+
+    for name, sha, pages in _extract_all(to_extract, workers):
+        if isinstance(pages, Exception):
+            logger.error("Could not extract %s: %s", name, pages)
+            del files[name]
+            stats["failed"] += 1
+            continue
+
+        entry = _PendingEntry(sha, pages)
+        previous_rows = _previous_page_rows(entry_dir, previous.get(name))
+        row = 0
+        for page in entry.pages:
+            reusable = previous_rows.get(page["sha"])
+            if reusable is not None and len(reusable) == page["chunks"]:
+                entry.rows[row:row + page["chunks"]] = list(reusable)
+                entry.missing -= page["chunks"]
+                stats["pages_reused"] += 1
+            else:
+                batch.extend((entry, position, entry.chunks[position]) for position in range(row, row + page["chunks"]))
+                stats["pages_embedded"] += 1
+            row += page["chunks"]
+        stats["pages"] += len(entry.pages)
+        if entry.missing == 0:
+            entry.write(entry_dir)
+        while len(batch) >= batch_size:
+            pending, batch[:] = batch[batch_size:], batch[:batch_size]
+            embed_batch()
+            batch.extend(pending)
+        stats["embedded"] += 1
+        logger.info("Indexed %s (%d pages, %d chunks)", name, len(entry.pages), len(entry.chunks))
+    if batch:
+        embed_batch()
+
+    live = set(files.values())
+    for entry in entry_dir.glob("*.npy"):
+        if entry.stem not in live:
+            entry.unlink()
+            entry.with_suffix(".json").unlink(missing_ok=True)
+            stats["removed"] += 1
+
+    entries = [[sha, len(_load_rows(entry_dir, sha))] for sha in files.values()]
+    matrix, stats["matrix_written"] = _update_matrix(entry_dir, entries, precision, previous_manifest)
+    stats["ann"] = _update_ann(entry_dir, entries, ann_min_chunks)
+    manifest = {
+        "version": INDEX_VERSION,
+        "embedder": embedder.name,
+        "precision": precision,
+        "files": files,
+        "entries": entries,
+        "matrix": matrix,
+    }
+    _write_atomic(
+        index_dir / MANIFEST_FILENAME,
+        lambda file: file.write(json.dumps(manifest, indent=2).encode("utf-8")),
+    )
+    _remove_old_matrices(entry_dir, matrix)
+    stats["seconds"] = time.perf_counter() - start_time
+    return stats
+
+
+class KnowledgeIndex:
+    """
+    A read-only, in-memory view of an index produced by ``build_index``.
+
+    With an ``ann`` index, searches score only the chunks in the lists
+    closest to the query (plus the best keyword matches in hybrid search)
+    instead of every chunk.
+    """
+
+    def __init__(self, chunks, embeddings, embedder, ann=None):
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.embedder = embedder
+        self.ann = ann
+        self._keyword_scorer = None
+
+    def __len__(self):
+        return len(self.chunks)
+
+    @property
+    def keyword_scorer(self):
+        if self._keyword_scorer is None:
+            self._keyword_scorer = BM25Scorer([chunk["text"] for chunk in self.chunks])
+        return self._keyword_scorer
+
+    def scores(self, query, keyword_weight=0.0):
+        """
+        Score every chunk against ``query``.
+
+        Scores are cosine similarities, optionally blended with normalized
+        BM25 keyword scores when ``keyword_weight`` is above zero.
+        """
+        scores = self.embeddings @ self.embedder.embed([query])[0]
+        if keyword_weight:
+            keyword_scores = self.keyword_scorer.normalized_scores(query)
+            scores = (1 - keyword_weight) * scores + keyword_weight * keyword_scores
+        return scores
+
+    def candidate_scores(self, query, limit, keyword_weight=0.0, nprobe=None):
+        """
+        Return ``(ids, scores)`` for the ANN candidates of ``query``.
+
+        In hybrid search the best keyword matches are added to the candidates,
+        so a chunk that only matches by keyword is not lost to the ANN.
+        """
+        query_vector = self.embedder.embed([query])[0]
+        ids = self.ann.candidates(query_vector, nprobe)
+        if keyword_weight:
+            keyword_scores = self.keyword_scorer.normalized_scores(query)
+            keyword_limit = min(limit * KEYWORD_CANDIDATES_PER_RESULT, len(keyword_scores))
+            ids = np.union1d(ids, np.argpartition(-keyword_scores, keyword_limit - 1)[:keyword_limit])
+        else:
+            ids = np.sort(ids)
+        scores = self.embeddings[ids] @ query_vector
+        if keyword_weight:
+            scores = (1 - keyword_weight) * scores + keyword_weight * keyword_scores[ids]
+        return ids, scores
+
+    def search(self, query, limit=3, keyword_weight=0.0, exact=False, nprobe=None):
+        """
+        Return the ``limit`` best matching chunks in CrewAI's result format.
+
+        Uses the ANN index when there is one, unless ``exact`` is set;
+        ``nprobe`` overrides how many of its lists are searched.
+        """
+        if not self.chunks:
+            return []
+        ids = None
+        if self.ann is not None and not exact:
+            ids, scores = self.candidate_scores(query, limit, keyword_weight, nprobe)
+        if ids is None or len(ids) < limit:
+            ids, scores = np.arange(len(self.chunks)), self.scores(query, keyword_weight)
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        scores = dict(zip(ids[top].tolist(), scores[top].tolist()))
+        return [
+            {
+                "id": f"{self.chunks[i]['source']}#{self.chunks[i]['chunk']}",
+                "metadata": {
+                    "source": self.chunks[i]["source"],
+                    "chunk": self.chunks[i]["chunk"],
+                    "page": self.chunks[i]["page"],
+                },
+                "context": self.chunks[i]["text"],
+                "score": score,
+            }
+            for i, score in scores.items()
+        ]
+
+
+def format_passages(results):
+    """Render search results as numbered, attributed passages for a prompt."""
+    return "\n\n".join(
+        f"[{result['id']}] (score {result['score']:.2f})\n{result['context'].strip()}"
+        for result in results
+    )
+
+
+def load_index(knowledge_dir=KNOWLEDGE_DIR, index_dir=None):
+    """
+    Load a prebuilt index without doing any embedding work.
+
+    Files that were added or changed since the index was built are skipped
+    with a warning; run ``build-index`` to pick them up. Returns None when
+    no index exists.
+
+    The embeddings are memory-mapped from the index's concatenated matrix,
+    so every process serving the app shares one copy through the OS page
+    cache. Only when files were skipped, or the matrix was not built for
+    exactly the loaded files (e.g. after an interrupted build), are the
+    remaining files' float32 embeddings copied into a private matrix
+    instead.
+    """
+    knowledge_dir = Path(knowledge_dir)
+    index_dir = Path(index_dir) if index_dir else knowledge_dir / INDEX_DIRNAME
+    manifest = _read_manifest(index_dir)
+    if manifest is None:
+        logger.warning("No knowledge index found in %s. Run build-index to create it.", index_dir)
+        return None
+
+    entry_dir = _embedder_dir(index_dir, manifest["embedder"])
+    indexed = manifest["files"]
+    current = discover_files(knowledge_dir)
+    stale = sorted(name for name in current if name not in indexed)
+
+    chunks = []
+    entries = []
+    for name, sha in indexed.items():
+        path = current.get(name)
+        if path is None or file_sha256(path) != sha:
+            stale.append(name)
+            continue
+        entry = _read_entry(entry_dir, sha)
+        entries.append([sha, len(entry["chunks"])])
+        if not entry["chunks"]:
+            continue
+        pages = (page["page"] for page in entry["pages"] for _ in range(page["chunks"]))
+        chunks.extend(
+            {"source": name, "chunk": position, "page": page, "text": text}
+            for position, (page, text) in enumerate(zip(pages, entry["chunks"]))
+        )
+
+    if stale:
+        logger.warning(
+            "Knowledge index is out of date for: %s. Run build-index to re-index them.",
+            ", ".join(stale),
+        )
+
+    embeddings = None
+    matrix_dir = entry_dir / manifest["matrix"] if manifest.get("matrix") else None
+    if matrix_dir is not None and manifest["entries"] == entries and _matrix_entries(matrix_dir) == entries:
+        try:
+            embeddings = open_embeddings(matrix_dir, manifest["precision"])
+        except FileNotFoundError:
+            # Removed by a build that finished while this one was loading
+            embeddings = None
+    if embeddings is None or len(embeddings) != len(chunks):
+        matrices = [_load_rows(entry_dir, sha) for sha, rows in entries if rows]
+        embeddings = np.vstack(matrices) if matrices else np.zeros((0, 0), dtype=np.float32)
+    ann, meta = IVFIndex.load(entry_dir / ANN_DIRNAME, int(os.environ.get("KNOWLEDGE_ANN_NPROBE", 0)) or None)
+    if ann is not None and meta["entries"] != entries:
+        if _covers(meta["entries"], entries):
+            # Skipped stale files: drop their rows from the lists, in memory only
+            _sync_ann(ann, meta["entries"], entries, None)
+        else:
+            logger.warning("The ANN index is out of date; using exact search. Run build-index to update it.")
+            ann = None
+    return KnowledgeIndex(chunks, embeddings, get_embedder(manifest["embedder"]), ann)
+
+
+@lru_cache(maxsize=None)
+def load_knowledge_index():
+    """Load the knowledge index once per process."""
+    return load_index()
+
+
+def main():
+    """
+    Build or update the on-disk knowledge index.
+    """
+    parser = argparse.ArgumentParser(description="Build the knowledge index.")
+    parser.add_argument("--knowledge-dir", default=str(KNOWLEDGE_DIR))
+    parser.add_argument("--index-dir", default=None)
+    parser.add_argument("--embedder", default=None, help="e.g. openai or hashing")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="chunks per embedding request")
+    parser.add_argument(
+        "--precision", choices=PRECISIONS, default=None,
+        help="storage precision of the embeddings the app loads (default: KNOWLEDGE_PRECISION or float16)",
+    )
+    parser.add_argument(
+        "--ann-min-chunks", type=int, default=ANN_MIN_CHUNKS,
+        help="build an approximate nearest-neighbour index once there are this many chunks (0: always)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    stats = build_index(
+        args.knowledge_dir, args.index_dir, get_embedder(args.embedder), args.workers, args.batch_size,
+        args.ann_min_chunks, args.precision,
+    )
+    print(
+        f"Embedded {stats['embedded']} file(s) ({stats['chunks']} chunks), "
+        f"reused {stats['reused']}, removed {stats['removed']}, failed {stats['failed']}."
+    )
+    print(
+        f"Pages: {stats['pages_embedded']} embedded, {stats['pages_reused']} unchanged "
+        f"in {stats['seconds']:.1f}s ({stats['pages'] / stats['seconds']:.1f} pages/s)."
+    )
+    if stats["ann"] != "none":
+        print(f"ANN index {stats['ann']}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,19 @@
 #!/usr/bin/env python
+import argparse
+import json
 import sys
 import warnings
 
-from datetime import datetime
-
+from crewai_knowledge_chatbot.chatbot import CHATBOT_MODES
 from crewai_knowledge_chatbot.crew import CrewaiKnowledgeChatbot
-from mem0 import MemoryClient
-
-client = MemoryClient()
+from crewai_knowledge_chatbot.memory import get_memory_writer
+from crewai_knowledge_chatbot.replay import (
+    ConversationSession,
+    format_summary,
+    load_conversations,
+    run_replay,
+)
+from crewai_knowledge_chatbot.warmup import format_initial_context
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="chromadb")
@@ -15,120 +21,127 @@ warnings.filterwarnings("ignore", category=DeprecationWarning, module="mem0")
 warnings.filterwarnings("ignore", message=".*'model_fields' attribute.*")
 warnings.filterwarnings("ignore", message=".*output_format='v1.0' is deprecated.*")
 
-def conduct_therapy_session(crew_instance, initial_message, history):
-    """
-    Conducts a therapy session by having the therapist ask questions
-    and collecting user responses.
-    """
-    session_transcript = []
-    current_history = history.copy()
-    
-    # Initial message from user
-    session_transcript.append(f"User: {initial_message}")
-    current_history.append(f"User: {initial_message}")
-    
-    # Start therapy session
-    print("Therapist: Let me understand your situation better...")
-    
-    # First therapist response
-    inputs = {
-        "user_message": initial_message,
-        "history": "\n".join(current_history),
-    }
-    
-    # Get therapist's first response/questions
-    therapist_response = crew_instance.tasks[0].execute(inputs)
-    
-    # Extract questions from therapist response
-    questions = extract_questions(therapist_response)
-    
-    for i, question in enumerate(questions):
-        print(f"Therapist: {question}")
-        session_transcript.append(f"Therapist: {question}")
-        
-        user_response = input("You: ")
-        session_transcript.append(f"User: {user_response}")
-        current_history.append(f"Therapist: {question}")
-        current_history.append(f"User: {user_response}")
-        
-        # Add to memory
-        client.add(user_response, user_id="User")
-    
-    return "\n".join(session_transcript), current_history
-
-def extract_questions(therapist_response):
-    """
-    Extract individual questions from therapist response.
-    This is a simple implementation - you might want to make it more sophisticated.
-    """
-    lines = therapist_response.split('\n')
-    questions = [line.strip() for line in lines if line.strip().endswith('?')]
-    return questions[:7]  # Limit to maximum 7 questions
+DEFAULT_USER_ID = "User"
+EXIT_WORDS = ("exit", "quit", "bye")
+THERAPY_QUESTIONS = 4
+
 
 def run():
-    history = []
     """
-    Run the crew.
+    Run the chatbot in the terminal: the therapist asks a few questions,
+    then the chatbot answers until you type 'exit', 'quit' or 'bye'.
     """
     print("Mental Health Support Chatbot")
     print("Type 'exit', 'quit', or 'bye' to end the conversation")
     print("-" * 50)
-    
-    while True:
-        user_input = input("You: ")
-        if user_input.lower() in ["exit", "quit", "bye"]:
-            print("Chatbot: Thank you for sharing with me today. Take care of yourself, and remember that seeking help is a sign of strength.")
-            break
-        
-        # Create crew instance
-        crew_instance = CrewaiKnowledgeChatbot().crew()
-        
-        # Conduct therapy session
-        print("\nStarting therapy session...\n")
-        therapy_transcript, updated_history = conduct_therapy_session(
-            crew_instance, 
-            user_input, 
-            history
+
+    concern = input("What would you like to talk about today?\nYou: ")
+    if concern.lower() in EXIT_WORDS:
+        return
+    session = ConversationSession({"additional_info": concern}, DEFAULT_USER_ID, store_memory=True)
+
+    print("\nTherapist: Let me understand your situation better...")
+    try:
+        for _ in range(THERAPY_QUESTIONS):
+            question, _ = session.ask_therapist()
+            print(f"Therapist: {question}")
+            answer = input("You: ")
+            if answer.lower() in EXIT_WORDS:
+                break
+            session.answer_therapist(answer)
+        else:
+            print("\nThank you for sharing. What would you like to know?")
+            while True:
+                user_input = input("You: ")
+                if user_input.lower() in EXIT_WORDS:
+                    break
+                try:
+                    response, _ = session.chat(user_input)
+                    print(f"Chatbot: {response}\n")
+                except Exception as e:
+                    print(f"An error occurred: {e}")
+                    print("I apologize for the technical difficulty. Please try again or seek professional help if urgent.")
+    finally:
+        get_memory_writer().flush(timeout=10)
+    print("Chatbot: Thank you for sharing with me today. Take care of yourself, and remember that seeking help is a sign of strength.")
+
+
+def _replay_parser(prog, description):
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument("conversations", help="JSONL file of scripted conversations")
+    parser.add_argument("--workers", type=int, default=4, help="conversations replayed at once")
+    parser.add_argument("--output", help="write one JSON line per turn to this file")
+    parser.add_argument("--mode", choices=CHATBOT_MODES, help="chatbot mode (default: CHATBOT_MODE)")
+    parser.add_argument("--store-memory", action="store_true", help="write therapy answers to memory")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    return parser
+
+
+def replay():
+    """
+    Replay scripted conversations from a JSONL file through the therapy and
+    chatbot crews, and report throughput, per-turn latency and token usage.
+    """
+    args = _replay_parser("replay", replay.__doc__).parse_args()
+    summary = run_replay(
+        load_conversations(args.conversations),
+        workers=args.workers,
+        output=args.output,
+        mode=args.mode,
+        store_memory=args.store_memory,
+    )
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+    return summary
+
+
+def test():
+    """
+    Replay scripted conversations as a regression check: exits non-zero if
+    any turn fails or the p95 turn latency exceeds --max-p95-ms.
+    """
+    parser = _replay_parser("test", test.__doc__)
+    parser.add_argument("--iterations", type=int, default=1, help="replay the file this many times")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if p95 turn latency is above this")
+    args = parser.parse_args()
+
+    conversations = load_conversations(args.conversations)
+    # Give every iteration its own conversation ids so they do not share memory
+    conversations = [
+        {**conversation, "id": f"{conversation.get('id', index)}-{iteration}"}
+        for iteration in range(args.iterations)
+        for index, conversation in enumerate(conversations)
+    ]
+    summary = run_replay(conversations, args.workers, args.output, args.mode, args.store_memory)
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+
+    failures = []
+    if summary["errors"]:
+        failures.append(f"{summary['errors']} turns failed")
+    if args.max_p95_ms is not None and summary["p95_ms"] > args.max_p95_ms:
+        failures.append(f"p95 latency {summary['p95_ms']:.0f}ms is above {args.max_p95_ms:.0f}ms")
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+    return summary
+
+
+def train():
+    """
+    Train the therapy crew with human feedback.
+    Usage: train <n_iterations> <filename>
+    """
+    inputs = {
+        "user_context": format_initial_context({"concerns": ["Stress"], "mood": "Anxious"}),
+        "conversation_history": "",
+        "question_number": "1",
+    }
+    try:
+        CrewaiKnowledgeChatbot().therapy_crew().train(
+            n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs
         )
-        
-        # Update history
-        history = updated_history
-        
-        print("\nProcessing your information to find the best resources...\n")
-        
-        # Prepare inputs for the full crew execution
-        inputs = {
-            "user_message": user_input,
-            "history": "\n".join(history),
-            "therapy_session_output": therapy_transcript,
-        }
-        
-        # Execute the remaining tasks
-        try:
-            result = crew_instance.kickoff(inputs=inputs)
-            
-            # The final output will be the summary from the last task
-            final_response = result.tasks_output[-1].raw
-            
-            # Display the final response
-            print("\n" + "="*50)
-            print("Mental Health Support Response:")
-            print("="*50)
-            print(final_response)
-            print("="*50 + "\n")
-            
-            # Update history with the final interaction
-            history.append(f"Assistant: {final_response}")
-            
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            print("I apologize for the technical difficulty. Please try again or seek professional help if urgent.")
-        
-        # Option to continue or end session
-        continue_session = input("\nWould you like to discuss another concern? (yes/no): ")
-        if continue_session.lower() not in ["yes", "y"]:
-            print("\nChatbot: Thank you for trusting me with your concerns. Remember, professional help is always available if you need it. Take care!")
-            break
+    except Exception as e:
+        raise Exception(f"An error occurred while training the crew: {e}")
+
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
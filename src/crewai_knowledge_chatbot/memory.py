@@ -0,0 +1,324 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict
+from functools import lru_cache
+
+from .embeddings import tokenize
+from .metrics import get_metrics
+from .tracing import span, trace
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BACKEND = "mem0"
+DEFAULT_RECALL_LIMIT = 5
+
+
+def _as_messages(messages):
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    if isinstance(messages, dict):
+        return [messages]
+    return list(messages)
+
+
+class MemoryPartition:
+    """One user's memories with an inverted keyword index over them."""
+
+    def __init__(self):
+        self.memories = {}
+        self.index = defaultdict(set)
+        self.last_access = time.time()
+
+    def add(self, memory):
+        self.memories[memory["id"]] = memory
+        for term in set(tokenize(memory["memory"])):
+            self.index[term].add(memory["id"])
+
+    def remove(self, memory_id):
+        memory = self.memories.pop(memory_id)
+        for term in set(tokenize(memory["memory"])):
+            ids = self.index.get(term)
+            if ids is not None:
+                ids.discard(memory_id)
+                if not ids:
+                    del self.index[term]
+
+    def search(self, query, limit):
+        scores = defaultdict(int)
+        for term in set(tokenize(query)):
+            for memory_id in self.index.get(term, ()):
+                scores[memory_id] += 1
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{**self.memories[memory_id], "score": score} for memory_id, score in ranked]
+
+    def expire(self, cutoff):
+        """Remove memories created before ``cutoff``; returns how many were removed."""
+        expired = [memory_id for memory_id, memory in self.memories.items() if memory["created_at"] < cutoff]
+        for memory_id in expired:
+            self.remove(memory_id)
+        return len(expired)
+
+
+class LocalMemoryClient:
+    """
+    In-process stand-in for mem0's MemoryClient, partitioned per user.
+
+    Supports the subset of the API the app uses (``add``, ``search``,
+    ``get_all``, ``delete_all``). Each user_id gets its own partition and
+    keyword index, so recall cost depends only on that user's history.
+    Memories older than ``ttl`` seconds are compacted away every
+    ``compact_every`` writes, and partitions left empty and idle for longer
+    than ``ttl`` are dropped.
+    """
+
+    def __init__(self, ttl=None, compact_every=256):
+        self.ttl = ttl if ttl is not None else float(os.environ.get("MEMORY_TTL_SECONDS", 7 * 24 * 3600))
+        self.compact_every = compact_every
+        self._partitions = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _partition(self, user_id, create=False):
+        partition = self._partitions.get(user_id)
+        if partition is None and create:
+            partition = self._partitions[user_id] = MemoryPartition()
+        if partition is not None:
+            partition.last_access = time.time()
+        return partition
+
+    def add(self, messages, user_id=None, **kwargs):
+        results = []
+        with self._lock:
+            partition = self._partition(user_id, create=True)
+            for message in _as_messages(messages):
+                memory = {
+                    "id": str(uuid.uuid4()),
+                    "memory": message["content"],
+                    "user_id": user_id,
+                    "created_at": time.time(),
+                    "metadata": kwargs.get("metadata"),
+                }
+                partition.add(memory)
+                results.append({"id": memory["id"], "memory": memory["memory"], "event": "ADD"})
+            self._writes += 1
+            if self._writes % self.compact_every == 0:
+                self._compact()
+        return {"results": results}
+
+    def search(self, query, user_id=None, limit=10, **kwargs):
+        with self._lock:
+            partition = self._partition(user_id)
+            return {"results": partition.search(query, limit) if partition else []}
+
+    def get_all(self, user_id=None, **kwargs):
+        with self._lock:
+            partition = self._partition(user_id)
+            return {"results": list(partition.memories.values()) if partition else []}
+
+    def delete_all(self, user_id=None, **kwargs):
+        with self._lock:
+            self._partitions.pop(user_id, None)
+        return {"message": "Memories deleted successfully!"}
+
+    def _compact(self):
+        now = time.time()
+        cutoff = now - self.ttl
+        removed = 0
+        for user_id, partition in list(self._partitions.items()):
+            removed += partition.expire(cutoff)
+            if not partition.memories and partition.last_access < cutoff:
+                del self._partitions[user_id]
+        return removed
+
+    def compact(self):
+        """Expire memories older than the TTL now; returns how many were removed."""
+        with self._lock:
+            return self._compact()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "partitions": len(self._partitions),
+                "memories": sum(len(partition.memories) for partition in self._partitions.values()),
+            }
+
+
+@lru_cache(maxsize=None)
+def get_memory_client(backend=None):
+    """Return the memory client for ``backend`` or the MEMORY_BACKEND variable ("mem0" or "local")."""
+    backend = backend or os.environ.get("MEMORY_BACKEND", DEFAULT_MEMORY_BACKEND)
+    if backend == "local":
+        return LocalMemoryClient()
+    if backend == "mem0":
+        from mem0 import MemoryClient
+
+        return MemoryClient()
+    raise ValueError(f"Unknown memory backend: {backend}")
+
+
+def recall_memories(query, user_id, limit=None, client=None):
+    """
+    Return the ``user_id``'s memories most relevant to ``query`` as a bulleted list.
+
+    Returns "" when the user has no matching memories or the memory backend
+    fails; a failed recall is logged and never fails the request.
+    """
+    limit = limit or int(os.environ.get("MEMORY_RECALL_LIMIT", DEFAULT_RECALL_LIMIT))
+    start = time.perf_counter()
+    try:
+        with span("memory.search", limit=limit):
+            results = (client or get_memory_client()).search(query, user_id=user_id, limit=limit)
+    except Exception as e:
+        logger.warning("Could not recall memories for %s: %s", user_id, e)
+        return ""
+    get_metrics().record("memory.search", time.perf_counter() - start)
+    if isinstance(results, dict):
+        results = results.get("results", [])
+    return "\n".join(f"- {result['memory']}" for result in results[:limit] if result.get("memory"))
+
+
+def with_memories(context, query, user_id):
+    """Append what is remembered about ``user_id`` that is relevant to ``query`` to ``context``."""
+    if not user_id:
+        return context
+    memories = recall_memories(query, user_id)
+    if not memories:
+        return context
+    return f"{context}\n\nWhat you remember about the user:\n{memories}"
+
+
+class MemoryWriter:
+    """
+    Writes memories from a background thread so request handlers never block on them.
+
+    Submitted texts are queued and drained in batches: everything queued
+    within ``max_wait`` seconds (up to ``max_batch`` items) is sent as one
+    ``add`` call per user. Failed batches are retried with exponential
+    backoff and dropped after ``max_retries`` attempts. Write latency and
+    end-to-end (enqueue to stored) latency are recorded in the process-wide
+    metrics under ``memory.*``; queue depth and counters are in ``stats()``.
+    """
+
+    def __init__(self, client=None, max_batch=20, max_wait=0.25, max_retries=3, retry_backoff=0.5):
+        self._client = client
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.written = 0
+        self.retried = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_memory_client()
+        return self._client
+
+    def submit(self, text, user_id):
+        """Queue ``text`` to be stored for ``user_id``; returns immediately."""
+        self._queue.put((user_id, text, time.perf_counter()))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        """
+        Block until every queued memory has been written or dropped.
+
+        Returns False if ``timeout`` seconds elapse first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "written": self.written,
+            "retried": self.retried,
+            "dropped": self.dropped,
+        }
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, user_id, items):
+        messages = [{"role": "user", "content": text} for text, _ in items]
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                with trace("memory.add", batch_size=len(items), attempt=attempt + 1):
+                    self.client.add(messages, user_id=user_id)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.dropped += len(items)
+                    logger.error("Dropping %d memories for %s after %d attempts: %s", len(items), user_id, attempt + 1, e)
+                    return
+                self.retried += 1
+                time.sleep(self.retry_backoff * 2 ** attempt)
+                continue
+
+            finished = time.perf_counter()
+            get_metrics().record("memory.add", finished - start, batch_size=len(items))
+            for _, enqueued_at in items:
+                get_metrics().record("memory.end_to_end", finished - enqueued_at)
+            self.written += len(items)
+            return
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            by_user = defaultdict(list)
+            for user_id, text, enqueued_at in batch:
+                by_user[user_id].append((text, enqueued_at))
+            try:
+                for user_id, items in by_user.items():
+                    self._write(user_id, items)
+            except Exception:
+                logger.exception("Memory writer failed to process a batch")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_memory_writer():
+    """Return the process-wide memory writer, starting it on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = MemoryWriter()
+                atexit.register(_writer.flush, timeout=10)
+    return _writer
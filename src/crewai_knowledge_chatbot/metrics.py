@@ -0,0 +1,71 @@
+import threading
+from collections import defaultdict, deque
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values`` (0 <= fraction <= 1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class MetricsRecorder:
+    """
+    Thread-safe rolling latency and token metrics, grouped by a label.
+
+    Only the most recent ``window`` samples per label are kept, so memory
+    stays constant however long the process runs.
+    """
+
+    def __init__(self, window=500):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, label, latency, tokens=0, **extra):
+        """Record one sample; ``latency`` is in seconds."""
+        with self._lock:
+            self._samples[label].append({"latency": latency, "tokens": tokens, **extra})
+
+    def samples(self, label):
+        with self._lock:
+            return list(self._samples.get(label, ()))
+
+    def summary(self):
+        """Count, mean/p50/p95 latency in ms and mean tokens for every label."""
+        with self._lock:
+            snapshot = {label: list(samples) for label, samples in self._samples.items()}
+
+        summary = {}
+        for label, samples in snapshot.items():
+            if not samples:
+                continue
+            latencies = [sample["latency"] * 1000 for sample in samples]
+            summary[label] = {
+                "count": len(samples),
+                "mean_ms": sum(latencies) / len(latencies),
+                "p50_ms": percentile(latencies, 0.5),
+                "p95_ms": percentile(latencies, 0.95),
+                "mean_tokens": sum(sample["tokens"] for sample in samples) / len(samples),
+            }
+            first_tokens = [
+                sample["time_to_first_token"] * 1000
+                for sample in samples
+                if sample.get("time_to_first_token") is not None
+            ]
+            if first_tokens:
+                summary[label]["p50_ttft_ms"] = percentile(first_tokens, 0.5)
+                summary[label]["p95_ttft_ms"] = percentile(first_tokens, 0.95)
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+_metrics = MetricsRecorder()
+
+
+def get_metrics():
+    """Return the process-wide metrics recorder."""
+    return _metrics
@@ -0,0 +1,117 @@
+import threading
+
+from .tracing import span
+
+
+def _crew_module():
+    # crewai takes seconds to import, so it is loaded with the first crew
+    # instead of with every page that imports the pool
+    from . import crew
+
+    return crew
+
+
+def clone_crew(template):
+    """
+    Create a fresh, independently executable copy of a template crew.
+
+    Agents and tasks are copied so that kickoff-time mutations (input
+    interpolation, task outputs, agent executors) never leak between
+    requests. The template's knowledge is shared by reference instead of
+    being rebuilt from its sources.
+    """
+    from crewai import Crew
+
+    agents = [agent.copy() for agent in template.agents]
+
+    tasks = []
+    task_mapping = {}
+    for task in template.tasks:
+        cloned_task = task.copy(agents, task_mapping)
+        tasks.append(cloned_task)
+        task_mapping[task.key] = cloned_task
+
+    return Crew(
+        agents=agents,
+        tasks=tasks,
+        process=template.process,
+        verbose=template.verbose,
+        memory=template.memory,
+        memory_config=template.memory_config,
+        embedder=template.embedder,
+        knowledge=template.knowledge,
+    )
+
+
+class BoundCrew:
+    """A per-request crew instance with its inputs already bound."""
+
+    def __init__(self, crew, inputs):
+        self.crew = crew
+        self.inputs = inputs
+
+    def kickoff(self):
+        return self.crew.kickoff(inputs=self.inputs)
+
+    async def kickoff_async(self):
+        return await self.crew.kickoff_async(inputs=self.inputs)
+
+
+class CrewPool:
+    """
+    Builds each crew once per process and hands out cheap clones.
+
+    The YAML configuration, agents, tasks and knowledge sources are only
+    constructed the first time a crew is requested; every later checkout
+    clones the cached template. The pool is safe to share across Streamlit
+    sessions and threads.
+    """
+
+    def __init__(self, factory=None):
+        self._factory = factory
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def _template(self, crew_name):
+        template = self._templates.get(crew_name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(crew_name)
+                if template is None:
+                    factory = self._factory or _crew_module().CrewaiKnowledgeChatbot
+                    with span("crew.build", crew=crew_name):
+                        template = getattr(factory(), crew_name)()
+                    self._templates[crew_name] = template
+        return template
+
+    def warm(self, *crew_names):
+        """Build the templates for the given crews ahead of the first request."""
+        for crew_name in crew_names:
+            self._template(crew_name)
+
+    def checkout(self, crew_name, inputs=None):
+        """Return a fresh crew for ``crew_name`` bound to ``inputs``."""
+        template = self._template(crew_name)
+        with span("crew.clone", crew=crew_name):
+            crew = clone_crew(template)
+        return BoundCrew(crew, dict(inputs or {}))
+
+    def therapy_crew(self, inputs=None):
+        return self.checkout("therapy_crew", inputs)
+
+    def chatbot_crew(self, inputs=None):
+        return self.checkout("chatbot_crew", inputs)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_crew_pool():
+    """Return the process-wide crew pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = CrewPool()
+    return _pool
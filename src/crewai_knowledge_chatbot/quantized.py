@@ -0,0 +1,115 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+FLOAT32 = "float32"
+FLOAT16 = "float16"
+INT8 = "int8"
+PRECISIONS = (FLOAT32, FLOAT16, INT8)
+DEFAULT_PRECISION = FLOAT16
+
+# Rows dequantized at a time when scoring, so a query never allocates a float32 copy of the matrix
+BLOCK_ROWS = 4096
+
+
+def get_precision(precision=None):
+    """Return ``precision`` or the KNOWLEDGE_PRECISION environment variable, validated."""
+    precision = (precision or os.environ.get("KNOWLEDGE_PRECISION", DEFAULT_PRECISION)).lower()
+    if precision not in PRECISIONS:
+        raise ValueError(f"KNOWLEDGE_PRECISION must be one of {PRECISIONS}, got {precision!r}")
+    return precision
+
+
+def quantize(matrix, precision):
+    """
+    Return ``(data, scales)`` for storing ``matrix`` at ``precision``.
+
+    int8 rows are scaled so their largest component maps to 127; ``scales``
+    holds each row's scale factor and is None for the float precisions.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if precision == INT8:
+        scales = np.abs(matrix).max(axis=1) / 127 if len(matrix) else np.zeros(0, dtype=np.float32)
+        scales[scales == 0] = 1.0
+        data = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return data, scales.astype(np.float32)
+    return matrix.astype(precision), None
+
+
+class QuantizedEmbeddings:
+    """
+    A float16 or int8 embedding matrix that reads like a float32 one.
+
+    ``matrix @ vector`` scores every row block by block, and
+    ``matrix[rows]`` returns those rows as float32, so KnowledgeIndex and the
+    ANN search use it exactly like a NumPy array. Backed by a memory-mapped
+    file, the stored matrix is shared by every process that opens it.
+    """
+
+    def __init__(self, data, scales=None):
+        self.data = data
+        self.scales = scales
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __getitem__(self, rows):
+        matrix = np.asarray(self.data[rows], dtype=np.float32)
+        if self.scales is not None:
+            matrix *= np.asarray(self.scales[rows], dtype=np.float32)[..., None]
+        return matrix
+
+    def __matmul__(self, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        scores = np.empty(len(self.data), dtype=np.float32)
+        for start in range(0, len(self.data), BLOCK_ROWS):
+            block = slice(start, start + BLOCK_ROWS)
+            scores[block] = np.asarray(self.data[block], dtype=np.float32) @ vector
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def __array__(self, dtype=None, copy=None):
+        matrix = self[:]
+        return matrix if dtype is None else matrix.astype(dtype)
+
+
+def _paths(directory, precision):
+    directory = Path(directory)
+    return directory / f"embeddings.{precision}.npy", directory / f"scales.{precision}.npy"
+
+
+def save_embeddings(directory, matrix, precision):
+    """Write ``matrix`` to ``directory`` at ``precision``, replacing any previous copy atomically."""
+    data, scales = quantize(matrix, precision)
+    for path, array in zip(_paths(directory, precision), (data, scales)):
+        if array is None:
+            continue
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, "wb") as file:
+            np.save(file, array)
+        os.replace(temporary, path)
+
+
+def open_embeddings(directory, precision):
+    """
+    Memory-map an embedding matrix written by ``save_embeddings``; None if it does not exist.
+
+    float32 matrices are returned as a plain memory-mapped array.
+    """
+    data_path, scales_path = _paths(directory, precision)
+    if not data_path.exists():
+        return None
+    data = np.load(data_path, mmap_mode="r")
+    if precision == FLOAT32:
+        return data
+    return QuantizedEmbeddings(data, np.load(scales_path, mmap_mode="r") if precision == INT8 else None)
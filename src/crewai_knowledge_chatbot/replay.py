@@ -0,0 +1,214 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .chatbot import build_chatbot_request, extract_response, get_chatbot_mode, total_tokens
+from .context_window import ContextWindow
+from .memory import get_memory_writer, with_memories
+from .metrics import percentile
+from .pool import get_crew_pool
+from .turn_log import TurnLog
+from .warmup import format_initial_context
+
+
+class ConversationSession:
+    """
+    One user's conversation, driven the way the Streamlit pages drive it.
+
+    The therapist is asked each question with the transcript so far, and chat
+    messages are answered with the same token-budgeted context the chatbot
+    page builds. Answers to the therapist are written to memory only when
+    ``store_memory`` is set, so replays do not pollute a real mem0 account.
+    """
+
+    def __init__(self, user_data, user_id, mode=None, store_memory=False):
+        self.user_data = user_data or {}
+        self.user_id = user_id
+        self.mode = mode or get_chatbot_mode()
+        self.store_memory = store_memory
+        self.initial_context = format_initial_context(self.user_data)
+        self.transcript = TurnLog(labels={"user": "User", "assistant": "Therapist"})
+        self.questions_asked = 0
+        self.context_window = ContextWindow()
+
+    def ask_therapist(self):
+        """Return ``(question, tokens)`` for the therapist's next question."""
+        inputs = {
+            "user_context": with_memories(self.initial_context, self.initial_context, self.user_id),
+            "conversation_history": self.transcript.transcript(),
+            "question_number": str(self.questions_asked + 1),
+        }
+        result = get_crew_pool().therapy_crew(inputs).kickoff()
+        question = result.raw if hasattr(result, 'raw') else str(result)
+        self.questions_asked += 1
+        self.transcript.append("assistant", question)
+        return question, total_tokens(result)
+
+    def answer_therapist(self, answer):
+        self.transcript.append("user", answer)
+        if self.store_memory:
+            get_memory_writer().submit(answer, user_id=self.user_id)
+
+    def chat(self, message):
+        """Return ``(response, tokens)`` for one chat message."""
+        self.context_window.set_preamble(self.user_data, self.transcript)
+        self.context_window.add_turn("User", message)
+        crew_output = build_chatbot_request(
+            message, self.context_window.render(), self.mode, self.user_id
+        ).kickoff()
+        response = extract_response(crew_output)
+        self.context_window.add_turn("Assistant", response)
+        return response, total_tokens(crew_output)
+
+
+def load_conversations(path):
+    """
+    Read scripted conversations, one JSON object per line.
+
+    Each object has a ``profile`` (the user input form's fields), a list of
+    ``therapy_answers`` (one therapist question is asked per answer) and a
+    list of ``chat`` messages. ``id``, ``user_id`` and ``mode`` are optional.
+    Blank lines and lines starting with ``#`` are skipped.
+    """
+    conversations = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                conversations.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+    return conversations
+
+
+def replay_conversation(conversation, conversation_id, mode=None, store_memory=False, emit=None):
+    """
+    Replay one scripted conversation turn by turn; returns its turn records.
+
+    A turn that fails is recorded with its error and ends the conversation,
+    since every later turn depends on it. ``emit`` is called with each
+    record as soon as the turn finishes.
+    """
+    conversation_id = conversation.get("id", conversation_id)
+    session = ConversationSession(
+        conversation.get("profile"),
+        conversation.get("user_id") or f"replay-{conversation_id}",
+        conversation.get("mode") or mode,
+        store_memory,
+    )
+    steps = [("therapist", answer) for answer in conversation.get("therapy_answers", [])]
+    steps += [(f"chatbot.{session.mode}", message) for message in conversation.get("chat", [])]
+
+    records = []
+    for turn, (kind, text) in enumerate(steps, 1):
+        record = {"conversation": conversation_id, "turn": turn, "kind": kind}
+        start = time.perf_counter()
+        try:
+            if kind == "therapist":
+                record["output"], record["tokens"] = session.ask_therapist()
+            else:
+                record["input"] = text
+                record["output"], record["tokens"] = session.chat(text)
+        except Exception as e:
+            record["error"] = str(e)
+            record["tokens"] = 0
+        record["latency_ms"] = (time.perf_counter() - start) * 1000
+        records.append(record)
+        if emit is not None:
+            emit(record)
+        if "error" in record:
+            break
+        if kind == "therapist":
+            session.answer_therapist(text)
+    return records
+
+
+def summarize(records, conversations, wall_time):
+    """Throughput, per-kind latency percentiles and token usage for a set of turn records."""
+    by_kind = {}
+    for record in records:
+        by_kind.setdefault(record["kind"], []).append(record)
+
+    kinds = {}
+    for kind, kind_records in sorted(by_kind.items()):
+        latencies = [record["latency_ms"] for record in kind_records]
+        tokens = sum(record["tokens"] for record in kind_records)
+        kinds[kind] = {
+            "turns": len(kind_records),
+            "errors": sum("error" in record for record in kind_records),
+            "mean_ms": sum(latencies) / len(latencies),
+            "p50_ms": percentile(latencies, 0.5),
+            "p95_ms": percentile(latencies, 0.95),
+            "max_ms": max(latencies),
+            "total_tokens": tokens,
+            "mean_tokens": tokens / len(kind_records),
+        }
+
+    latencies = [record["latency_ms"] for record in records]
+    return {
+        "conversations": conversations,
+        "turns": len(records),
+        "errors": sum("error" in record for record in records),
+        "wall_s": wall_time,
+        "turns_per_s": len(records) / wall_time if wall_time else 0.0,
+        "conversations_per_s": conversations / wall_time if wall_time else 0.0,
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "total_tokens": sum(record["tokens"] for record in records),
+        "kinds": kinds,
+    }
+
+
+def run_replay(conversations, workers=4, output=None, mode=None, store_memory=False):
+    """
+    Replay ``conversations`` across ``workers`` threads and return a summary.
+
+    Conversations run concurrently; the turns within one conversation run in
+    order. If ``output`` is a path, every turn record is appended to it as a
+    JSON line the moment the turn finishes, so partial results survive an
+    interrupted run.
+    """
+    records = []
+    lock = threading.Lock()
+    output_file = open(output, "w", encoding="utf-8") if output else None
+
+    def emit(record):
+        with lock:
+            records.append(record)
+            if output_file is not None:
+                output_file.write(json.dumps(record) + "\n")
+                output_file.flush()
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="replay") as executor:
+            futures = [
+                executor.submit(replay_conversation, conversation, index, mode, store_memory, emit)
+                for index, conversation in enumerate(conversations)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        if output_file is not None:
+            output_file.close()
+    summary = summarize(records, len(conversations), time.perf_counter() - start)
+    summary["workers"] = workers
+    return summary
+
+
+def format_summary(summary):
+    lines = [
+        f"{summary['conversations']} conversations, {summary['turns']} turns, {summary['errors']} errors "
+        f"in {summary['wall_s']:.1f}s with {summary['workers']} workers",
+        f"throughput: {summary['turns_per_s']:.2f} turns/s, {summary['conversations_per_s']:.2f} conversations/s",
+        f"latency: p50={summary['p50_ms']:.0f}ms p95={summary['p95_ms']:.0f}ms, tokens: {summary['total_tokens']}",
+    ]
+    for kind, stats in summary["kinds"].items():
+        lines.append(
+            f"  {kind:<18} turns={stats['turns']:<5} errors={stats['errors']:<3} "
+            f"p50={stats['p50_ms']:8.0f}ms p95={stats['p95_ms']:8.0f}ms mean_tokens={stats['mean_tokens']:.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,182 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .embeddings import get_embedder
+from .metrics import get_metrics
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL = 3600
+
+
+def response_scope(user_data, mode, user_id=None):
+    """
+    Cache partition for a chatbot request.
+
+    Answers are only reused between requests with the same conversation
+    style, concern set and chatbot mode. Pass ``user_id`` whenever the
+    request carries personal context (profile, therapy transcript or chat
+    history) so that answers are never served to a different user; with no
+    ``user_id`` the scope is shared by everyone.
+    """
+    user_data = user_data or {}
+    return (
+        user_id,
+        user_data.get('preferred_style', ''),
+        tuple(sorted(user_data.get('concerns', []))),
+        mode,
+    )
+
+
+class ResponseCache:
+    """
+    Semantic cache of chatbot answers keyed by question embedding.
+
+    A lookup returns the stored answer of the most similar earlier question
+    in the same scope if its cosine similarity is at least ``threshold``.
+    Entries expire ``ttl`` seconds after they are stored and the least
+    recently used are evicted beyond ``max_entries``. Embedding failures are
+    treated as misses so the cache never blocks a response.
+    """
+
+    def __init__(self, embedder=None, threshold=None, max_entries=DEFAULT_MAX_ENTRIES, ttl=None):
+        self._embedder = embedder
+        self.threshold = threshold if threshold is not None else float(
+            os.environ.get("RESPONSE_CACHE_THRESHOLD", DEFAULT_THRESHOLD)
+        )
+        self.max_entries = max_entries
+        self.ttl = ttl if ttl is not None else float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", DEFAULT_TTL))
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._scopes = {}
+        self._vectors = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _embed(self, query):
+        # The same question is embedded for the lookup and again for the store
+        with self._lock:
+            vector = self._vectors.get(query)
+        if vector is None:
+            vector = self.embedder.embed([query])[0]
+            with self._lock:
+                self._vectors[query] = vector
+                while len(self._vectors) > 64:
+                    self._vectors.popitem(last=False)
+        return vector
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        scope = self._scopes[entry["scope"]]
+        del scope["ids"][entry_id]
+        scope["matrix"] = None
+        if not scope["ids"]:
+            del self._scopes[entry["scope"]]
+
+    def _expire(self, now):
+        cutoff = now - self.ttl
+        # Entries are in LRU order, not insertion order, so scan them all
+        for entry_id in [entry_id for entry_id, entry in self._entries.items() if entry["created_at"] < cutoff]:
+            self._remove(entry_id)
+
+    def get(self, query, scope):
+        """Return the cached answer for a question similar to ``query`` in ``scope``, or None."""
+        start = time.perf_counter()
+        try:
+            with span("response_cache.embed"):
+                vector = self._embed(query)
+        except Exception as e:
+            logger.warning("Response cache lookup failed: %s", e)
+            vector = None
+
+        response = None
+        with self._lock:
+            self._expire(time.time())
+            scope_entries = self._scopes.get(scope)
+            if vector is not None and scope_entries is not None:
+                ids = list(scope_entries["ids"])
+                if scope_entries["matrix"] is None:
+                    scope_entries["matrix"] = np.stack([self._entries[entry_id]["vector"] for entry_id in ids])
+                similarities = scope_entries["matrix"] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self._entries.move_to_end(ids[best])
+                    response = self._entries[ids[best]]["response"]
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        get_metrics().record("response_cache.lookup", time.perf_counter() - start, hit=response is not None)
+        return response
+
+    def put(self, query, scope, response):
+        """Store ``response`` as the answer to ``query`` in ``scope``."""
+        try:
+            vector = self._embed(query)
+        except Exception as e:
+            logger.warning("Response cache store failed: %s", e)
+            return
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "scope": scope,
+                "vector": vector,
+                "response": response,
+                "created_at": time.time(),
+            }
+            scope_entries = self._scopes.setdefault(scope, {"ids": {}, "matrix": None})
+            scope_entries["ids"][entry_id] = None
+            scope_entries["matrix"] = None
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "threshold": self.threshold,
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide response cache, creating it on first use."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .chatbot import build_chatbot_request, extract_response, get_chatbot_mode, total_tokens
+from .memory import with_memories
+from .metrics import get_metrics
+from .pool import get_crew_pool
+from .tracing import attach, span, trace
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class CrewService:
+    """
+    Runs crew requests on a dedicated asyncio event loop, off the Streamlit script thread.
+
+    Pages ``submit`` an ``ask_therapist``/``ask_chatbot`` coroutine and get a
+    ``concurrent.futures.Future`` back that they can poll or cancel; streamed
+    replies ``submit_crew`` their bound crew the same way. At most
+    ``max_concurrency`` crews run at once, streamed or not; later requests
+    wait for a slot.
+    Cancelling a request that is still waiting frees it immediately; a crew
+    that is already running finishes in its worker thread (CrewAI has no
+    way to interrupt it) but its result is discarded.
+    """
+
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency or int(
+            os.environ.get("CREW_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+        )
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.cancelled = 0
+        self._loop = asyncio.new_event_loop()
+        # kickoff_async runs crews with asyncio.to_thread, i.e. on this executor
+        self._loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="crew")
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="crew-service", daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine):
+        """Schedule ``coroutine`` on the service loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(attach(coroutine), self._loop)
+
+    def submit_crew(self, bound_crew):
+        """Schedule ``bound_crew`` within the concurrency limit; returns a concurrent.futures.Future of its output."""
+        return self.submit(self._kickoff(bound_crew))
+
+    async def _kickoff(self, bound_crew):
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        task = asyncio.ensure_future(bound_crew.kickoff_async())
+        try:
+            result = await asyncio.shield(task)
+            self.completed += 1
+            return result
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            # The crew keeps running in its thread; hold the slot until it is done
+            await asyncio.wait([task])
+            raise
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    async def ask_therapist(self, user_context, conversation_history="", question_number=1, user_id=None):
+        """Return the therapist's next question; ``user_id``'s relevant memories are added to the context."""
+        inputs = {
+            "user_context": with_memories(user_context, user_context, user_id),
+            "conversation_history": conversation_history,
+            "question_number": str(question_number),
+        }
+        start = time.perf_counter()
+        with trace("therapy question", question=question_number):
+            result = await self._kickoff(get_crew_pool().therapy_crew(inputs))
+        get_metrics().record("therapist", time.perf_counter() - start, tokens=total_tokens(result))
+        if hasattr(result, 'raw'):
+            return result.raw
+        return str(result)
+
+    async def ask_chatbot(self, user_message, full_context, mode=None, user_id=None):
+        """Return the chatbot's answer to ``user_message``; see chatbot.run_chatbot."""
+        mode = mode or get_chatbot_mode()
+        start = time.perf_counter()
+        with span("chatbot.crew", mode=mode):
+            crew_output = await self._kickoff(build_chatbot_request(user_message, full_context, mode, user_id))
+        get_metrics().record(f"chatbot.{mode}", time.perf_counter() - start, tokens=total_tokens(crew_output))
+        return extract_response(crew_output)
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+        }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_crew_service():
+    """Return the process-wide crew service, starting its event loop on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = CrewService()
+    return _service
+
+
+async def ask_therapist(user_context, conversation_history="", question_number=1, user_id=None):
+    """Coroutine for the therapist's next question; run it with ``get_crew_service().submit``."""
+    return await get_crew_service().ask_therapist(user_context, conversation_history, question_number, user_id)
+
+
+async def ask_chatbot(user_message, full_context, mode=None, user_id=None):
+    """Coroutine for the chatbot's answer; run it with ``get_crew_service().submit``."""
+    return await get_crew_service().ask_chatbot(user_message, full_context, mode, user_id)
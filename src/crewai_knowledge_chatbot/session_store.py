@@ -0,0 +1,345 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from .context_window import ContextWindow
+from .turn_log import TurnLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_DB = "sessions.db"
+THERAPY = "therapy"
+CHAT = "chat"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    user_data TEXT NOT NULL,
+    therapy_complete INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_by_user ON sessions (user_id, updated_at);
+CREATE TABLE IF NOT EXISTS turns (
+    session_id TEXT NOT NULL,
+    created_ns INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (session_id, created_ns)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS turns_by_phase ON turns (session_id, phase, role);
+"""
+
+UPSERT_SESSION = """
+INSERT INTO sessions (session_id, user_id, user_data, therapy_complete, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    user_id = excluded.user_id,
+    user_data = excluded.user_data,
+    therapy_complete = excluded.therapy_complete,
+    updated_at = excluded.updated_at
+"""
+INSERT_TURN = "INSERT INTO turns (session_id, created_ns, phase, role, content) VALUES (?, ?, ?, ?, ?)"
+TOUCH_SESSION = "UPDATE sessions SET updated_at = ? WHERE session_id = ?"
+DELETE_TURNS = "DELETE FROM turns WHERE session_id = ? AND phase = ?"
+
+
+class SessionStore:
+    """
+    Durable SQLite store of sessions and their turns.
+
+    Writes never block the caller: they are queued and committed from a
+    background thread, one transaction per batch of up to ``max_batch``
+    statements gathered within ``max_wait`` seconds. If a batch fails, its
+    statements are retried one at a time and only those that fail again are
+    dropped. The database runs in
+    WAL mode, so readers are not blocked by the writer. Turns are only ever
+    appended, keyed by ``(session_id, created_ns)`` where ``created_ns`` is a
+    strictly increasing nanosecond timestamp, so appending never has to read
+    the session first. Every read is a primary-key or index range over one
+    session, so reads cost the same however many sessions the database
+    holds. Reads flush pending writes first, so a caller always sees its own
+    turns.
+    """
+
+    def __init__(self, path=None, max_batch=200, max_wait=0.05):
+        self.path = path or os.environ.get("SESSION_DB", DEFAULT_SESSION_DB)
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.written = 0
+        self.commits = 0
+        self.dropped = 0
+        self._local = threading.local()
+        self._last_ns = 0
+        self._clock_lock = threading.Lock()
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last commits on power loss, never corruption
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self):
+        """This thread's read connection; sqlite3 connections are not shared between threads."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    # Writes
+
+    def save_session(self, session_id, user_id, user_data, therapy_complete=False):
+        """Create or update a session's profile and therapy status."""
+        now = time.time()
+        self._queue.put((UPSERT_SESSION, (session_id, user_id, json.dumps(user_data), int(therapy_complete), now, now)))
+
+    def append_turn(self, session_id, phase, role, content):
+        """Append one turn (``phase`` is THERAPY or CHAT, ``role`` "user" or "assistant") to a session."""
+        self._queue.put((INSERT_TURN, (session_id, self._timestamp_ns(), phase, role, content)))
+
+    def clear_turns(self, session_id, phase):
+        """Delete every turn of ``phase`` from a session, e.g. when the user clears the chat."""
+        self._queue.put((DELETE_TURNS, (session_id, phase)))
+
+    def _timestamp_ns(self):
+        # Strictly increasing even if two turns land in the same clock tick
+        with self._clock_lock:
+            self._last_ns = max(time.time_ns(), self._last_ns + 1)
+            return self._last_ns
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        """
+        Block until every queued write has been committed or dropped.
+
+        Returns False if ``timeout`` seconds elapse first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, connection, batch):
+        """Run ``batch`` in one transaction; on error it is rolled back and the error raised."""
+        touched = {}
+        with connection:
+            for statement, params in batch:
+                connection.execute(statement, params)
+                if statement == INSERT_TURN:
+                    touched[params[0]] = params[1] / 1e9
+            connection.executemany(
+                TOUCH_SESSION, [(updated_at, session_id) for session_id, updated_at in touched.items()]
+            )
+        self.written += len(batch)
+        self.commits += 1
+
+    def _run(self):
+        connection = self._connect()
+        while True:
+            batch = self._next_batch()
+            try:
+                self._commit(connection, batch)
+            except Exception as e:
+                logger.warning("Session write batch of %d failed, retrying one by one: %s", len(batch), e)
+                for write in batch:
+                    try:
+                        self._commit(connection, [write])
+                    except Exception:
+                        self.dropped += 1
+                        logger.exception("Dropping session write for %s", write[1][0])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    # Reads
+
+    def load_session(self, session_id):
+        """Return the session's profile and status as a dict, or None if it does not exist."""
+        self.flush(timeout=5)
+        row = self._connection().execute(
+            "SELECT user_id, user_data, therapy_complete, created_at, updated_at FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "session_id": session_id,
+            "user_id": row[0],
+            "user_data": json.loads(row[1]),
+            "therapy_complete": bool(row[2]),
+            "created_at": row[3],
+            "updated_at": row[4],
+        }
+
+    def turns(self, session_id, phase=None):
+        """Return ``(phase, role, content, created_ns)`` for a session's turns in order, optionally of one ``phase``."""
+        self.flush(timeout=5)
+        query = "SELECT phase, role, content, created_ns FROM turns WHERE session_id = ?"
+        params = (session_id,)
+        if phase is not None:
+            query += " AND phase = ?"
+            params += (phase,)
+        return self._connection().execute(query + " ORDER BY created_ns", params).fetchall()
+
+    def session_stats(self, session_id):
+        """Turn counts per phase and role, and the time between the first and last turn."""
+        self.flush(timeout=5)
+        # Answered entirely from the turns_by_phase index
+        rows = self._connection().execute(
+            "SELECT phase, role, COUNT(*), MIN(created_ns), MAX(created_ns) FROM turns "
+            "WHERE session_id = ? GROUP BY phase, role",
+            (session_id,),
+        ).fetchall()
+        counts = {(phase, role): count for phase, role, count, _, _ in rows}
+        started = min((row[3] for row in rows), default=None)
+        ended = max((row[4] for row in rows), default=None)
+        return {
+            "therapy_questions": counts.get((THERAPY, "assistant"), 0),
+            "therapy_answers": counts.get((THERAPY, "user"), 0),
+            "chat_messages": counts.get((CHAT, "user"), 0) + counts.get((CHAT, "assistant"), 0),
+            "duration_seconds": (ended - started) / 1e9 if rows else 0.0,
+        }
+
+    def recent_sessions(self, user_id, limit=10):
+        """The ids of a user's most recently updated sessions, newest first."""
+        self.flush(timeout=5)
+        rows = self._connection().execute(
+            "SELECT session_id FROM sessions WHERE user_id = ? ORDER BY updated_at DESC LIMIT ?",
+            (user_id, limit),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "written": self.written,
+            "commits": self.commits,
+            "dropped": self.dropped,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Return the process-wide session store, opening SESSION_DB on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore()
+    return _store
+
+
+def restore_session_state(state, session_id, store=None):
+    """
+    Rebuild a page's session state from the store, e.g. after a server restart.
+
+    ``state`` is ``st.session_state`` (any mutable mapping works). Returns
+    False, leaving ``state`` untouched, if the session is not in the store.
+    """
+    store = store or get_session_store()
+    session = store.load_session(session_id)
+    if session is None:
+        return False
+
+    therapy_log = TurnLog(labels={"user": "User", "assistant": "Therapist"})
+    chat_log = TurnLog()
+    context_window = ContextWindow()
+    for phase, role, content, created_ns in store.turns(session_id):
+        if phase == THERAPY:
+            therapy_log.append(role, content, created_ns / 1e9)
+        else:
+            chat_log.append(role, content, created_ns / 1e9)
+            context_window.add_turn(chat_log.labels[role], content)
+
+    state["session_id"] = session_id
+    state["user_id"] = session["user_id"]
+    state["user_data"] = session["user_data"]
+    state["form_submitted"] = True
+    state["therapy_log"] = therapy_log
+    state["question_count"] = therapy_log.count("user")
+    # An unanswered question is shown again; otherwise the next one is generated
+    last_is_question = bool(therapy_log) and therapy_log[-1].role == "assistant"
+    state["current_question"] = therapy_log[-1].text if last_is_question else None
+    state["therapy_complete"] = session["therapy_complete"]
+    if session["therapy_complete"]:
+        state["therapy_session_data"] = {
+            "transcript": therapy_log,
+            "user_data": session["user_data"],
+            "timestamp": os.environ.get('CURRENT_TIMESTAMP', 'Unknown'),
+        }
+    state["chat_log"] = chat_log
+    state["context_window"] = context_window
+    return True
+
+
+def save_session_state(state, store=None):
+    """
+    Persist the profile in ``state``, giving the session an id on first save.
+
+    Call whenever the profile or therapy status changes; returns the session id.
+    """
+    store = store or get_session_store()
+    if "session_id" not in state:
+        state["session_id"] = uuid.uuid4().hex
+    store.save_session(
+        state["session_id"],
+        state["user_id"],
+        state.get("user_data", {}),
+        therapy_complete=state.get("therapy_complete", False),
+    )
+    return state["session_id"]
+
+
+def resume_session(state, query_params, store=None):
+    """
+    Keep the session id in the page URL and restore the session from it when needed.
+
+    Call at the top of every page with ``st.session_state`` and
+    ``st.query_params``. If Streamlit has lost the session (a restart or a
+    new websocket) but the URL still names one, it is rehydrated from the
+    store; turns are only read from the database in that case.
+    """
+    session_id = state.get("session_id")
+    if session_id is None:
+        session_id = query_params.get("session")
+        if not session_id or not restore_session_state(state, session_id, store):
+            return None
+    if query_params.get("session") != session_id:
+        query_params["session"] = session_id
+    return session_id
@@ -0,0 +1,311 @@
+import abc
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import wave
+from functools import lru_cache
+
+DEFAULT_STT_BACKEND = "google"
+DEFAULT_TTS_BACKEND = "gtts"
+
+# Sample rate expected by the local speech models
+MODEL_SAMPLE_RATE = 16000
+
+
+class TranscriptionError(Exception):
+    """Raised when a speech-to-text backend fails."""
+
+
+class UnintelligibleAudioError(TranscriptionError):
+    """Raised when the audio was processed but no speech could be recognized."""
+
+
+def to_wav_bytes(audio):
+    """Return WAV bytes for raw WAV bytes, a BytesIO or a pydub AudioSegment."""
+    if isinstance(audio, io.BytesIO):
+        return audio.getvalue()
+    if hasattr(audio, "export"):
+        buffer = io.BytesIO()
+        audio.export(buffer, format="wav")
+        return buffer.getvalue()
+    return bytes(audio)
+
+
+def audio_fingerprint(audio, windows=16, window_size=4096):
+    """
+    Cheap identity hash of a recording, used to detect new recordings.
+
+    Hashes the PCM length and format plus ``windows`` evenly spaced slices
+    of the in-memory buffer, so the cost is constant regardless of clip
+    length and no WAV export or full byte-string comparison is needed.
+    """
+    if hasattr(audio, "raw_data"):
+        data = memoryview(audio.raw_data)
+        header = f"{len(data)}:{audio.frame_rate}:{audio.sample_width}:{audio.channels}"
+    else:
+        data = memoryview(to_wav_bytes(audio))
+        header = str(len(data))
+
+    digest = hashlib.blake2b(header.encode("ascii"), digest_size=16)
+    if len(data) <= windows * window_size:
+        digest.update(data)
+    else:
+        stride = (len(data) - window_size) // (windows - 1)
+        for start in range(0, stride * windows, stride):
+            digest.update(data[start:start + window_size])
+    return digest.hexdigest()
+
+
+def read_pcm(audio):
+    """
+    Return ``(pcm, sample_rate, sample_width, channels)`` without disk I/O.
+
+    For an AudioSegment this is its existing buffer; WAV bytes are parsed in
+    memory.
+    """
+    if hasattr(audio, "raw_data"):
+        return audio.raw_data, audio.frame_rate, audio.sample_width, audio.channels
+    with wave.open(io.BytesIO(to_wav_bytes(audio)), "rb") as wav:
+        return wav.readframes(wav.getnframes()), wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+
+
+def to_segment(audio):
+    """Return ``audio`` as a pydub AudioSegment, wrapping in-memory PCM if needed."""
+    if hasattr(audio, "raw_data"):
+        return audio
+    from pydub import AudioSegment
+
+    pcm, sample_rate, sample_width, channels = read_pcm(audio)
+    return AudioSegment(data=pcm, sample_width=sample_width, frame_rate=sample_rate, channels=channels)
+
+
+def to_pcm16_mono(audio, sample_rate=MODEL_SAMPLE_RATE):
+    """Return 16-bit mono PCM at ``sample_rate`` for any input accepted by to_wav_bytes."""
+    # pydub returns the segment itself when a property already matches
+    return to_segment(audio).set_frame_rate(sample_rate).set_channels(1).set_sample_width(2).raw_data
+
+
+def to_audio_data(audio):
+    """Wrap a recording's PCM in a speech_recognition AudioData without re-encoding it."""
+    import speech_recognition as sr
+
+    pcm, sample_rate, sample_width, channels = read_pcm(audio)
+    if channels > 1:
+        pcm = to_segment(audio).set_channels(1).raw_data
+    return sr.AudioData(pcm, sample_rate, sample_width)
+
+
+def pcm16_to_wav(pcm, sample_rate=MODEL_SAMPLE_RATE):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def join_clips(clips, audio_format):
+    """
+    Join audio clips of one backend into a single clip of the same format.
+
+    WAV clips are re-wrapped around their concatenated frames; MP3 is a
+    stream of self-contained frames, so MP3 clips are simply appended.
+    """
+    clips = [clip for clip in clips if clip]
+    if len(clips) <= 1 or audio_format != "audio/wav":
+        return b"".join(clips)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as output:
+        for position, clip in enumerate(clips):
+            with wave.open(io.BytesIO(clip), "rb") as wav:
+                if position == 0:
+                    output.setparams(wav.getparams())
+                output.writeframes(wav.readframes(wav.getnframes()))
+    return buffer.getvalue()
+
+
+class SpeechToText(abc.ABC):
+    """Interface for speech-to-text backends."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def transcribe(self, audio):
+        """Transcribe WAV bytes, a BytesIO or an AudioSegment to text."""
+
+
+class TextToSpeech(abc.ABC):
+    """Interface for text-to-speech backends."""
+
+    name = "base"
+    audio_format = "audio/wav"
+
+    @abc.abstractmethod
+    def synthesize(self, text):
+        """Return encoded audio (in ``audio_format``) for ``text``."""
+
+
+class GoogleSpeechToText(SpeechToText):
+    """Google Web Speech API through the speech_recognition package (network)."""
+
+    name = "google"
+
+    def transcribe(self, audio):
+        import speech_recognition as sr
+
+        recognizer = sr.Recognizer()
+        try:
+            return recognizer.recognize_google(to_audio_data(audio))
+        except sr.UnknownValueError as e:
+            raise UnintelligibleAudioError(str(e)) from e
+        except sr.RequestError as e:
+            raise TranscriptionError(str(e)) from e
+
+
+class WhisperSpeechToText(SpeechToText):
+    """Local CPU transcription with faster-whisper (``pip install faster-whisper``)."""
+
+    name = "whisper"
+
+    def __init__(self, model_size=None):
+        from faster_whisper import WhisperModel
+
+        model_size = model_size or os.environ.get("WHISPER_MODEL", "base.en")
+        self.model = WhisperModel(model_size, device="cpu", compute_type="int8")
+
+    def transcribe(self, audio):
+        import numpy as np
+
+        samples = np.frombuffer(to_pcm16_mono(audio), dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _ = self.model.transcribe(samples, beam_size=1, language="en")
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise UnintelligibleAudioError("No speech recognized")
+        return text
+
+
+class VoskSpeechToText(SpeechToText):
+    """Local streaming transcription with Vosk (``pip install vosk``, VOSK_MODEL_PATH)."""
+
+    name = "vosk"
+
+    def __init__(self, model_path=None):
+        from vosk import Model
+
+        model_path = model_path or os.environ.get("VOSK_MODEL_PATH")
+        self.model = Model(model_path) if model_path else Model(lang="en-us")
+
+    def transcribe(self, audio):
+        from vosk import KaldiRecognizer
+
+        recognizer = KaldiRecognizer(self.model, MODEL_SAMPLE_RATE)
+        recognizer.AcceptWaveform(to_pcm16_mono(audio))
+        text = json.loads(recognizer.FinalResult()).get("text", "").strip()
+        if not text:
+            raise UnintelligibleAudioError("No speech recognized")
+        return text
+
+
+class StubSpeechToText(SpeechToText):
+    """Deterministic offline stand-in that returns a fixed transcript."""
+
+    name = "stub"
+
+    def __init__(self, transcript="I have been feeling stressed and I can't sleep well."):
+        self.transcript = transcript
+
+    def transcribe(self, audio):
+        return self.transcript
+
+
+class GTTSTextToSpeech(TextToSpeech):
+    """Google Text-to-Speech through gTTS (network)."""
+
+    name = "gtts"
+    audio_format = "audio/mp3"
+
+    def __init__(self, lang="en"):
+        self.lang = lang
+
+    def synthesize(self, text):
+        from gtts import gTTS
+
+        tts = gTTS(text=text, lang=self.lang, slow=False)
+
+        # Create a BytesIO object to store the audio
+        audio_buffer = io.BytesIO()
+        tts.write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
+
+class Pyttsx3TextToSpeech(TextToSpeech):
+    """Local offline synthesis with pyttsx3 (espeak/SAPI5/NSSpeech, ``pip install pyttsx3``)."""
+
+    name = "pyttsx3"
+    audio_format = "audio/wav"
+
+    def __init__(self):
+        import pyttsx3
+
+        self.engine = pyttsx3.init()
+        # The engine's run loop is not re-entrant
+        self._lock = threading.Lock()
+
+    def synthesize(self, text):
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
+            temp_audio_path = temp_audio.name
+        try:
+            with self._lock:
+                self.engine.save_to_file(text, temp_audio_path)
+                self.engine.runAndWait()
+            with open(temp_audio_path, "rb") as file:
+                return file.read()
+        finally:
+            os.unlink(temp_audio_path)
+
+
+class StubTextToSpeech(TextToSpeech):
+    """Deterministic offline stand-in producing silent WAV audio sized to the text."""
+
+    name = "stub"
+    audio_format = "audio/wav"
+
+    def __init__(self, seconds_per_word=0.3, sample_rate=MODEL_SAMPLE_RATE):
+        self.seconds_per_word = seconds_per_word
+        self.sample_rate = sample_rate
+
+    def synthesize(self, text):
+        frames = int(len(text.split()) * self.seconds_per_word * self.sample_rate)
+        return pcm16_to_wav(b"\0\0" * frames, self.sample_rate)
+
+
+STT_BACKENDS = {
+    backend.name: backend
+    for backend in (GoogleSpeechToText, WhisperSpeechToText, VoskSpeechToText, StubSpeechToText)
+}
+TTS_BACKENDS = {
+    backend.name: backend
+    for backend in (GTTSTextToSpeech, Pyttsx3TextToSpeech, StubTextToSpeech)
+}
+
+
+@lru_cache(maxsize=None)
+def get_stt_backend(name=None):
+    """Return the speech-to-text backend named by ``name`` or the STT_BACKEND variable."""
+    name = name or os.environ.get("STT_BACKEND", DEFAULT_STT_BACKEND)
+    if name not in STT_BACKENDS:
+        raise ValueError(f"Unknown STT backend {name!r}, expected one of {sorted(STT_BACKENDS)}")
+    return STT_BACKENDS[name]()
+
+
+@lru_cache(maxsize=None)
+def get_tts_backend(name=None):
+    """Return the text-to-speech backend named by ``name`` or the TTS_BACKEND variable."""
+    name = name or os.environ.get("TTS_BACKEND", DEFAULT_TTS_BACKEND)
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend {name!r}, expected one of {sorted(TTS_BACKENDS)}")
+    return TTS_BACKENDS[name]()
@@ -0,0 +1,149 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_TTS_WORKERS = 4
+# Sentences shorter than this are spoken together with the next one
+MIN_SENTENCE_CHARS = 40
+
+# Terminal punctuation (plus closing quotes/brackets) followed by whitespace, or a blank line
+_SENTENCE_END = re.compile(r"""[.!?…]+["'”’)\]]*\s+|\n\s*\n""")
+
+
+class SentenceSplitter:
+    """
+    Split text into sentences as it streams in.
+
+    A sentence ends at terminal punctuation followed by whitespace, or at a
+    blank line, so a boundary is known as soon as the whitespace after it
+    arrives and never moves when more text is fed. Short sentences are
+    joined with the next one until at least ``min_chars`` characters are
+    collected. The same text therefore splits into the same sentences
+    however it is chunked, which keeps the per-sentence audio cache hits
+    stable between a streamed reply and a later replay of it.
+    """
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+        self._scanned = 0
+
+    def feed(self, text):
+        """Add streamed text; returns the sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        # Whitespace at the end of the buffer may still grow, so never match against it
+        for match in _SENTENCE_END.finditer(self._buffer, self._scanned):
+            if match.end() == len(self._buffer):
+                break
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+            self._scanned = match.end()
+        self._buffer = self._buffer[start:]
+        self._scanned -= start
+        return sentences
+
+    def flush(self):
+        """Return whatever text is left once the stream has ended."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        self._scanned = 0
+        return [remainder] if remainder else []
+
+
+def split_sentences(text, min_chars=MIN_SENTENCE_CHARS):
+    """Split a complete text exactly the way SentenceSplitter splits it while streaming."""
+    splitter = SentenceSplitter(min_chars)
+    return splitter.feed(text) + splitter.flush()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_tts_executor():
+    """Return the process-wide speech synthesis pool, sized by TTS_WORKERS."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(os.environ.get("TTS_WORKERS", DEFAULT_TTS_WORKERS))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+    return _executor
+
+
+class SpeechPipeline:
+    """
+    Synthesize a reply sentence by sentence while it is still being written.
+
+    ``feed`` takes streamed text and submits each completed sentence to the
+    synthesis pool straight away, so the first sentence is being spoken
+    while the model is still generating the rest. Clips are handed back in
+    sentence order: ``ready()`` returns the ones that can be played now
+    without waiting, and iterating after ``close()`` waits for the rest.
+    ``synthesize(sentence)`` runs in pool threads and returns audio bytes;
+    a sentence whose synthesis fails is skipped and its exception kept in
+    ``errors``. ``time_to_first_audio`` is the seconds from the pipeline's
+    creation until the first clip was handed back.
+    """
+
+    def __init__(self, synthesize, executor=None, min_chars=MIN_SENTENCE_CHARS):
+        self.synthesize = synthesize
+        self.executor = executor or get_tts_executor()
+        self.sentences = []
+        self.errors = []
+        self.time_to_first_audio = None
+        self._splitter = SentenceSplitter(min_chars)
+        self._futures = []
+        self._next = 0
+        self._start = time.perf_counter()
+
+    def feed(self, text):
+        for sentence in self._splitter.feed(text):
+            self._submit(sentence)
+
+    def close(self):
+        """Submit the last, unterminated sentence; call once the text is complete."""
+        for sentence in self._splitter.flush():
+            self._submit(sentence)
+
+    def _submit(self, sentence):
+        self.sentences.append(sentence)
+        self._futures.append(self.executor.submit(self.synthesize, sentence))
+
+    def _take(self):
+        future = self._futures[self._next]
+        self._next += 1
+        try:
+            audio = future.result()
+        except Exception as e:
+            self.errors.append(e)
+            return None
+        if audio and self.time_to_first_audio is None:
+            self.time_to_first_audio = time.perf_counter() - self._start
+        return audio
+
+    def ready(self):
+        """Clips that are next in order and already synthesized, without blocking."""
+        clips = []
+        while self._next < len(self._futures) and self._futures[self._next].done():
+            audio = self._take()
+            if audio:
+                clips.append(audio)
+        return clips
+
+    def __iter__(self):
+        while self._next < len(self._futures):
+            audio = self._take()
+            if audio:
+                yield audio
+
+    def cancel(self):
+        """Drop sentences that have not started synthesizing, e.g. when the page is left."""
+        for future in self._futures[self._next:]:
+            future.cancel()
@@ -0,0 +1,138 @@
+import contextvars
+import queue
+import threading
+import time
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+_DONE = object()
+
+# Streaming LLM instance id -> queue of chunks for the request that owns it
+_listeners = {}
+_listeners_lock = threading.Lock()
+_handler_registered = False
+
+
+def _on_stream_chunk(source, event):
+    listener = _listeners.get(id(source))
+    if listener is not None:
+        listener.put(event.chunk)
+
+
+def _ensure_handler():
+    global _handler_registered
+    with _listeners_lock:
+        if not _handler_registered:
+            from crewai.utilities.events import crewai_event_bus
+            from crewai.utilities.events.llm_events import LLMStreamChunkEvent
+
+            crewai_event_bus.register_handler(LLMStreamChunkEvent, _on_stream_chunk)
+            _handler_registered = True
+
+
+class FinalAnswerFilter:
+    """
+    Incrementally strips the agent's ReAct preamble from streamed text.
+
+    Agents answer in the form ``Thought: ...\\nFinal Answer: ...``; only the
+    text after the ``Final Answer:`` marker is meant for the user. Chunks are
+    buffered until the marker has been seen and then passed through as-is.
+    """
+
+    def __init__(self, marker=FINAL_ANSWER_MARKER):
+        self.marker = marker
+        self._buffer = ""
+        self._passing = False
+
+    def feed(self, chunk):
+        if self._passing:
+            return chunk
+        self._buffer += chunk
+        position = self._buffer.find(self.marker)
+        if position < 0:
+            return ""
+        self._passing = True
+        text = self._buffer[position + len(self.marker):].lstrip()
+        self._buffer = ""
+        return text
+
+    @property
+    def started(self):
+        return self._passing
+
+
+class CrewStream:
+    """
+    Iterates over the final agent's answer while a bound crew runs.
+
+    The crew is kicked off with streaming enabled on the last task's agent
+    only. ``submit(bound_crew)`` schedules the crew and returns a
+    ``concurrent.futures.Future`` of its output, e.g.
+    ``CrewService.submit_crew`` to count the crew against the service's
+    concurrency limit; ``cancel()`` then cancels that future. Without
+    ``submit`` the crew runs directly in a background thread. Iterating
+    yields answer text as it arrives; once iteration finishes, ``output``
+    holds the crew output and ``time_to_first_token`` the seconds from start
+    to the first yielded text. Exceptions raised by the crew are re-raised
+    from the iterator.
+    """
+
+    def __init__(self, bound_crew, submit=None):
+        self.bound_crew = bound_crew
+        self.submit = submit
+        self.future = None
+        self.output = None
+        self.time_to_first_token = None
+        self._error = None
+        self._chunks = queue.Queue()
+
+    def _finish(self, llm_id, result):
+        try:
+            self.output = result()
+        except Exception as e:
+            self._error = e
+        finally:
+            with _listeners_lock:
+                _listeners.pop(llm_id, None)
+            self._chunks.put(_DONE)
+
+    def cancel(self):
+        """Cancel the submitted crew if it has not finished; a no-op once it has, or without ``submit``."""
+        if self.future is not None:
+            self.future.cancel()
+
+    def __iter__(self):
+        _ensure_handler()
+        llm = self.bound_crew.crew.tasks[-1].agent.llm
+        llm.stream = True
+        with _listeners_lock:
+            _listeners[id(llm)] = self._chunks
+
+        start = time.perf_counter()
+        if self.submit is not None:
+            self.future = self.submit(self.bound_crew)
+            self.future.add_done_callback(lambda future: self._finish(id(llm), future.result))
+        else:
+            # Run in a copy of this context so tracing spans nest under the caller's
+            context = contextvars.copy_context()
+            threading.Thread(
+                target=context.run, args=(self._finish, id(llm), self.bound_crew.kickoff), daemon=True
+            ).start()
+
+        answer_filter = FinalAnswerFilter()
+        while True:
+            chunk = self._chunks.get()
+            if chunk is _DONE:
+                break
+            text = answer_filter.feed(chunk)
+            if text:
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.perf_counter() - start
+                yield text
+
+        if self._error is not None:
+            raise self._error
+        if not answer_filter.started and self.output is not None:
+            # The model did not stream (or skipped the marker); emit the final text at once
+            self.time_to_first_token = time.perf_counter() - start
+            yield getattr(self.output, "raw", str(self.output))
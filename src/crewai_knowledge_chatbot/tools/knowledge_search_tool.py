@@ -0,0 +1,35 @@
+from typing import Any, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from ..knowledge_index import format_passages, load_knowledge_index
+
+
+class KnowledgeSearchToolInput(BaseModel):
+    """Input schema for KnowledgeSearchTool."""
+    query: str = Field(
+        ...,
+        description="A short, focused search query, e.g. 'breathing exercises for panic attacks'.",
+    )
+
+
+class KnowledgeSearchTool(BaseTool):
+    name: str = "Search mental health knowledge base"
+    description: str = (
+        "Searches the authorized mental health knowledge base and returns the most relevant "
+        "passages with their source. Use short, focused queries for one topic at a time, and "
+        "call it several times to cover different concerns."
+    )
+    args_schema: Type[BaseModel] = KnowledgeSearchToolInput
+    index: Any = Field(default=None, exclude=True)
+    top_k: int = 4
+    keyword_weight: float = 0.3
+
+    def _run(self, query: str) -> str:
+        index = self.index if self.index is not None else load_knowledge_index()
+        if index is None or not len(index):
+            return "The knowledge base index is empty. Run build-index to create it."
+
+        results = index.search(query, limit=self.top_k, keyword_weight=self.keyword_weight)
+        return format_passages(results)
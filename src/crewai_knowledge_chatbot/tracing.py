@@ -0,0 +1,304 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_enabled = os.environ.get("TRACING", "").lower() in ("1", "true", "yes", "on")
+_current = contextvars.ContextVar("current_span", default=None)
+# Spans opened by CrewAI "started" events, closed by the matching "completed" events
+_event_scopes = contextvars.ContextVar("event_scopes", default=())
+
+
+class Span:
+    """One timed operation in a trace; ``children`` are the operations it contains."""
+
+    __slots__ = ("name", "attributes", "parent", "root", "children", "start", "end", "error", "wall_start_ns")
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.parent = parent
+        self.root = self if parent is None else parent.root
+        self.children = []
+        self.error = None
+        self.end = None
+        self.start = time.perf_counter()
+        self.wall_start_ns = time.time_ns() if parent is None else None
+        if parent is not None:
+            parent.children.append(self)
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def start_ns(self):
+        """Wall-clock start in nanoseconds since the epoch, derived from the root's."""
+        return self.root.wall_start_ns + int((self.start - self.root.start) * 1e9)
+
+    def end_ns(self):
+        return self.start_ns() + int(self.duration * 1e9)
+
+    def walk(self, depth=0):
+        """Yield ``(depth, span)`` for this span and its descendants in start order."""
+        yield depth, self
+        for child in sorted(self.children, key=lambda span: span.start):
+            yield from child.walk(depth + 1)
+
+
+class _SpanScope:
+    """Makes a span current for the duration of a ``with`` block."""
+
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span):
+        self.span = span
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        span = self.span
+        span.end = time.perf_counter()
+        if exc is not None:
+            span.error = repr(exc)
+        _current.reset(self._token)
+        if span.parent is None:
+            get_trace_recorder().add(span)
+        return False
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NOOP = _NoopScope()
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Turn tracing on or off for the whole process (it starts as the TRACING variable says)."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def current_span():
+    return _current.get() if _enabled else None
+
+
+def span(name, **attributes):
+    """
+    Time a block as a child of the current span.
+
+    Does nothing (and costs one global lookup) when tracing is disabled or
+    when no trace is active, so it is safe to leave in hot paths.
+    """
+    if not _enabled:
+        return _NOOP
+    parent = _current.get()
+    if parent is None:
+        return _NOOP
+    return _SpanScope(Span(name, parent, attributes))
+
+
+def trace(name, **attributes):
+    """Start a new trace, or a child span if a trace is already active."""
+    if not _enabled:
+        return _NOOP
+    _ensure_crew_handlers()
+    return _SpanScope(Span(name, _current.get(), attributes))
+
+
+async def _attached(parent, coroutine):
+    token = _current.set(parent)
+    try:
+        return await coroutine
+    finally:
+        _current.reset(token)
+
+
+def attach(coroutine):
+    """Run ``coroutine`` under the current span even if it is scheduled on another thread's loop."""
+    parent = current_span()
+    return coroutine if parent is None else _attached(parent, coroutine)
+
+
+def waterfall(root):
+    """Rows of ``(depth, name, offset_ms, duration_ms, attributes)`` for a finished trace."""
+    return [
+        (depth, span.name, (span.start - root.start) * 1000, span.duration * 1000, span.attributes)
+        for depth, span in root.walk()
+    ]
+
+
+class TraceRecorder:
+    """Keeps the most recent finished traces and hands them to the exporter, if any."""
+
+    def __init__(self, max_traces=50):
+        self._traces = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+        self._exporter = None
+        self._exporter_loaded = False
+
+    def add(self, root):
+        with self._lock:
+            self._traces.append(root)
+            if not self._exporter_loaded:
+                self._exporter = _load_exporter(os.environ.get("TRACING_EXPORTER", ""))
+                self._exporter_loaded = True
+        if self._exporter is not None:
+            try:
+                self._exporter.export(root)
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e)
+
+    def recent(self, name=None):
+        with self._lock:
+            return [root for root in self._traces if name is None or root.name == name]
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+class OpenTelemetryExporter:
+    """
+    Re-emits finished traces as OpenTelemetry spans.
+
+    ``kind`` is "otlp" (OTLP over HTTP, configured with the standard
+    OTEL_EXPORTER_OTLP_* variables) or "console". A private tracer provider
+    is used so CrewAI's own telemetry setup is left alone.
+    """
+
+    def __init__(self, kind="otlp", service_name="mem0-chatbot"):
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+        if kind == "console":
+            exporter = ConsoleSpanExporter()
+        else:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            exporter = OTLPSpanExporter()
+        self.provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        self.provider.add_span_processor(BatchSpanProcessor(exporter))
+        self.tracer = self.provider.get_tracer(__name__)
+
+    def export(self, root):
+        from opentelemetry import trace as otel_trace
+        from opentelemetry.trace import Status, StatusCode
+
+        def emit(span, context):
+            otel_span = self.tracer.start_span(
+                span.name,
+                context=context,
+                start_time=span.start_ns(),
+                attributes={key: str(value) for key, value in span.attributes.items()},
+            )
+            if span.error:
+                otel_span.set_status(Status(StatusCode.ERROR, span.error))
+            child_context = otel_trace.set_span_in_context(otel_span)
+            for child in span.children:
+                emit(child, child_context)
+            otel_span.end(end_time=span.end_ns())
+
+        emit(root, None)
+
+
+def _load_exporter(kind):
+    if not kind:
+        return None
+    try:
+        return OpenTelemetryExporter(kind)
+    except ImportError as e:
+        logger.warning("TRACING_EXPORTER=%s needs the OpenTelemetry SDK: %s", kind, e)
+        return None
+
+
+_recorder = TraceRecorder()
+
+
+def get_trace_recorder():
+    """Return the process-wide trace recorder."""
+    return _recorder
+
+
+# CrewAI emits its events synchronously on the thread running the crew, so
+# agent, LLM and tool spans nest under whatever span started the kickoff.
+
+_crew_handlers_registered = False
+_crew_handlers_lock = threading.Lock()
+
+
+def _open_event_span(kind, name, **attributes):
+    scope = span(name, **attributes)
+    if scope is _NOOP:
+        return
+    scope.__enter__()
+    _event_scopes.set(_event_scopes.get() + ((kind, scope),))
+
+
+def _close_event_span(kind, error=None):
+    scopes = _event_scopes.get()
+    if not scopes or scopes[-1][0] != kind:
+        return
+    _, scope = scopes[-1]
+    _event_scopes.set(scopes[:-1])
+    if error is not None:
+        scope.span.error = str(error)
+    scope.__exit__(None, None, None)
+
+
+def _ensure_crew_handlers():
+    global _crew_handlers_registered
+    if _crew_handlers_registered:
+        return
+    with _crew_handlers_lock:
+        if _crew_handlers_registered:
+            return
+        from crewai.utilities.events import (
+            AgentExecutionCompletedEvent,
+            AgentExecutionErrorEvent,
+            AgentExecutionStartedEvent,
+            LLMCallCompletedEvent,
+            LLMCallFailedEvent,
+            LLMCallStartedEvent,
+            ToolUsageErrorEvent,
+            ToolUsageFinishedEvent,
+            ToolUsageStartedEvent,
+            crewai_event_bus,
+        )
+
+        handlers = {
+            AgentExecutionStartedEvent: lambda source, event: _open_event_span(
+                "agent", f"agent: {event.agent.role.strip()}"
+            ),
+            AgentExecutionCompletedEvent: lambda source, event: _close_event_span("agent"),
+            AgentExecutionErrorEvent: lambda source, event: _close_event_span("agent", event.error),
+            LLMCallStartedEvent: lambda source, event: _open_event_span(
+                "llm", "llm call", model=getattr(source, "model", "")
+            ),
+            LLMCallCompletedEvent: lambda source, event: _close_event_span("llm"),
+            LLMCallFailedEvent: lambda source, event: _close_event_span("llm", event.error),
+            ToolUsageStartedEvent: lambda source, event: _open_event_span("tool", f"tool: {event.tool_name}"),
+            ToolUsageFinishedEvent: lambda source, event: _close_event_span("tool"),
+            ToolUsageErrorEvent: lambda source, event: _close_event_span("tool", event.error),
+        }
+        for event_type, handler in handlers.items():
+            crewai_event_bus.register_handler(event_type, handler)
+        _crew_handlers_registered = True
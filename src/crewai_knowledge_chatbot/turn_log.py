@@ -0,0 +1,85 @@
+import time
+
+from .context_window import count_tokens
+
+
+class Turn:
+    """One message in a conversation; ``tokens`` is counted on first use."""
+
+    __slots__ = ("role", "text", "timestamp", "_tokens")
+
+    def __init__(self, role, text, timestamp=None):
+        self.role = role
+        self.text = text
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._tokens = None
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            self._tokens = count_tokens(self.text)
+        return self._tokens
+
+
+class TurnLog:
+    """
+    Append-only log of one conversation, the only copy of its turns a page keeps.
+
+    Pages iterate the turns directly to display them. The ``"Speaker: text"``
+    lines the crews are given are derived lazily and extended, not rebuilt,
+    as turns are appended; the joined transcript is memoized by log length,
+    so a rerun that adds no turn builds no strings. ``labels`` maps roles
+    ("user", "assistant") to the speaker names used in those lines.
+    """
+
+    __slots__ = ("turns", "labels", "_lines", "_transcript", "_transcript_length")
+
+    def __init__(self, labels=None):
+        self.turns = []
+        self.labels = labels or {"user": "User", "assistant": "Assistant"}
+        self._lines = []
+        self._transcript = ""
+        self._transcript_length = 0
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __iter__(self):
+        return iter(self.turns)
+
+    def __getitem__(self, index):
+        return self.turns[index]
+
+    def append(self, role, text, timestamp=None):
+        turn = Turn(role, text, timestamp)
+        self.turns.append(turn)
+        return turn
+
+    def clear(self):
+        self.turns.clear()
+        self._lines.clear()
+        self._transcript = ""
+        self._transcript_length = 0
+
+    def count(self, role):
+        return sum(turn.role == role for turn in self.turns)
+
+    @property
+    def tokens(self):
+        return sum(turn.tokens for turn in self.turns)
+
+    def lines(self):
+        """``"Speaker: text"`` for every turn. The list is shared; do not modify it."""
+        for index in range(len(self._lines), len(self.turns)):
+            turn = self.turns[index]
+            self._lines.append(f"{self.labels.get(turn.role, turn.role)}: {turn.text}")
+        return self._lines
+
+    def transcript(self):
+        """All lines joined with newlines, rebuilt only when turns were appended."""
+        if self._transcript_length != len(self.turns):
+            lines = self.lines()
+            new_lines = "\n".join(lines[self._transcript_length:])
+            self._transcript = f"{self._transcript}\n{new_lines}" if self._transcript else new_lines
+            self._transcript_length = len(lines)
+        return self._transcript
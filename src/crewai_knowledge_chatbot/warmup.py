@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .chatbot import FAST_MODE_KEYWORD_WEIGHT
+from .knowledge_index import load_knowledge_index
+from .metrics import get_metrics
+from .pool import get_crew_pool
+from .service import ask_therapist, get_crew_service
+
+
+def format_initial_context(user_data):
+    """The profile summary the therapist crew is given as ``user_context``."""
+    return f"""
+        User Profile:
+        - Name: {user_data.get('name', 'Not provided')}
+        - Age Group: {user_data.get('age_group', 'Not provided')}
+        - Current Mood: {user_data.get('mood', 'Not provided')}
+        - Concerns: {', '.join(user_data.get('concerns', [])) or 'None'}
+        - Additional Info: {user_data.get('additional_info', 'None')}
+        """
+
+
+def warm_chatbot(concerns=()):
+    """
+    Warm the caches the chatbot's first message would otherwise fill.
+
+    Loads the knowledge index, builds the chatbot crew templates and runs
+    one hybrid search over the user's ``concerns``, which builds the
+    index's keyword scorer and opens the embedder's client. It only warms
+    these caches and returns nothing; the search results are discarded.
+    """
+    index = load_knowledge_index()
+    if index is not None and len(index):
+        index.search(" ".join(concerns) or "mental health", keyword_weight=FAST_MODE_KEYWORD_WEIGHT)
+    get_crew_pool().warm("chatbot_crew", "fast_chatbot_crew")
+
+
+def _timed(label, fn, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        get_metrics().record(label, time.perf_counter() - start)
+
+
+async def _timed_async(label, coroutine):
+    start = time.perf_counter()
+    try:
+        return await coroutine
+    finally:
+        get_metrics().record(label, time.perf_counter() - start)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_warmup_executor():
+    """Return the process-wide executor for warm-up work, sized by WARMUP_WORKERS."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("WARMUP_WORKERS", 4)),
+                    thread_name_prefix="warmup",
+                )
+    return _executor
+
+
+def start_first_question(user_data, user_id=None):
+    """Start generating therapy question 1 for ``user_data`` on the crew service; returns a Future of its text."""
+    return get_crew_service().submit(
+        _timed_async("warmup.first_question", ask_therapist(format_initial_context(user_data), "", 1, user_id))
+    )
+
+
+def start_crew_preload(*crew_names):
+    """Build crew templates (and import crewai) in the background before the first request needs them."""
+    return get_warmup_executor().submit(_timed, "warmup.crews", get_crew_pool().warm, *crew_names)
+
+
+def start_chatbot_warmup(concerns=()):
+    """Start warm_chatbot in the background; returns a Future that is done once it has run."""
+    return get_warmup_executor().submit(_timed, "warmup.chatbot", warm_chatbot, tuple(concerns))